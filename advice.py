@@ -0,0 +1,374 @@
+"""
+🧠 FinSight Investment Advice
+Declarative allocation, size and risk rules behind the Smart Investment Advice
+panel, compiled once into vectorized predicates over a frame of users
+
+The rules live in advice_rules.json (or the file named by FINSIGHT_ADVICE_RULES).
+Each rule has an ``id``, ``when`` conditions ``[feature, operator, threshold]``
+that must all hold, and an ``advice`` message that may quote features, e.g.
+``{volatility:.0%}`` or ``{var_amount:money}``. ``"stop": true`` ends the
+list for users it matches; ``"otherwise": true`` matches users no earlier rule
+fired for. Rules are read at first use, so edits apply on restart.
+
+Check a rules file and see how many users each rule would reach:
+    python advice.py --preview new_rules.json
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import math
+import operator
+import os
+import string
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import get_cache
+from fx import BASE_CURRENCY, conversion_factor, convert, format_money, rates_version
+from metrics import instrument
+from timeseries import to_day
+
+# ============================================
+# ⚙️ RULE FORMAT
+# ============================================
+
+ADVICE_RULES_PATH = os.environ.get(
+    'FINSIGHT_ADVICE_RULES', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'advice_rules.json')
+)
+
+# Values a rule can test or quote, one column each in a features frame.
+# ``allocation.<Asset Type>`` is that type's share of the value in % (0 when not held).
+FEATURES = {
+    'count': "number of holdings",
+    'total_value': "portfolio value in the reporting currency",
+    'base_value': "portfolio value in BASE_CURRENCY (size bands stay put across reporting currencies)",
+    'n_types': "number of asset types held",
+    'max_share': "largest asset type's share of the value, %",
+    'volatility': "annualised volatility of the valuation history",
+    'drawdown': "deepest peak-to-trough fall over the history window (0.2 = 20%)",
+    'var': "1-day historical VaR as a fraction of value",
+    'var_amount': "1-day historical VaR in the reporting currency",
+    'var_odds': "the VaR's '1 in N' bad day",
+    'type_correlation': "mean pairwise correlation between asset types",
+}
+ALLOCATION_PREFIX = 'allocation.'
+# Features read from a risk_report; NaN (never matching) without one
+RISK_FEATURES = ('volatility', 'drawdown', 'var', 'var_amount', 'var_odds', 'type_correlation')
+
+RULE_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+RULE_KEYS = {'id', 'when', 'advice', 'stop', 'otherwise'}
+
+# Per-user advice, keyed on the portfolio revision; stale keys age out
+ADVICE_CACHE_OPTIONS = dict(max_entries=4096, max_bytes=16 * 1024 * 1024)
+
+# ============================================
+# 🛠️ COMPILING RULES
+# ============================================
+
+def _compile_template(template):
+    """Message template -> (positional str.format string, fields, money flags).
+
+    Feature names (dotted ones included) become positional fields, so
+    matches are formatted by str.format directly; ``{x:money}`` fields
+    take strings pre-formatted in the reporting currency.
+    """
+    parts, fields, money = [], [], []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is None:
+            continue
+        _check_feature(field)
+        if field not in fields:
+            fields.append(field)
+            money.append(spec == 'money')
+        elif (spec == 'money') != money[fields.index(field)]:
+            raise ValueError(f"{field!r} is quoted both as money and as a number")
+        spec = '' if spec == 'money' else spec
+        parts.append(f"{{{fields.index(field)}{'!' + conversion if conversion else ''}{':' + spec if spec else ''}}}")
+    return ''.join(parts), fields, money
+
+def _check_feature(name):
+    if name not in FEATURES and not (name.startswith(ALLOCATION_PREFIX) and len(name) > len(ALLOCATION_PREFIX)):
+        raise ValueError(f"unknown feature {name!r}")
+
+def _column(columns, name, n):
+    """A feature's values; allocations to a type nobody holds are 0, other missing features NaN"""
+    column = columns.get(name)
+    if column is None:
+        column = np.zeros(n) if name.startswith(ALLOCATION_PREFIX) else np.full(n, np.nan)
+    return column
+
+def _predicate(tests):
+    def predicate(columns, n):
+        mask = np.ones(n, dtype=bool)
+        for feature, compare, threshold in tests:
+            mask &= compare(_column(columns, feature, n), threshold)  # NaN never matches
+        return mask
+    return predicate
+
+def _compile_rule(rule):
+    unknown = set(rule) - RULE_KEYS
+    if unknown:
+        raise ValueError(f"unknown keys {', '.join(sorted(unknown))}")
+    tests = []
+    for condition in rule.get('when', []):
+        if not isinstance(condition, list) or len(condition) != 3:
+            raise ValueError(f"condition {condition!r} is not [feature, operator, threshold]")
+        feature, op, threshold = condition
+        _check_feature(feature)
+        if op not in RULE_OPERATORS:
+            raise ValueError(f"unsupported operator {op!r}")
+        tests.append((feature, RULE_OPERATORS[op], float(threshold)))
+    if not tests and not rule.get('otherwise'):
+        raise ValueError("needs 'when' conditions or 'otherwise'")
+
+    template, fields, money = _compile_template(rule['advice'])
+    template.format(*('1' if is_money else 1.0 for is_money in money))  # bad format specs fail here
+    return {
+        'id': rule['id'],
+        'predicate': _predicate(tests),
+        'advice': template,
+        'fields': fields,
+        'money': money,
+        'stop': bool(rule.get('stop')),
+        'otherwise': bool(rule.get('otherwise')),
+    }
+
+def compile_rules(spec):
+    """Compile a parsed rules file -> ``{'version', 'rules'}``; raises ValueError on a bad rule.
+
+    ``version`` hashes the rules, so stored and cached advice can be
+    matched to the rules that produced it.
+    """
+    rules = spec['rules'] if isinstance(spec, dict) else spec
+    compiled, seen = [], set()
+    for position, rule in enumerate(rules):
+        rule_id = rule.get('id') if isinstance(rule, dict) else None
+        try:
+            if rule_id is None:
+                raise ValueError("missing 'id'")
+            if rule_id in seen:
+                raise ValueError("duplicate id")
+            seen.add(rule_id)
+            compiled.append(_compile_rule(rule))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Advice rule {rule_id or f'#{position + 1}'}: {e}") from None
+    canonical = json.dumps(rules, sort_keys=True, ensure_ascii=False).encode()
+    return {'version': hashlib.sha1(canonical).hexdigest()[:12], 'rules': compiled}
+
+def load_rules(path=ADVICE_RULES_PATH):
+    """Read and compile a rules file"""
+    with open(path, encoding='utf-8') as f:
+        return compile_rules(json.load(f))
+
+_rules = None
+_rules_lock = threading.Lock()
+
+def advice_rules():
+    """The compiled rules from ADVICE_RULES_PATH, loaded once per process"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = load_rules(ADVICE_RULES_PATH)
+    return _rules
+
+# ============================================
+# 📐 FEATURES
+# ============================================
+
+@functools.lru_cache(maxsize=64)
+def _off_diagonal(n):
+    return ~np.eye(n, dtype=bool)
+
+def _risk_row(risk):
+    if risk is None:
+        return (math.nan,) * len(RISK_FEATURES)
+    portfolio = risk['portfolio']
+    mean_corr = math.nan
+    by_type = risk.get('by_type')
+    if by_type is not None:
+        off_diagonal = by_type['correlation'][_off_diagonal(len(by_type['correlation']))]
+        missing = np.isnan(off_diagonal)
+        if not missing.all():
+            mean_corr = float(off_diagonal[~missing].mean())
+    var = portfolio['var_historical']
+    return (portfolio['volatility'], -portfolio['max_drawdown'], var, var * portfolio['value'],
+            round(1 / (1 - risk['confidence'])), mean_corr)
+
+def summary_features(summary, risk=None):
+    """One-row features frame for a get_portfolio_summary result and its optional risk_report"""
+    by_type = summary['by_type']
+    currency = summary.get('currency', BASE_CURRENCY)
+    total_value = summary['total_value']
+    row = {
+        'count': summary['count'],
+        'total_value': total_value,
+        'base_value': total_value * conversion_factor(currency, BASE_CURRENCY) if total_value else 0.0,
+        'n_types': len(by_type),
+        'max_share': float(by_type['Percentage'].max()) if len(by_type) else 0.0,
+    }
+    row.update(zip([ALLOCATION_PREFIX + name for name in by_type['Type']], by_type['Percentage'].astype(float)))
+    row.update(zip(RISK_FEATURES, _risk_row(risk)))
+    return pd.DataFrame(np.array([list(row.values())], dtype=float), columns=list(row))
+
+@instrument('advice.features')
+def holdings_features(rows, usernames=None, currency=BASE_CURRENCY, risks=None):
+    """Features frame indexed by username from ``(username, asset_type, currency, total, count)`` rows.
+
+    The many-user counterpart of summary_features, built from e.g. a
+    batch chunk or holding_snapshots with one conversion and one groupby.
+    ``usernames`` adds rows for users without holdings; ``risks`` maps
+    usernames to risk_report results (missing = NaN risk features).
+    """
+    native = pd.DataFrame([tuple(row) for row in rows],
+                          columns=['username', 'Type', 'Currency', 'Total Value', 'Count'])
+    native['Total Value'] = convert(native['Total Value'].to_numpy(dtype=float), native['Currency'], currency)
+    grouped = native.groupby(['username', 'Type'])[['Total Value', 'Count']].sum()
+    totals = grouped['Total Value'].unstack('Type', fill_value=0.0)
+    if usernames is not None:
+        totals = totals.reindex(pd.Index(usernames, name='username'), fill_value=0.0)
+    total_value = totals.sum(axis=1)
+    shares = totals.div(total_value.where(total_value != 0), axis=0).fillna(0.0) * 100
+    per_user = grouped['Count'].groupby(level='username')
+    features = pd.DataFrame({
+        'count': per_user.sum().reindex(totals.index, fill_value=0),
+        'total_value': total_value,
+        'base_value': total_value * conversion_factor(currency, BASE_CURRENCY),
+        'n_types': per_user.size().reindex(totals.index, fill_value=0),
+        'max_share': shares.max(axis=1) if shares.shape[1] else 0.0,
+    })
+    risk_rows = [_risk_row((risks or {}).get(username)) for username in features.index]
+    return pd.concat([
+        features,
+        shares.add_prefix(ALLOCATION_PREFIX),
+        pd.DataFrame(risk_rows, index=features.index, columns=list(RISK_FEATURES)),
+    ], axis=1)
+
+# ============================================
+# 💡 EVALUATION
+# ============================================
+
+@instrument('advice.evaluate')
+def evaluate_advice(features, currency=BASE_CURRENCY, rules=None, hits=None):
+    """Advice list for every row of a features frame, as a Series on the same index.
+
+    Each rule is one vectorized mask over all rows, applied in file
+    order; messages are formatted for matching rows only. ``hits``, if
+    given, is filled with the number of rows each rule matched.
+    """
+    rules = advice_rules() if rules is None else rules
+    n = len(features)
+    columns = dict(zip(features.columns, features.to_numpy(dtype=float).T))  # one block, not per-column lookups
+    advice = [[] for _ in range(n)]
+    open_rows = np.ones(n, dtype=bool)
+    fired = np.zeros(n, dtype=bool)
+    for rule in rules['rules']:
+        mask = open_rows & rule['predicate'](columns, n)
+        if rule['otherwise']:
+            mask &= ~fired
+        matched = np.flatnonzero(mask)
+        if rule['fields']:
+            values = []
+            for field, is_money in zip(rule['fields'], rule['money']):
+                column = _column(columns, field, n)[matched].tolist()
+                values.append([format_money(v, currency, 0) for v in column] if is_money else column)
+            for i, args in zip(matched, zip(*values)):
+                advice[i].append(rule['advice'].format(*args))
+        else:
+            for i in matched:
+                advice[i].append(rule['advice'])
+        fired |= mask
+        if rule['stop']:
+            open_rows &= ~mask
+        if hits is not None:
+            hits[rule['id']] = len(matched)
+    return pd.Series(advice, index=features.index, dtype=object)
+
+def generate_investment_advice(summary, risk=None):
+    """Generate smart AI-driven investment advice.
+
+    ``summary`` comes from get_portfolio_summary; ``risk`` is an optional
+    risk.risk_report for the same user in the summary's currency, enabling
+    the history-based rules.
+    """
+    return evaluate_advice(summary_features(summary, risk), summary.get('currency', BASE_CURRENCY)).iloc[0]
+
+def advice_cache():
+    """Process-wide per-user advice cache"""
+    return get_cache('advice', **ADVICE_CACHE_OPTIONS)
+
+def user_advice(username, currency=BASE_CURRENCY):
+    """A user's advice, cached per portfolio revision.
+
+    Prefers the batch job's stored advice. The key also carries the day
+    (risk rules read the valuation history), the rates version and the
+    rules version, so none of those serve stale advice.
+    """
+    # portfolio imports batch, which imports this module
+    from portfolio import get_portfolio_summary, get_revision
+    from risk import user_risk_report
+
+    def load():
+        summary = get_portfolio_summary(username, currency)
+        return summary.get('advice') or generate_investment_advice(
+            summary, user_risk_report(username, currency=currency)
+        )
+
+    key = (username, get_revision(username), currency, to_day(), rates_version(), advice_rules()['version'])
+    return advice_cache().get_or_set(key, load, tag=username)
+
+# ============================================
+# 🖥️ CLI
+# ============================================
+
+def preview(path):
+    """Compile ``path`` and evaluate it over every user's holdings; returns ``(rules, hits, users, seconds)``.
+
+    Risk features need each user's valuation history and are left out,
+    so risk rules report no hits here.
+    """
+    from database import get_db
+
+    rules = load_rules(path)
+    with get_db().snapshot() as conn:
+        usernames = [row[0] for row in conn.execute("SELECT username FROM users ORDER BY username")]
+        rows = conn.execute(
+            "SELECT username, asset_type, currency, total_value, asset_count FROM holding_snapshots"
+        ).fetchall()
+    started = time.perf_counter()
+    hits = {}
+    evaluate_advice(holdings_features(rows, usernames), rules=rules, hits=hits)
+    return rules, hits, len(usernames), time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check FinSight advice rules")
+    parser.add_argument('--preview', metavar='PATH', default=ADVICE_RULES_PATH,
+                        help="rules file to check against every user's holdings")
+    args = parser.parse_args(argv)
+
+    try:
+        rules, hits, users, seconds = preview(args.preview)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    for rule in rules['rules']:
+        print(f"{hits[rule['id']]:>10,} {hits[rule['id']] / max(users, 1):7.1%}  {rule['id']}")
+    print(f"{len(rules['rules'])} rules (version {rules['version']}) over {users:,} users "
+          f"in {seconds:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""
+🔌 FinSight HTTP API
+JSON API over the portfolio service layer, served by Tornado's asyncio loop
+(already installed with Streamlit). Blocking SQLite and KDF work runs on a
+thread pool so the event loop keeps accepting requests.
+
+    python api.py --port 8600
+
+    POST   /api/sessions                {"username", "password"} -> {"token", ...}
+    DELETE /api/sessions                log out the bearer token
+    GET    /api/portfolio               holdings (ETag / If-None-Match), ?as_of=YYYY-MM-DD from the ledger
+    GET    /api/portfolio/summary       per-type breakdown (ETag)
+    GET    /api/portfolio/projection    ?years=5 Monte Carlo bands (ETag)
+    POST   /api/portfolio/assets        {"assets": [{asset_name, asset_type, current_value, currency?, added_date?}]}
+    PATCH  /api/portfolio/assets        {"updates": [{id, asset_name?, asset_type?, current_value?, currency?}]}
+    DELETE /api/portfolio/assets        {"ids": [...]}
+    DELETE /api/portfolio/assets/<id>
+    GET    /api/metrics                 Prometheus text, or ?format=json (admins or scrape token)
+
+Authenticated requests send ``Authorization: Bearer <token>``. The GET
+endpoints take ``?currency=USD`` to report values in another currency
+(default INR); holdings keep their own currency and gain a converted value.
+Login attempts are limited per peer address; behind a reverse proxy, set
+FINSIGHT_TRUST_PROXY=1 so the address it forwards is used instead.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import partial
+
+import pandas as pd
+import tornado.web
+
+from auth import TRUST_PROXY, AuthBusy, LoginThrottled, authenticate_user, is_admin
+from database import POOL_SIZE
+from fx import BASE_CURRENCY, CURRENCIES, convert, has_rate, rates_version
+from metrics import collect, observe, prometheus_text
+from portfolio import (ASSET_TYPES, delete_assets, get_portfolio, get_portfolio_as_of, get_portfolio_summary,
+                       import_assets, predict_portfolio_value, sync_revision, update_assets)
+from sessions import SESSION_TTL, create_session, revoke_session, validate_session
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+API_PORT = 8600
+# One worker per pooled connection: more threads would only queue on the pool
+API_WORKERS = POOL_SIZE
+MAX_BULK_ITEMS = 10000  # assets, updates or ids per bulk request
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Bearer token a Prometheus scraper sends to /api/metrics (unset: admin sessions only)
+METRICS_TOKEN = os.environ.get('FINSIGHT_METRICS_TOKEN', '')
+
+# JSON field -> column in the export/import layout read by validate_assets
+ASSET_FIELDS = {
+    'asset_name': 'Asset Name',
+    'asset_type': 'Type',
+    'current_value': 'Value',
+    'currency': 'Currency',
+    'added_date': 'Date Added',
+}
+
+_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix='finsight-api')
+
+# ============================================
+# 🔄 SERIALIZATION
+# ============================================
+
+def holdings_json(df, currency=None, day=None):
+    """Holdings DataFrame -> list of JSON-ready dicts, with values also in ``currency`` (at ``day``'s rates) if given"""
+    if df.empty:
+        return []
+    assets = [
+        {
+            'id': int(row[0]),
+            'asset_name': row[1],
+            'asset_type': row[2],
+            'current_value': float(row[3]),
+            'currency': row[4],
+            'added_date': row[5].isoformat(),
+        }
+        for row in df[['ID', 'Asset Name', 'Type', 'Value', 'Currency', 'Date Added']].itertuples(index=False)
+    ]
+    if currency is not None:
+        for asset, value in zip(assets, convert(df['Value'], df['Currency'], currency, day).tolist()):
+            asset['converted_value'] = round(value, 2)
+    return assets
+
+def summary_json(summary):
+    by_type = summary['by_type']
+    return {
+        'currency': summary['currency'],
+        'total_value': summary['total_value'],
+        'count': summary['count'],
+        'average': summary['average'],
+        'by_type': [
+            {'asset_type': t, 'total_value': float(total), 'count': int(count),
+             'average': float(average), 'percentage': float(percentage)}
+            for t, total, count, average, percentage in by_type.itertuples(index=False)
+        ],
+    }
+
+def projection_json(projection):
+    return {
+        name: [int(v) for v in values] if name == 'years' else [round(float(v), 2) for v in values]
+        for name, values in projection.items()
+    }
+
+def _etag_versions(username):
+    return sync_revision(username), rates_version()
+
+# ============================================
+# 🧱 BASE HANDLER
+# ============================================
+
+class ApiHandler(tornado.web.RequestHandler):
+    """JSON in/out, bearer-token auth and thread-pool offloading"""
+
+    def set_default_headers(self):
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+        self.set_header('Vary', 'Authorization')
+
+    def compute_etag(self):
+        return None  # conditional responses are driven by portfolio revisions instead
+
+    def on_finish(self):
+        # Per-endpoint latency, e.g. api.SummaryHandler.GET
+        observe(f"api.{type(self).__name__}.{self.request.method}", self.request.request_time())
+
+    async def run(self, fn, *args, **kwargs):
+        """Run blocking service code on the API thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+    def _token(self):
+        header = self.request.headers.get('Authorization', '')
+        return header[7:].strip() if header.startswith('Bearer ') else None
+
+    async def prepare(self):
+        self.username = None
+        token = self._token()
+        if token:
+            # Usually answered from the in-process session LRU without the database
+            self.username = await self.run(validate_session, token)
+
+    def require_user(self):
+        if self.username is None:
+            raise tornado.web.HTTPError(401, reason="Missing or invalid session token")
+        return self.username
+
+    def body_json(self):
+        if not self.request.body:
+            return {}
+        try:
+            body = json.loads(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="Body is not valid JSON")
+        if not isinstance(body, dict):
+            raise tornado.web.HTTPError(400, reason="Body must be a JSON object")
+        return body
+
+    def bulk_items(self, body, key):
+        items = body.get(key)
+        if not isinstance(items, list) or not items:
+            raise tornado.web.HTTPError(400, reason=f"'{key}' must be a non-empty list")
+        if len(items) > MAX_BULK_ITEMS:
+            raise tornado.web.HTTPError(413, reason=f"At most {MAX_BULK_ITEMS} {key} per request")
+        return items
+
+    def send(self, data, status=200):
+        self.set_status(status)
+        self.finish(json.dumps(data, ensure_ascii=False, allow_nan=False))
+
+    def write_error(self, status_code, **kwargs):
+        self.finish(json.dumps({'error': self._reason, 'status': status_code}))
+
+    async def report_currency(self):
+        """Validated ``?currency=`` query argument (default BASE_CURRENCY)"""
+        currency = self.get_query_argument('currency', BASE_CURRENCY).upper()
+        if currency not in CURRENCIES:
+            raise tornado.web.HTTPError(400, reason=f"currency must be one of: {', '.join(CURRENCIES)}")
+        if not await self.run(has_rate, currency):
+            raise tornado.web.HTTPError(400, reason=f"No exchange rate recorded for {currency}")
+        return currency
+
+    async def conditional(self, produce):
+        """Answer 304 when If-None-Match still matches the portfolio revision.
+
+        The ETag is derived from the user's portfolio revision, the
+        exchange-rate table version and the request URI, so a matching
+        client skips the query and the body.
+        """
+        username = self.require_user()
+        revision, rates = await self.run(_etag_versions, username)
+        tag = hashlib.sha1(f"{username}\0{revision}\0{rates}\0{self.request.uri}".encode()).hexdigest()[:20]
+        self.set_header('ETag', f'"{tag}"')
+        self.set_header('Cache-Control', 'private, no-cache')
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return
+        self.send(await self.run(produce, username))
+
+# ============================================
+# 🎟️ SESSIONS
+# ============================================
+
+class SessionsHandler(ApiHandler):
+
+    async def post(self):
+        body = self.body_json()
+        username, password = body.get('username'), body.get('password')
+        if not isinstance(username, str) or not isinstance(password, str) or not username or not password:
+            raise tornado.web.HTTPError(400, reason="'username' and 'password' are required")
+        try:
+            ok = await self.run(authenticate_user, username, password, self.request.remote_ip)
+        except LoginThrottled as e:
+            # Answered directly: send_error() would drop the Retry-After header
+            self.set_header('Retry-After', str(math.ceil(e.retry_after)))
+            self.send({'error': str(e), 'status': 429}, status=429)
+            return
+        except AuthBusy as e:
+            self.set_header('Retry-After', '1')
+            self.send({'error': str(e), 'status': 503}, status=503)
+            return
+        if not ok:
+            raise tornado.web.HTTPError(401, reason="Invalid credentials")
+        token = await self.run(create_session, username)
+        self.send({'token': token, 'username': username, 'expires_in': SESSION_TTL}, status=201)
+
+    async def delete(self):
+        self.require_user()
+        await self.run(revoke_session, self._token())
+        self.set_status(204)
+        self.finish()
+
+# ============================================
+# 💼 PORTFOLIO
+# ============================================
+
+class PortfolioHandler(ApiHandler):
+
+    async def get(self):
+        currency = await self.report_currency() if self.get_query_argument('currency', None) else None
+        as_of = self.get_query_argument('as_of', None)
+        if as_of is None:
+            await self.conditional(lambda username: {'assets': holdings_json(get_portfolio(username), currency)})
+            return
+        try:
+            day = date.fromisoformat(as_of)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="'as_of' must be a YYYY-MM-DD date")
+
+        def produce(username):
+            try:
+                held = get_portfolio_as_of(username, day)
+            except LookupError as e:
+                raise tornado.web.HTTPError(410, reason=str(e))
+            return {'as_of': day.isoformat(), 'assets': holdings_json(held, currency, day)}
+
+        await self.conditional(produce)
+
+
+class SummaryHandler(ApiHandler):
+
+    async def get(self):
+        currency = await self.report_currency()
+        await self.conditional(lambda username: summary_json(get_portfolio_summary(username, currency)))
+
+
+class ProjectionHandler(ApiHandler):
+
+    async def get(self):
+        try:
+            years = int(self.get_query_argument('years', '5'))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="'years' must be an integer")
+        if not 1 <= years <= 20:
+            raise tornado.web.HTTPError(400, reason="'years' must be between 1 and 20")
+        currency = await self.report_currency()
+        await self.conditional(
+            lambda username: projection_json(predict_portfolio_value(get_portfolio_summary(username, currency), years))
+        )
+
+
+class AssetsHandler(ApiHandler):
+
+    async def post(self):
+        """Bulk add: validated and inserted in chunks like a file import"""
+        username = self.require_user()
+        assets = self.bulk_items(self.body_json(), 'assets')
+        if not all(isinstance(asset, dict) for asset in assets):
+            raise tornado.web.HTTPError(400, reason="Each asset must be an object")
+        if any(isinstance(asset.get('current_value'), bool) for asset in assets):
+            raise tornado.web.HTTPError(400, reason="current_value must be a number greater than 0")
+        frame = pd.DataFrame(assets).rename(columns=ASSET_FIELDS)
+        inserted, errors = await self.run(import_assets, username, frame)
+        self.send({
+            'inserted': inserted,
+            'errors': [{'index': int(row) - 1, 'error': error} for row, error in errors.itertuples(index=False)],
+        }, status=201 if inserted else 400)
+
+    async def patch(self):
+        username = self.require_user()
+        updates = self.bulk_items(self.body_json(), 'updates')
+        for update in updates:
+            # bool is an int subclass: JSON true/false are not ids or values
+            if (not isinstance(update, dict) or not isinstance(update.get('id'), int)
+                    or isinstance(update['id'], bool)):
+                raise tornado.web.HTTPError(400, reason="Each update needs an integer 'id'")
+            if update.get('asset_type') is not None and update['asset_type'] not in ASSET_TYPES:
+                raise tornado.web.HTTPError(400, reason=f"asset_type must be one of: {', '.join(ASSET_TYPES)}")
+            value = update.get('current_value')
+            if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)
+                                      or not value > 0):
+                raise tornado.web.HTTPError(400, reason="current_value must be a number greater than 0")
+            name = update.get('asset_name')
+            if name is not None and (not isinstance(name, str) or not name.strip()):
+                raise tornado.web.HTTPError(400, reason="asset_name must be a non-empty string")
+        try:
+            updated = await self.run(update_assets, username, updates)
+        except ValueError as e:  # unknown currency or one without a rate
+            raise tornado.web.HTTPError(400, reason=str(e))
+        self.send({'updated': updated})
+
+    async def delete(self, asset_id=None):
+        username = self.require_user()
+        if asset_id is not None:
+            ids = [int(asset_id)]
+        else:
+            ids = self.bulk_items(self.body_json(), 'ids')
+            if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+                raise tornado.web.HTTPError(400, reason="'ids' must be integers")
+        deleted = await self.run(delete_assets, username, ids)
+        if asset_id is not None and not deleted:
+            raise tornado.web.HTTPError(404, reason="Asset not found")
+        self.send({'deleted': deleted})
+
+
+class HealthHandler(ApiHandler):
+
+    def get(self):
+        self.send({'status': 'ok'})
+
+
+class MetricsHandler(ApiHandler):
+
+    async def get(self):
+        token = self._token() or ''
+        scraper = bool(METRICS_TOKEN) and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode())
+        if not scraper and not is_admin(self.require_user()):
+            raise tornado.web.HTTPError(403, reason="Metrics are restricted to admins")
+        metrics = await self.run(collect)
+        if self.get_query_argument('format', 'prometheus') == 'json':
+            self.send(metrics)
+            return
+        self.set_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.finish(prometheus_text(metrics))
+
+# ============================================
+# 🚀 SERVER
+# ============================================
+
+def make_app():
+    return tornado.web.Application([
+        (r'/api/health', HealthHandler),
+        (r'/api/sessions', SessionsHandler),
+        (r'/api/portfolio', PortfolioHandler),
+        (r'/api/portfolio/summary', SummaryHandler),
+        (r'/api/portfolio/projection', ProjectionHandler),
+        (r'/api/portfolio/assets', AssetsHandler),
+        (r'/api/portfolio/assets/([0-9]+)', AssetsHandler),
+        (r'/api/metrics', MetricsHandler),
+    ])
+
+async def serve(host='127.0.0.1', port=API_PORT):
+    server = make_app().listen(port, address=host, max_body_size=MAX_BODY_BYTES, xheaders=TRUST_PROXY)
+    print(f"FinSight API listening on http://{host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the FinSight JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+🔐 FinSight Authentication
+Salted KDF password hashes verified on a bounded worker pool, transparent
+upgrade of legacy SHA-256 rows, and an in-memory login attempt limiter
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from database import get_db
+from metrics import instrument
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# Hash scheme for new and upgraded passwords: 'scrypt' or 'pbkdf2_sha256'
+PASSWORD_SCHEME = os.environ.get('FINSIGHT_PASSWORD_SCHEME', 'scrypt')
+# scrypt cost: N=2^14, r=8, p=1 uses 16 MB and tens of ms per hash
+SCRYPT_N = int(os.environ.get('FINSIGHT_SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = int(os.environ.get('FINSIGHT_PBKDF2_ITERATIONS', '600000'))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# hashlib's scrypt and pbkdf2_hmac release the GIL, so hashes on the pool
+# run in parallel while the script thread only waits on the result
+AUTH_WORKERS = int(os.environ.get('FINSIGHT_AUTH_WORKERS', str(os.cpu_count() or 1)))
+AUTH_MAX_PENDING = AUTH_WORKERS * 4  # queued hashes beyond this are refused
+AUTH_TIMEOUT = 10.0  # seconds to wait for a hash result
+
+# Failed attempts allowed per window before further tries are refused
+USER_ATTEMPTS = (5, 300)  # per username: 5 failures / 5 minutes
+CLIENT_ATTEMPTS = (20, 60)  # per client address: 20 failures / minute
+LIMITER_MAX_KEYS = 100000  # oldest keys are forgotten beyond this
+# Set to 1 only behind a reverse proxy that sets X-Forwarded-For; without
+# one the header is whatever the client sent, so the peer address is used
+TRUST_PROXY = os.environ.get('FINSIGHT_TRUST_PROXY', '') == '1'
+
+# Comma-separated usernames that may open the performance page and metrics
+ADMIN_USERS = frozenset(
+    name.strip() for name in os.environ.get('FINSIGHT_ADMINS', '').split(',') if name.strip()
+)
+
+# ============================================
+# 🧂 PASSWORD HASHES
+# ============================================
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+def _derive(scheme, params, salt, password):
+    secret = password.encode('utf-8')
+    if scheme == 'scrypt':
+        n, r, p = params
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p,
+                              maxmem=2 * 128 * n * r + 1024 * 1024, dklen=HASH_BYTES)
+    if scheme == 'pbkdf2_sha256':
+        (iterations,) = params
+        return hashlib.pbkdf2_hmac('sha256', secret, salt, iterations, dklen=HASH_BYTES)
+    raise ValueError(f"Unknown password scheme: {scheme}")
+
+def _current_params(scheme=PASSWORD_SCHEME):
+    if scheme == 'scrypt':
+        return (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    if scheme == 'pbkdf2_sha256':
+        return (PBKDF2_ITERATIONS,)
+    raise ValueError(f"Unknown password scheme: {scheme}")
+
+def hash_password(password, scheme=PASSWORD_SCHEME):
+    """Salted hash encoded as ``scheme$param,...$salt$hash`` (base64 salt and hash)"""
+    params = _current_params(scheme)
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _derive(scheme, params, salt, password)
+    return '$'.join([scheme, ','.join(map(str, params)), _b64(salt), _b64(digest)])
+
+def is_legacy_hash(stored):
+    """True for the original unsalted SHA-256 hex digests"""
+    return '$' not in stored
+
+def needs_rehash(stored):
+    """True when a stored hash is legacy or uses other than the current scheme and cost"""
+    if is_legacy_hash(stored):
+        return True
+    scheme, params = stored.split('$')[:2]
+    return scheme != PASSWORD_SCHEME or params != ','.join(map(str, _current_params()))
+
+def verify_password(password, stored):
+    """Constant-time check of ``password`` against any stored hash format"""
+    if is_legacy_hash(stored):
+        candidate = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(candidate, stored)
+    try:
+        scheme, params, salt, digest = stored.split('$')
+        params = tuple(int(value) for value in params.split(','))
+        candidate = _derive(scheme, params, _unb64(salt), password)
+    except ValueError:
+        return False
+    return hmac.compare_digest(candidate, _unb64(digest))
+
+# ============================================
+# 🧵 BOUNDED HASHING POOL
+# ============================================
+
+class AuthBusy(RuntimeError):
+    """Raised when the hashing pool already has AUTH_MAX_PENDING jobs queued or a hash overruns AUTH_TIMEOUT"""
+
+
+class _HashPool:
+    """Thread pool that refuses work instead of queueing without bound"""
+
+    def __init__(self, workers=AUTH_WORKERS, max_pending=AUTH_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='finsight-auth')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def run(self, fn, *args, timeout=None):
+        if not self._slots.acquire(blocking=False):
+            raise AuthBusy("Too many sign-ins in progress, please retry shortly")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=AUTH_TIMEOUT if timeout is None else timeout)
+        except FutureTimeout:
+            # The job keeps its slot until it finishes, so a stuck KDF still bounds the queue
+            raise AuthBusy("Sign-in is taking too long, please retry shortly") from None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def hash_pool():
+    """Process-wide hashing pool shared by every Streamlit session"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _HashPool()
+    return _pool
+
+# ============================================
+# 🚦 ATTEMPT LIMITER
+# ============================================
+
+class LoginThrottled(RuntimeError):
+    """Raised when a username or client has too many recent failed logins"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed attempts, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class AttemptLimiter:
+    """Sliding-window count of failed attempts per key, in memory.
+
+    Checked before any hashing, so a burst of bad passwords costs a dict
+    lookup rather than a KDF run. At most ``max_keys`` keys are tracked;
+    the least recently failing are forgotten first.
+    """
+
+    def __init__(self, max_attempts, window, max_keys=LIMITER_MAX_KEYS):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self._failures = OrderedDict()  # key -> [failure timestamps]
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        times = self._failures.get(key)
+        if times is None:
+            return []
+        times[:] = [t for t in times if now - t < self.window]
+        if not times:
+            del self._failures[key]
+        return times
+
+    def retry_after(self, key):
+        """Seconds until ``key`` may try again (0 when allowed)"""
+        now = time.monotonic()
+        with self._lock:
+            times = self._recent(key, now)
+            if len(times) < self.max_attempts:
+                return 0.0
+            return self.window - (now - times[-self.max_attempts])
+
+    def record_failure(self, key):
+        now = time.monotonic()
+        with self._lock:
+            times = self._recent(key, now)
+            times.append(now)
+            self._failures[key] = times
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+user_limiter = AttemptLimiter(*USER_ATTEMPTS)
+client_limiter = AttemptLimiter(*CLIENT_ATTEMPTS)
+
+def client_key(forwarded, peer, trust_proxy=TRUST_PROXY):
+    """Client limiter key from an X-Forwarded-For value and the peer address.
+
+    The header only counts behind a trusted proxy, and then only its last
+    entry, the one the proxy appended; earlier ones came from the client.
+    None leaves just the per-username limit.
+    """
+    if trust_proxy:
+        hops = [hop.strip() for hop in (forwarded or '').split(',') if hop.strip()]
+        if hops:
+            return hops[-1]
+    return peer or None
+
+# ============================================
+# 👤 USERS
+# ============================================
+
+def register_user(username, email, password):
+    """Register a new user"""
+    try:
+        hashed_pw = hash_pool().run(hash_password, password)
+        with get_db().transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                (username, email, hashed_pw)
+            )
+        return True, "✅ Account created successfully!"
+    except get_db().IntegrityError:
+        return False, "❌ Username or email already exists!"
+    except AuthBusy as e:
+        return False, f"⏳ {e}"
+    except Exception as e:
+        return False, f"❌ Error: {str(e)}"
+
+_dummy = []
+
+def _dummy_hash():
+    """Hash of a random password, computed once, checked for unknown usernames"""
+    if not _dummy:
+        _dummy.append(hash_password(secrets.token_hex(8)))
+    return _dummy[0]
+
+def _check_and_upgrade(password, stored):
+    """Worker task: verify, and produce a fresh hash if the stored one is outdated"""
+    if not verify_password(password, stored):
+        return False, None
+    return True, hash_password(password) if needs_rehash(stored) else None
+
+@instrument('auth.authenticate')
+def authenticate_user(username, password, client=None):
+    """Authenticate user login.
+
+    Raises LoginThrottled when the username or ``client`` (an address or
+    other caller id) has too many recent failures, and AuthBusy when the
+    hashing pool is saturated or a hash overruns AUTH_TIMEOUT. A
+    successful login with a legacy or outdated hash rewrites it with the
+    current scheme.
+    """
+    keys = [(user_limiter, username)]
+    if client:
+        keys.append((client_limiter, client))
+    wait = max(limiter.retry_after(key) for limiter, key in keys)
+    if wait > 0:
+        raise LoginThrottled(wait)
+
+    with get_db().connection() as conn:
+        row = conn.execute("SELECT password FROM users WHERE username=?", (username,)).fetchone()
+    # Unknown users still pay for a hash so timing does not reveal them
+    stored = row[0] if row else _dummy_hash()
+    ok, upgraded = hash_pool().run(_check_and_upgrade, password, stored)
+
+    if not ok or row is None:
+        for limiter, key in keys:
+            limiter.record_failure(key)
+        return False
+    user_limiter.reset(username)
+    if upgraded is not None:
+        with get_db().transaction() as conn:
+            # Only replace the hash we verified, in case it changed meanwhile
+            conn.execute(
+                "UPDATE users SET password=? WHERE username=? AND password=?",
+                (upgraded, username, stored)
+            )
+    return True
+
+
+def is_admin(username):
+    """True for users listed in FINSIGHT_ADMINS"""
+    return username in ADMIN_USERS
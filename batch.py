@@ -0,0 +1,301 @@
+"""
+🌙 FinSight Batch Analytics
+Headless job that precomputes every user's per-type breakdown, investment
+advice and projection into the user_summaries table, which the dashboard
+reads directly instead of recomputing them in the session.
+
+Nightly run (an interrupted run of the same job resumes where it stopped):
+    python batch.py --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from advice import advice_rules, evaluate_advice, holdings_features
+from database import get_db
+from fx import BASE_CURRENCY, convert, convert_history
+from metrics import instrument
+from projections import MAX_YEARS, PROJECTION_SEED, cached_projection
+from risk import risk_report
+from timeseries import SQL_VARIABLE_CHUNK, load_history
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+BATCH_JOB = 'nightly'
+BATCH_CHUNK_USERS = 200  # users per database read, worker task and write transaction
+IN_FLIGHT_PER_WORKER = 2  # chunks queued ahead per worker process
+PROJECTION_BANDS = ('mean', 'p5', 'p50', 'p95')
+# A summary older than this is ignored even at the current revision, since
+# its risk-based advice reflects valuation history that has moved on
+SUMMARY_MAX_AGE = 36 * 3600
+
+# ============================================
+# 📊 SUMMARIES
+# ============================================
+
+@instrument('summary.build')
+def build_summary(rows, currency=BASE_CURRENCY):
+    """Summary dict in ``currency`` from ``(asset_type, currency, total, count)`` rows.
+
+    Each row's total is converted at today's rate in one vectorized pass,
+    then the rows are grouped by type. Returns ``currency``,
+    ``total_value``, ``count``, ``average`` and a ``by_type`` DataFrame
+    (Type, Total Value, Count, Avg Value, Percentage), the shape the
+    dashboard and the advice features expect.
+    """
+    native = pd.DataFrame([tuple(row) for row in rows], columns=['Type', 'Currency', 'Total Value', 'Count'])
+    native['Total Value'] = convert(native['Total Value'].to_numpy(dtype=float), native['Currency'], currency)
+    by_type = native.groupby('Type', as_index=False)[['Total Value', 'Count']].sum()
+    by_type['Avg Value'] = by_type['Total Value'] / by_type['Count']
+    total_value = float(by_type['Total Value'].sum()) if len(rows) else 0.0
+    count = int(by_type['Count'].sum()) if len(rows) else 0
+    by_type['Percentage'] = (by_type['Total Value'] / total_value * 100) if total_value else 0.0
+    by_type = by_type[['Type', 'Total Value', 'Count', 'Avg Value', 'Percentage']]
+
+    return {
+        'currency': currency,
+        'total_value': total_value,
+        'count': count,
+        'average': total_value / count if count else 0.0,
+        'by_type': by_type,
+    }
+
+@instrument('summary.load')
+def load_summary(username, currency=BASE_CURRENCY, max_age=SUMMARY_MAX_AGE):
+    """Precomputed summary for a user in ``currency``, or None when missing or stale.
+
+    A stored summary is used only while it matches the user's current
+    portfolio revision. It carries up to two extra keys: ``advice`` (list
+    of strings, in BASE_CURRENCY only, while the advice rules are
+    unchanged since the batch run) and, for non-empty portfolios,
+    ``projection`` (bands for 0..MAX_YEARS years in the cached_projection
+    layout, rescaled from the stored base-currency total).
+    """
+    with get_db().connection() as conn:
+        row = conn.execute(
+            "SELECT s.by_type, s.advice, s.projection, s.total_value, s.advice_version FROM user_summaries s "
+            "LEFT JOIN portfolio_revisions r ON r.username = s.username "
+            "WHERE s.username=? AND s.rev = COALESCE(r.rev, 0) AND s.computed_at >= ?",
+            (username, int(time.time()) - max_age)
+        ).fetchone()
+    if row is None:
+        return None
+
+    summary = build_summary(json.loads(row[0]), currency)
+    if currency == BASE_CURRENCY and row[4] == advice_rules()['version']:
+        summary['advice'] = json.loads(row[1])
+    if row[2] is not None and row[3] > 0:
+        # Stored in BASE_CURRENCY at the rates of the batch run
+        scale = summary['total_value'] / row[3]
+        bands = json.loads(row[2])
+        summary['projection'] = {'years': np.arange(MAX_YEARS + 1)}
+        summary['projection'].update((name, np.asarray(values) * scale) for name, values in bands.items())
+    return summary
+
+# ============================================
+# 🚰 STREAMING USERS
+# ============================================
+
+def iter_user_chunks(after='', chunk_users=BATCH_CHUNK_USERS):
+    """Yield ``[(username, rev, type rows), ...]`` for users after ``after``.
+
+    Users are read in username order with a keyset query per chunk. Each
+    chunk's users, revisions and per-type aggregates (the materialized
+    ledger snapshots) come from one read snapshot, so a revision always
+    matches the holdings it describes.
+    """
+    chunk_users = min(chunk_users, SQL_VARIABLE_CHUNK)
+    while True:
+        with get_db().snapshot() as conn:
+            usernames = [row[0] for row in conn.execute(
+                "SELECT username FROM users WHERE username > ? ORDER BY username LIMIT ?",
+                (after, chunk_users)
+            )]
+            if not usernames:
+                return
+            placeholders = ','.join('?' * len(usernames))
+            revisions = dict(conn.execute(
+                f"SELECT username, rev FROM portfolio_revisions WHERE username IN ({placeholders})",
+                usernames
+            ).fetchall())
+            groups = {username: [] for username in usernames}
+            for username, *row in conn.execute(
+                "SELECT username, asset_type, currency, total_value, asset_count FROM holding_snapshots "
+                f"WHERE username IN ({placeholders}) ORDER BY username, asset_type, currency",
+                usernames
+            ):
+                groups[username].append(row)
+
+        yield [(username, revisions.get(username, 0), groups[username]) for username in usernames]
+        if len(usernames) < chunk_users:
+            return
+        after = usernames[-1]
+
+# ============================================
+# 🧮 WORKER
+# ============================================
+
+@instrument('batch.chunk')
+def summarize_chunk(users):
+    """Compute user_summaries rows for one chunk (runs in a worker process).
+
+    Totals, advice and projections are in BASE_CURRENCY; ``by_type`` keeps
+    the native per-currency rows so readers can convert at current rates.
+    Advice rules are evaluated once for the whole chunk.
+    """
+    computed_at = int(time.time())
+    summaries, risks = {}, {}
+    for username, _, rows in users:
+        summaries[username] = summary = build_summary(rows)
+        risks[username] = risk_report(convert_history(load_history(username))) if summary['count'] else None
+    features = holdings_features(
+        [(username, *row) for username, _, rows in users for row in rows],
+        list(summaries), risks=risks
+    )
+    advice = evaluate_advice(features)
+    advice_version = advice_rules()['version']
+
+    results = []
+    for username, rev, rows in users:
+        summary = summaries[username]
+        projection = None
+        if summary['total_value'] > 0:
+            allocation = dict(zip(summary['by_type']['Type'], summary['by_type']['Total Value']))
+            bands = cached_projection(allocation, MAX_YEARS, seed=PROJECTION_SEED)
+            projection = json.dumps({name: np.round(bands[name], 2).tolist() for name in PROJECTION_BANDS})
+
+        results.append((
+            username, rev, computed_at, summary['total_value'], summary['count'],
+            json.dumps([list(row) for row in rows], ensure_ascii=False),
+            json.dumps(advice[username], ensure_ascii=False),
+            projection,
+            advice_version,
+        ))
+    return results
+
+def _ordered_results(chunks, workers):
+    """Run summarize_chunk over ``chunks`` and yield results in input order.
+
+    At most ``workers * IN_FLIGHT_PER_WORKER`` chunks are queued, so memory
+    stays bounded however many users there are. ``workers=0`` runs inline.
+    """
+    if workers == 0:
+        for chunk in chunks:
+            yield summarize_chunk(chunk)
+        return
+
+    # spawn, not fork: children must not inherit the parent's SQLite connections
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(summarize_chunk, chunk))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# ============================================
+# 💾 CHECKPOINTED RUNS
+# ============================================
+
+def _start_run(job, restart):
+    """Resume an unfinished run of ``job`` or start a new one -> (after, processed)"""
+    now = int(time.time())
+    with get_db().transaction() as conn:
+        row = conn.execute(
+            "SELECT finished_at, last_username, processed FROM batch_runs WHERE job=?", (job,)
+        ).fetchone()
+        if row is not None and row[0] is None and not restart:
+            return row[1], row[2]
+        conn.execute(
+            "INSERT INTO batch_runs (job, started_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (job) DO UPDATE SET started_at=excluded.started_at, "
+            "updated_at=excluded.updated_at, finished_at=NULL, last_username='', processed=0",
+            (job, now, now)
+        )
+    return '', 0
+
+def _save_chunk(job, results):
+    """Write a chunk's summaries and advance the checkpoint in one transaction"""
+    with get_db().transaction() as conn:
+        conn.executemany(
+            "INSERT INTO user_summaries (username, rev, computed_at, total_value, asset_count, "
+            "by_type, advice, projection, advice_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (username) DO UPDATE SET rev=excluded.rev, computed_at=excluded.computed_at, "
+            "total_value=excluded.total_value, asset_count=excluded.asset_count, "
+            "by_type=excluded.by_type, advice=excluded.advice, projection=excluded.projection, "
+            "advice_version=excluded.advice_version "
+            "WHERE excluded.rev >= user_summaries.rev",
+            results
+        )
+        conn.execute(
+            "UPDATE batch_runs SET last_username=?, processed=processed + ?, updated_at=? WHERE job=?",
+            (results[-1][0], len(results), int(time.time()), job)
+        )
+
+def run_batch(job=BATCH_JOB, workers=None, chunk_users=BATCH_CHUNK_USERS, restart=False, progress=None):
+    """Summarise every user into user_summaries; returns run statistics.
+
+    Progress is checkpointed per chunk under ``job``, so a crashed or
+    interrupted run picks up after the last saved user unless
+    ``restart`` is set. ``progress(processed, users_per_sec)`` is called
+    after each chunk. ``workers`` defaults to the CPU count.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    after, resumed = _start_run(job, restart)
+    started = time.perf_counter()
+    processed = 0
+
+    for results in _ordered_results(iter_user_chunks(after, chunk_users), workers):
+        _save_chunk(job, results)
+        processed += len(results)
+        if progress is not None:
+            progress(resumed + processed, processed / (time.perf_counter() - started))
+
+    with get_db().transaction() as conn:
+        conn.execute("UPDATE batch_runs SET finished_at=? WHERE job=?", (int(time.time()), job))
+    elapsed = time.perf_counter() - started
+    return {
+        'processed': processed,
+        'resumed_from': after or None,
+        'seconds': elapsed,
+        'users_per_sec': processed / elapsed if elapsed > 0 else 0.0,
+    }
+
+# ============================================
+# 🖥️ CLI
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute FinSight summaries for every user")
+    parser.add_argument('--job', default=BATCH_JOB, help="checkpoint name (one resumable run per job)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (0 = run inline)")
+    parser.add_argument('--chunk-users', type=int, default=BATCH_CHUNK_USERS)
+    parser.add_argument('--restart', action='store_true', help="ignore an unfinished run's checkpoint")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        args.job, args.workers, args.chunk_users, args.restart,
+        progress=lambda done, rate: print(f"{done:,} users summarised ({rate:,.0f} users/s)", file=sys.stderr)
+    )
+    if stats['resumed_from']:
+        print(f"Resumed after {stats['resumed_from']!r}", file=sys.stderr)
+    print(f"Summarised {stats['processed']:,} users in {stats['seconds']:.1f}s "
+          f"({stats['users_per_sec']:,.0f} users/s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
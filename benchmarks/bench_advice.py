@@ -0,0 +1,130 @@
+"""
+⏱️ Advice rules evaluated across many users
+
+Builds holdings and risk metrics for N synthetic users in memory, pads the
+shipped advice rules with generated threshold rules up to --rules, and
+times feature building and one vectorized evaluation over every user.
+A sample of users also goes through the one-user path, both to
+extrapolate its cost and to check that the two paths give the same advice.
+Default: 50 rules x 100k users.
+
+    python benchmarks/bench_advice.py --users 100000 --rules 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ASSET_TYPES = ["Stock", "Crypto", "Mutual Fund", "Real Estate", "Gold", "Others"]
+CURRENCIES = ('INR', 'INR', 'INR', 'USD')
+# feature -> (low, high) range for generated thresholds
+GENERATED_FEATURES = {
+    **{f"allocation.{name}": (5, 60) for name in ASSET_TYPES},
+    'max_share': (30, 90),
+    'n_types': (1, 6),
+    'base_value': (1e4, 1e7),
+    'volatility': (0.05, 0.5),
+    'drawdown': (0.05, 0.4),
+    'var': (0.01, 0.06),
+}
+
+
+def synthetic_users(rng, users):
+    """``(username, asset_type, currency, total, count)`` rows and ``{username: risk_report}``"""
+    rows, risks = [], {}
+    for i in range(users):
+        name = f"user_{i:06d}"
+        held = rng.choice(ASSET_TYPES, int(rng.integers(0, 7)), replace=False)
+        for asset_type in held:
+            rows.append((name, str(asset_type), CURRENCIES[int(rng.integers(len(CURRENCIES)))],
+                         float(rng.lognormal(11, 1.5)), int(rng.integers(1, 10))))
+        if len(held) and rng.random() < 0.8:
+            corr = rng.uniform(0.3, 1.0, (len(held), len(held)))
+            np.fill_diagonal(corr, 1.0)
+            risks[name] = {
+                'confidence': 0.95,
+                'portfolio': {'volatility': rng.uniform(0.02, 0.5), 'max_drawdown': -rng.uniform(0, 0.4),
+                              'var_historical': rng.uniform(0.005, 0.06), 'value': rng.lognormal(12, 1)},
+                'by_type': {'correlation': corr},
+            }
+    return rows, risks
+
+
+def padded_rules(rng, count):
+    """The shipped rules plus generated ones, ``count`` in total"""
+    import json
+
+    from advice import ADVICE_RULES_PATH
+
+    with open(ADVICE_RULES_PATH, encoding='utf-8') as f:
+        rules = json.load(f)['rules']
+    features = list(GENERATED_FEATURES)
+    for i in range(max(0, count - len(rules))):
+        chosen = rng.choice(features, int(rng.integers(1, 3)), replace=False)
+        when = [[str(feature), str(rng.choice(['<', '>'])), float(rng.uniform(*GENERATED_FEATURES[feature]))]
+                for feature in chosen]
+        quoted = f" ({{{chosen[0]}:.2f}})" if i % 2 else ""
+        rules.insert(-1, {'id': f"generated-{i}", 'when': when, 'advice': f"Generated advice {i}{quoted}"})
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--rules', type=int, default=50, help="total rules, shipped ones included")
+    parser.add_argument('--sample', type=int, default=1000, help="users also run through the one-user path")
+    args = parser.parse_args()
+
+    os.environ['FINSIGHT_DB'] = os.path.join(tempfile.mkdtemp(prefix='finsight_bench_'), 'bench.db')
+    from advice import compile_rules, evaluate_advice, generate_investment_advice, holdings_features
+    from batch import build_summary
+    from fx import record_rates
+    from timeseries import to_day
+
+    record_rates([('USD', to_day() * 86400, 83.0)])
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    rows, risks = synthetic_users(rng, args.users)
+    usernames = [f"user_{i:06d}" for i in range(args.users)]
+    rules = compile_rules(padded_rules(rng, args.rules))
+    print(f"Generated {args.users:,} users ({len(rows):,} type rows), {len(rules['rules'])} rules "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    features = holdings_features(rows, usernames, risks=risks)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits = {}
+    advice = evaluate_advice(features, rules=rules, hits=hits)
+    evaluate = time.perf_counter() - t0
+    print(f"holdings_features: {build:8.2f} s")
+    print(f"evaluate_advice:   {evaluate:8.2f} s  ({args.users / evaluate:,.0f} users/s, "
+          f"{sum(hits.values()):,} messages)")
+
+    # One-user path over a sample, with the shipped rules on both sides
+    sample = usernames[:args.sample]
+    sampled = [row for row in rows if row[0] < f"user_{args.sample:06d}"]
+    by_user = {}
+    for row in sampled:
+        by_user.setdefault(row[0], []).append(row[1:])
+    t0 = time.perf_counter()
+    single = {name: generate_investment_advice(build_summary(by_user.get(name, [])), risks.get(name))
+              for name in sample}
+    per_user = (time.perf_counter() - t0) / len(sample)
+    shipped = evaluate_advice(holdings_features(sampled, sample, risks=risks))
+    mismatched = sum(shipped[name] != single[name] for name in sample)
+    print(f"one user at a time: {per_user * 1000:.2f} ms/user -> ~{per_user * args.users:,.0f} s for "
+          f"{args.users:,} users with the shipped rules ({mismatched} of {len(sample):,} sampled users differ)")
+    if len(advice) != args.users or mismatched:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+⏱️ HTTP API throughput and latency under concurrent clients
+
+Seeds a temporary database, starts ``api.py`` in a subprocess and drives
+it with N concurrent asyncio clients per scenario, reporting requests/s
+and p50/p99 latency. The conditional scenario replays the ETag from a
+first read, so it measures the 304 path that skips the query and body.
+
+    python benchmarks/bench_api.py --users 20 --assets 200 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'correct horse'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def seed(users, assets):
+    import pandas as pd
+
+    from auth import register_user
+    from portfolio import ASSET_TYPES, import_assets
+
+    rng = np.random.default_rng(0)
+    for i in range(users):
+        username = f"user_{i}"
+        register_user(username, f"{username}@example.com", PASSWORD)
+        import_assets(username, pd.DataFrame({
+            'Asset Name': [f"Asset {j}" for j in range(assets)],
+            'Type': rng.choice(ASSET_TYPES, assets),
+            'Value': rng.uniform(1000, 500000, assets).round(2),
+        }))
+
+
+async def wait_ready(client, base, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            await client.fetch(f"{base}/api/health")
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+async def drive(concurrency, total, request):
+    """Run ``total`` calls of ``request(i)`` from ``concurrency`` workers"""
+    latencies = []
+    failures = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal failures
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                await request(i)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - t0, np.array(latencies), failures
+
+
+async def run(base, process, args):
+    from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+    AsyncHTTPClient.configure(None, max_clients=max(args.concurrency))
+    client = AsyncHTTPClient()
+    await wait_ready(client, base, process)
+
+    tokens = []
+    for i in range(args.users):
+        response = await client.fetch(f"{base}/api/sessions", method='POST',
+                                      body=json.dumps({'username': f"user_{i}", 'password': PASSWORD}))
+        tokens.append(json.loads(response.body)['token'])
+    auth = [{'Authorization': f"Bearer {token}"} for token in tokens]
+
+    etags = []
+    for headers in auth:
+        response = await client.fetch(f"{base}/api/portfolio", headers=headers)
+        etags.append(response.headers['ETag'])
+
+    def get(path):
+        async def request(i):
+            await client.fetch(f"{base}{path}", headers=auth[i % len(auth)])
+        return request
+
+    async def not_modified(i):
+        user = i % len(auth)
+        try:
+            await client.fetch(f"{base}/api/portfolio",
+                               headers={**auth[user], 'If-None-Match': etags[user]})
+        except HTTPClientError as e:
+            if e.code != 304:
+                raise
+
+    async def bulk_add(i):
+        assets = [{'asset_name': f"Bulk {i}-{j}", 'asset_type': 'Stock', 'current_value': 1000 + j}
+                  for j in range(args.bulk)]
+        await client.fetch(f"{base}/api/portfolio/assets", method='POST',
+                           headers=auth[i % len(auth)], body=json.dumps({'assets': assets}))
+
+    scenarios = {
+        'GET portfolio': get('/api/portfolio'),
+        'GET portfolio 304': not_modified,
+        'GET summary': get('/api/portfolio/summary'),
+        f"POST {args.bulk} assets": bulk_add,
+    }
+    print(f"{'scenario':22s} {'conc':>5s} {'req/s':>9s} {'p50 ms':>8s} {'p99 ms':>8s} {'fail':>5s}")
+    for name, request in scenarios.items():
+        for concurrency in args.concurrency:
+            elapsed, latencies, failures = await drive(concurrency, args.requests, request)
+            print(f"{name:22s} {concurrency:5d} {args.requests / elapsed:9.1f} "
+                  f"{np.percentile(latencies, 50) * 1000:8.2f} {np.percentile(latencies, 99) * 1000:8.2f} "
+                  f"{failures:5d}")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--assets', type=int, default=200, help="holdings per user")
+    parser.add_argument('--requests', type=int, default=500, help="requests per scenario and concurrency")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--bulk', type=int, default=50, help="assets per bulk POST")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='finsight-bench-')
+    os.environ['FINSIGHT_DB'] = os.path.join(tmp, 'bench.db')
+    seed(args.users, args.assets)
+
+    port = free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'api.py'), '--port', str(port)],
+                               cwd=ROOT, env=os.environ.copy(),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(run(f"http://127.0.0.1:{port}", process, args))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
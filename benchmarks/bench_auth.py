@@ -0,0 +1,59 @@
+"""
+⏱️ Password hashing and login throughput
+
+Times one hash per KDF scheme, then full authenticate_user calls against
+a temporary database from 1..N concurrent threads. Because hashlib's KDFs
+release the GIL, logins/s should scale with the hashing pool until the
+cores are saturated; logins/s per core is the figure to track.
+
+    python benchmarks/bench_auth.py --logins 200 --threads 1 2 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='finsight-bench-')
+    os.environ['FINSIGHT_DB'] = os.path.join(tmp, 'bench.db')
+    import auth  # noqa: E402  (after FINSIGHT_DB is set)
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores, auth pool of {auth.AUTH_WORKERS} workers")
+    for scheme in ('scrypt', 'pbkdf2_sha256'):
+        t0 = time.perf_counter()
+        stored = auth.hash_password('correct horse', scheme)
+        hashed = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        auth.verify_password('correct horse', stored)
+        print(f"{scheme:14s} hash {hashed * 1000:6.1f} ms, verify {(time.perf_counter() - t0) * 1000:6.1f} ms")
+
+    for i in range(args.users):
+        auth.register_user(f"user_{i}", f"user_{i}@example.com", 'correct horse')
+
+    for threads in args.threads:
+        names = [f"user_{i % args.users}" for i in range(args.logins)]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(lambda name: auth.authenticate_user(name, 'correct horse'), names))
+        elapsed = time.perf_counter() - t0
+        rate = args.logins / elapsed
+        print(f"{threads:3d} threads: {rate:8.1f} logins/s ({rate / min(threads, cores):6.1f} per busy core), "
+              f"{sum(results)}/{len(results)} ok")
+
+
+if __name__ == '__main__':
+    main()
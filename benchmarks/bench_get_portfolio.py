@@ -0,0 +1,94 @@
+"""
+⏱️ get_portfolio latency vs. total table size
+
+Grows one database from 1k to 10M portfolio rows (other users' holdings)
+while the measured user always owns the same 50 assets. With the
+(username, ...) indexes the latency should stay flat as the table grows.
+The query is timed through portfolio._load_portfolio, bypassing the
+per-user cache; a cached get_portfolio call is shown alongside.
+
+    python benchmarks/bench_get_portfolio.py --max-rows 10000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ASSET_TYPES = ["Stock", "Crypto", "Mutual Fund", "Real Estate", "Gold", "Others"]
+TARGET_USER = 'bench_user'
+TARGET_HOLDINGS = 50
+FILLER_USERS = 10000
+CHUNK = 50000
+
+
+def fill(conn, start, stop):
+    """Insert filler rows [start, stop) spread across FILLER_USERS users"""
+    now = int(time.time())
+    for lo in range(start, stop, CHUNK):
+        hi = min(lo + CHUNK, stop)
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO portfolio (username, asset_name, asset_type, current_value, added_date) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"user_{i % FILLER_USERS}", f"Asset {i}", ASSET_TYPES[i % 6],
+                 1000.0 + i % 997, now - i % 86400)
+                for i in range(lo, hi)
+            )
+        )
+        conn.execute("COMMIT")
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max-rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='finsight_bench_')
+    os.environ['FINSIGHT_DB'] = os.path.join(workdir, 'bench.db')
+
+    from database import get_db
+    from portfolio import _load_portfolio, add_asset, get_portfolio
+
+    for i in range(TARGET_HOLDINGS):
+        add_asset(TARGET_USER, f"Holding {i}", ASSET_TYPES[i % 6], 1000.0 + i)
+
+    with get_db().connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, asset_name, asset_type, current_value, currency, added_date "
+            "FROM portfolio WHERE username=? ORDER BY added_date, id", (TARGET_USER,)
+        ).fetchall()
+    print("Query plan:", "; ".join(row[-1] for row in plan))
+    print(f"{'rows':>12} {'p50 ms':>10} {'p95 ms':>10} {'cached p50':>12}")
+
+    rows, size = TARGET_HOLDINGS, 1000
+    while size <= args.max_rows:
+        with get_db().connection() as conn:
+            fill(conn, rows, size)
+            conn.execute("ANALYZE")
+        rows = size
+        p50, p95 = measure(lambda: _load_portfolio(TARGET_USER), args.repeat)
+        cached, _ = measure(lambda: get_portfolio(TARGET_USER), args.repeat)
+        print(f"{size:>12,} {p50:>10.3f} {p95:>10.3f} {cached:>12.4f}")
+        size *= 10
+
+
+if __name__ == '__main__':
+    main()
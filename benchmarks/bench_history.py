@@ -0,0 +1,68 @@
+"""
+⏱️ Growth-chart history load latency
+
+Ingests a year of daily valuations for N assets of one user and times
+load_history (uncached) plus the daily total and weekly/monthly
+resampling. Target: under 200 ms for a year of daily points for
+hundreds of assets.
+
+    python benchmarks/bench_history.py --assets 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BENCH_USER = 'bench_user'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--assets', type=int, default=500)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ['FINSIGHT_DB'] = os.path.join(tempfile.mkdtemp(prefix='finsight_bench_'), 'bench.db')
+
+    import numpy as np
+    from database import get_db
+    from timeseries import _load_history, portfolio_value_series, record_valuations, resample, to_day
+
+    today = to_day()
+    with get_db().transaction() as conn:
+        conn.executemany(
+            "INSERT INTO portfolio (username, asset_name, asset_type, current_value) VALUES (?, ?, 'Stock', 1000)",
+            ((BENCH_USER, f"Asset {i}") for i in range(args.assets))
+        )
+        asset_ids = [row[0] for row in conn.execute("SELECT id FROM portfolio WHERE username=?", (BENCH_USER,))]
+
+    rng = np.random.default_rng(0)
+    walk = 1000 * np.cumprod(1 + rng.normal(0, 0.01, (args.days, args.assets)), axis=0)
+    t0 = time.perf_counter()
+    record_valuations(
+        (asset_id, (today - args.days + 1 + d) * 86400, walk[d, a])
+        for d in range(args.days) for a, asset_id in enumerate(asset_ids)
+    )
+    print(f"Ingested {args.days * args.assets:,} points in {time.perf_counter() - t0:.2f}s")
+
+    samples = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        history = _load_history(BENCH_USER, args.days, today)
+        totals = portfolio_value_series(history)
+        resample(history['days'], totals, 'W')
+        resample(history['days'], totals, 'M')
+        samples.append((time.perf_counter() - t0) * 1000)
+    print(f"load + aggregate: p50 {statistics.median(samples):.1f} ms, max {max(samples):.1f} ms "
+          f"({args.assets} assets x {args.days} days)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+⏱️ Cold-start import time per entry point
+
+Runs each scenario in a fresh interpreter under ``python -X importtime``
+and reports the total import time plus the heaviest packages.
+The login screen should only pay for Streamlit and the standard library;
+pandas arrives with the dashboard and Plotly with the first chart.
+
+    python benchmarks/bench_import_time.py --repeat 5
+    python benchmarks/bench_import_time.py --save import_times.json
+    python benchmarks/bench_import_time.py --baseline import_times.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scenario -> modules imported (each in a clean interpreter)
+SCENARIOS = {
+    'login screen': ['app'],
+    'dashboard': ['app', 'dashboard'],
+    'analytics charts': ['app', 'dashboard', 'charts'],
+    'batch job': ['batch'],
+}
+REGRESSION_TOLERANCE = 1.25  # fail --baseline when 25% slower
+
+
+def measure(modules):
+    """(total seconds, {root package: seconds}) for one cold import.
+
+    Each module's self time is charged to its root package, so the
+    per-package figures add up to the total.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(own) / 1e6
+    return sum(packages.values()), packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=3, help="runs per scenario (best is kept)")
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare against a saved JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for scenario, modules in SCENARIOS.items():
+        runs = [measure(modules) for _ in range(args.repeat)]
+        total, packages = min(runs, key=lambda run: run[0])
+        results[scenario] = total
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{scenario:18s} {total * 1000:8.1f} ms   "
+              + ", ".join(f"{name} {seconds * 1000:.0f}" for name, seconds in heaviest))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = {
+            scenario: (baseline[scenario], total) for scenario, total in results.items()
+            if scenario in baseline and total > baseline[scenario] * REGRESSION_TOLERANCE
+        }
+        for scenario, (before, after) in slower.items():
+            print(f"REGRESSION {scenario}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        sys.exit(1 if slower else 0)
+
+
+if __name__ == '__main__':
+    main()
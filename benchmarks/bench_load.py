@@ -0,0 +1,282 @@
+"""
+⏱️ Concurrent-user load simulation
+
+Simulates N signed-in users against one database. By default each user
+runs in its own thread, the way the Streamlit server runs one script
+thread per session. With --processes the users are split across worker
+processes sharing the database file, like several app replicas. Every
+user logs in, then loops over weighted actions with exponential think
+times: dashboard, analytics, add/delete an asset and a prediction. Each
+action makes the same service calls as the page it stands for, and every
+rerun revalidates the session token. The script ramps through the --users
+levels and reports per-action throughput, latency percentiles, "database
+is locked" and pool-timeout errors, and resident memory per session. The
+first level that misses the p95 target or fails requests is reported as
+the scaling ceiling.
+
+    python benchmarks/bench_load.py --users 25 50 100 200 --duration 30
+    python benchmarks/bench_load.py --users 200 --processes 4
+    python benchmarks/bench_load.py --users 50 --think 0   # closed loop, no pauses
+"""
+
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# action -> share of a user's clicks after login
+ACTION_WEIGHTS = {
+    'dashboard': 0.40,
+    'analytics': 0.20,
+    'add asset': 0.15,
+    'delete asset': 0.10,
+    'prediction': 0.15,
+}
+REPORT_CURRENCIES = ('INR', 'INR', 'INR', 'USD')  # most users report in the base currency
+P95_TARGET_MS = 500
+RSS_SAMPLE_SECONDS = 0.25
+
+# ============================================
+# 🧍 SIMULATED SESSIONS
+# ============================================
+
+def _dashboard(user, currency):
+    from portfolio import count_holdings, get_holdings_page, get_portfolio_summary
+
+    get_portfolio_summary(user, currency)
+    get_holdings_page(user)
+    count_holdings(user)
+
+
+def _analytics(user, currency):
+    from charts import create_growth_chart, create_pie_chart
+    from figures import cached_figure
+    from fx import convert_history
+    from portfolio import get_portfolio_summary
+    from risk import user_risk_report
+    from timeseries import load_history, portfolio_value_series, rolling_returns
+
+    summary = get_portfolio_summary(user, currency)
+    history = convert_history(load_history(user), currency)
+    series = portfolio_value_series(history)
+    cached_figure('pie', create_pie_chart, {'by_type': summary['by_type'], 'currency': currency})
+    cached_figure('growth', create_growth_chart, history['days'], series, currency)
+    rolling_returns(series, 30)
+    user_risk_report(user, currency=currency)
+
+
+def _prediction(user, currency, years):
+    from advice import user_advice
+    from portfolio import get_portfolio_summary, predict_portfolio_value
+
+    summary = get_portfolio_summary(user, currency)
+    if summary['total_value'] > 0:
+        predict_portfolio_value(summary, years)
+    user_advice(user, currency)
+
+
+def classify(exc):
+    """'locked', 'pool timeout' or 'error' for a failed action"""
+    from database import PoolTimeout
+
+    if isinstance(exc, PoolTimeout):
+        return 'pool timeout'
+    if 'locked' in str(exc).lower() or 'busy' in str(exc).lower():
+        return 'locked'
+    return 'error'
+
+
+def simulate_user(user, deadline, think, seed, samples):
+    """Log in, then act until ``deadline``; appends (action, seconds, failure) to ``samples``"""
+    from auth import authenticate_user
+    from portfolio import ASSET_TYPES, add_asset, delete_assets
+    from sessions import create_session, validate_session
+    from synthetic import PASSWORD
+
+    rng = np.random.default_rng(seed)
+    currency = REPORT_CURRENCIES[seed % len(REPORT_CURRENCIES)]
+    actions, weights = list(ACTION_WEIGHTS), np.array(list(ACTION_WEIGHTS.values()))
+    added = []
+    token = None
+
+    def run(action):
+        nonlocal token
+        t0 = time.perf_counter()
+        failure = None
+        try:
+            if action == 'login':
+                if not authenticate_user(user, PASSWORD, client=f"sim-{seed}"):
+                    raise RuntimeError("login rejected")
+                token = create_session(user)
+                return
+            if validate_session(token) != user:  # restore_session on every rerun
+                raise RuntimeError("session lost")
+            if action == 'dashboard':
+                _dashboard(user, currency)
+            elif action == 'analytics':
+                _analytics(user, currency)
+            elif action == 'add asset':
+                added.append(add_asset(user, f"Load {seed}-{len(added)}", str(rng.choice(ASSET_TYPES)),
+                                       float(rng.uniform(1000, 100000)), 'INR'))
+            elif action == 'delete asset':
+                if added:
+                    delete_assets(user, [added.pop()])
+            else:
+                _prediction(user, currency, int(rng.integers(1, 21)))
+        except Exception as e:
+            failure = classify(e)
+        finally:
+            samples.append((action, time.perf_counter() - t0, failure))
+
+    run('login')
+    while time.monotonic() < deadline:
+        if think > 0:
+            time.sleep(min(rng.exponential(think), max(0.0, deadline - time.monotonic())))
+            if time.monotonic() >= deadline:
+                break
+        run(str(rng.choice(actions, p=weights / weights.sum())))
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def run_sessions(users, first_seed, duration, think, ramp):
+    """Run ``users`` concurrently in this process, one thread each.
+
+    Starts are spread over ``ramp`` seconds and every user stops at the
+    same deadline. Returns the samples, base and peak RSS, and pool stats.
+    """
+    from database import get_db
+
+    # Load every module up front so imports are not counted as session memory
+    for module in ('advice', 'auth', 'charts', 'figures', 'fx', 'portfolio', 'risk', 'sessions', 'timeseries'):
+        importlib.import_module(module)
+
+    get_db()
+    base = peak = rss_bytes()
+    samples = []
+    deadline = time.monotonic() + ramp + duration
+    threads = []
+    for i, user in enumerate(users):
+        threads.append(threading.Thread(target=simulate_user, daemon=True,
+                                        args=(user, deadline, think, first_seed + i, samples)))
+    for thread in threads:
+        thread.start()
+        time.sleep(ramp / len(threads))
+    while any(thread.is_alive() for thread in threads):
+        peak = max(peak, rss_bytes())
+        time.sleep(RSS_SAMPLE_SECONDS)
+    return {
+        'samples': samples,
+        'rss_base': base,
+        'rss_peak': max(peak, rss_bytes()),
+        'pool': get_db().stats(),
+    }
+
+# ============================================
+# 📊 REPORT
+# ============================================
+
+def report(level, runs, duration):
+    """Print one level's table; returns (overall p95 ms, failed actions)"""
+    samples = [sample for run in runs for sample in run['samples']]
+    print(f"{'action':14s} {'count':>7s} {'ops/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'locked':>7s} {'timeout':>8s} {'errors':>7s}")
+
+    def row(name, rows):
+        ok = np.array([seconds for _, seconds, failure in rows if failure is None]) * 1000
+        failures = [failure for _, _, failure in rows if failure is not None]
+        p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (np.nan,) * 3
+        print(f"{name:14s} {len(rows):7d} {len(rows) / duration:8.1f} {p50:8.1f} {p95:8.1f} {p99:8.1f} "
+              f"{failures.count('locked'):7d} {failures.count('pool timeout'):8d} {failures.count('error'):7d}")
+        return p95, len(failures)
+
+    for action in ['login', *ACTION_WEIGHTS]:
+        row(action, [sample for sample in samples if sample[0] == action])
+    p95, failed = row('all', samples)
+
+    grown = sum(run['rss_peak'] - run['rss_base'] for run in runs)
+    total = sum(run['rss_peak'] for run in runs)
+    waits = sum(run['pool']['waits'] for run in runs)
+    wait_time = sum(run['pool']['wait_time'] for run in runs)
+    print(f"memory: {total / 2**20:,.0f} MB peak RSS, +{grown / 2**20:,.1f} MB under load, "
+          f"{grown / level / 2**10:,.0f} KB per session (growth / users, shared caches included)")
+    print(f"pool: {waits:,} checkouts waited, {wait_time / max(waits, 1) * 1000:.1f} ms average wait")
+    return p95, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, nargs='+', default=[25, 50, 100, 200],
+                        help="concurrent users per level")
+    parser.add_argument('--duration', type=float, default=20, help="seconds of load per level")
+    parser.add_argument('--think', type=float, default=2.0, help="mean think time between clicks (s)")
+    parser.add_argument('--ramp', type=float, default=2.0, help="seconds over which users log in")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes sharing the database")
+    parser.add_argument('--holdings', type=int, default=30, help="seeded holdings per user")
+    parser.add_argument('--days', type=int, default=180, help="days of seeded valuation history")
+    parser.add_argument('--p95-target', type=float, default=P95_TARGET_MS, help="ms, across all actions")
+    args = parser.parse_args()
+
+    os.environ['FINSIGHT_DB'] = os.path.join(tempfile.mkdtemp(prefix='finsight_bench_'), 'bench.db')
+    from synthetic import generate, username
+
+    t0 = time.perf_counter()
+    data = generate(max(args.users), args.holdings, args.days)
+    print(f"Seeded {max(args.users):,} users, {data['holdings']:,} holdings, {data['points']:,} valuations "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+    # Fresh interpreters: workers must not inherit the seeding process's connections
+    pool = None
+    if args.processes > 1:
+        pool = ProcessPoolExecutor(args.processes, mp_context=multiprocessing.get_context('spawn'))
+
+    ceiling = None
+    passed = None
+    for level in sorted(args.users):
+        users = [username(i) for i in range(level)]
+        mode = f"{args.processes} processes" if pool else "threads"
+        print(f"\n=== {level} users ({mode}), think {args.think}s, {args.duration:.0f}s ===")
+        if pool:
+            shares = [users[p::args.processes] for p in range(args.processes)]
+            futures = [pool.submit(run_sessions, share, level * p, args.duration, args.think, args.ramp)
+                       for p, share in enumerate(shares) if share]
+            runs = [future.result() for future in futures]
+        else:
+            runs = [run_sessions(users, 0, args.duration, args.think, args.ramp)]
+        p95, failed = report(level, runs, args.duration + args.ramp)
+        if p95 > args.p95_target or failed:
+            ceiling = level
+            print(f"-> over the limit: p95 {p95:.0f} ms (target {args.p95_target:.0f}), {failed} failed actions")
+            break
+        passed = level
+
+    if pool:
+        pool.shutdown()
+    if ceiling is None:
+        print(f"\nNo ceiling up to {max(args.users)} users")
+    elif passed is None:
+        print(f"\nAlready over the limit at {ceiling} concurrent users")
+    else:
+        print(f"\nScaling ceiling between {passed} and {ceiling} concurrent users")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+⏱️ Monte Carlo projection latency
+
+Times simulate_projection for a six-type portfolio across horizons.
+Target: well under 100 ms for 10k paths at any horizon from 1 to 20 years.
+
+    python benchmarks/bench_projections.py --paths 10000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from projections import ASSET_ASSUMPTIONS, simulate_projection  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    allocation = {t: 100000.0 * (i + 1) for i, t in enumerate(ASSET_ASSUMPTIONS)}
+    print(f"{'years':>6} {'p50 ms':>10} {'max ms':>10}")
+    for years in (1, 5, 10, 20):
+        samples = []
+        for i in range(args.repeat):
+            t0 = time.perf_counter()
+            simulate_projection(allocation, years=years, n_paths=args.paths, seed=i)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"{years:>6} {statistics.median(samples):>10.2f} {max(samples):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
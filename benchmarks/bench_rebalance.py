@@ -0,0 +1,56 @@
+"""
+⏱️ Nightly rebalancing batch across many users
+
+Times the minimal-trade solver and the batched mean-variance optimiser
+on a (users x asset types) matrix, the shape a nightly job sees when it
+rebalances every portfolio at once. Default: 100k users.
+
+    python benchmarks/bench_rebalance.py --users 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from rebalance import ASSET_TYPES, TARGET_PRESETS, mean_variance_weights, solve_rebalance  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--mv-users', type=int, default=10000, help="users given their own covariance matrix")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_types = len(ASSET_TYPES)
+    current = rng.lognormal(10, 1.5, (args.users, n_types)) * (rng.random((args.users, n_types)) > 0.3)
+    presets = np.array([[TARGET_PRESETS[name][t] for t in ASSET_TYPES] for name in TARGET_PRESETS])
+    targets = presets[rng.integers(len(presets), size=args.users)]
+    contribution = rng.choice([0.0, 10000.0], size=args.users)
+
+    t0 = time.perf_counter()
+    trades = solve_rebalance(current, targets, contribution=contribution)
+    elapsed = time.perf_counter() - t0
+    traded = np.count_nonzero(np.abs(trades) >= 0.01, axis=1)
+    print(f"solve_rebalance:       {elapsed * 1000:8.1f} ms for {args.users:,} users "
+          f"({args.users / elapsed:,.0f} users/s, {traded.mean():.1f} trades/user)")
+
+    mu = rng.normal(0.08, 0.04, (args.mv_users, n_types))
+    factors = rng.normal(0, 0.1, (args.mv_users, n_types, n_types))
+    cov = factors @ factors.transpose(0, 2, 1) + 0.01 * np.eye(n_types)
+    t0 = time.perf_counter()
+    weights = mean_variance_weights(mu, cov)
+    elapsed = time.perf_counter() - t0
+    print(f"mean_variance_weights: {elapsed * 1000:8.1f} ms for {args.mv_users:,} users "
+          f"({args.mv_users / elapsed:,.0f} users/s, max weight sum error "
+          f"{np.abs(weights.sum(axis=1) - 1).max():.1e})")
+
+
+if __name__ == '__main__':
+    main()
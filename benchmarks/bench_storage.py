@@ -0,0 +1,510 @@
+"""
+⏱️ Storage backend conformance and performance
+
+Runs one suite against every backend: behaviour checks for users,
+sessions, portfolio writes and pages, summaries, history, batch
+summaries, exports, currencies, the holdings ledger and transactions,
+then timings for the hot paths. Each backend runs in a fresh interpreter with FINSIGHT_DB_URL set.
+SQLite always runs on a temporary file; --postgres adds a server (a local
+stand-in is fine, e.g. ``docker run -e POSTGRES_PASSWORD=pw -p 5432:5432
+postgres``), used through a throwaway schema that is dropped afterwards.
+
+    python benchmarks/bench_storage.py --rows 20000
+    python benchmarks/bench_storage.py --postgres postgresql://postgres:pw@localhost/postgres
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from datetime import date
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'correct horse'
+
+# ============================================
+# ✅ CONFORMANCE CHECKS
+# ============================================
+
+def check_users():
+    from auth import authenticate_user, register_user
+
+    assert register_user('alice', 'alice@example.com', PASSWORD)[0]
+    ok, message = register_user('alice', 'other@example.com', PASSWORD)
+    assert not ok and 'already exists' in message, message
+    assert authenticate_user('alice', PASSWORD)
+    assert not authenticate_user('alice', 'wrong password')
+    assert not authenticate_user('nobody', PASSWORD)
+
+
+def check_sessions():
+    from sessions import create_session, revoke_session, revoke_user_sessions, session_cache, validate_session
+
+    token = create_session('alice')
+    assert validate_session(token) == 'alice'
+    session_cache().clear()
+    assert validate_session(token) == 'alice', "not found in the sessions table"
+    assert validate_session(token[:-2] + 'xx') is None
+    revoke_session(token)
+    assert validate_session(token) is None
+    other = create_session('alice')
+    revoke_user_sessions('alice')
+    session_cache().clear()
+    assert validate_session(other) is None
+
+
+def check_portfolio_writes():
+    from portfolio import add_asset, delete_asset, delete_assets, get_portfolio, get_revision, update_assets
+
+    before = get_revision('bob')
+    first = add_asset('bob', 'Nifty ETF', 'Stock', 1000.0)
+    second = add_asset('bob', 'Bitcoin', 'Crypto', 2500.5)
+    stranger = add_asset('carol', 'Gold coin', 'Gold', 700.0)
+    assert second > first
+    assert get_revision('bob') == before + 2
+
+    df = get_portfolio('bob')
+    assert df['ID'].tolist() == [first, second]
+    assert df['Value'].tolist() == [1000.0, 2500.5]
+    assert str(df['Date Added'].dtype).startswith('datetime64')
+
+    changed = update_assets('bob', [
+        {'id': first, 'current_value': 1100.0},
+        {'id': second, 'asset_name': 'BTC', 'asset_type': None},
+        {'id': stranger, 'current_value': 1.0},  # not bob's: untouched
+    ])
+    assert changed == 2, changed
+    df = get_portfolio('bob')
+    assert df['Value'].tolist() == [1100.0, 2500.5]
+    assert df['Asset Name'].tolist() == ['Nifty ETF', 'BTC'] and df['Type'].tolist() == ['Stock', 'Crypto']
+
+    assert delete_assets('bob', [second, stranger]) == 1
+    delete_asset(first)
+    assert get_portfolio('bob').empty
+    assert get_portfolio('carol')['Value'].tolist() == [700.0]
+
+
+def check_import_and_pages():
+    import pandas as pd
+
+    from portfolio import count_holdings, get_holdings_page, get_portfolio, import_assets
+
+    names = [f"Asset {i:03d}" for i in range(60)] + [f"asset {i:03d}" for i in range(60)] + ['100% Gold', 'A_B']
+    frame = pd.DataFrame({
+        'Asset Name': names,
+        'Type': ['Stock', 'Gold', 'Crypto'] * (len(names) // 3) + ['Gold', 'Stock'][:len(names) % 3],
+        'Value (₹)': [float(100 + i) for i in range(len(names))],  # pre-currency export layout
+        'Date Added': ['2024-01-02'] * len(names),
+    })
+    frame.loc[len(frame)] = ['Bad row', 'Spaceship', 5.0, '2024-01-02']
+    inserted, errors = import_assets('dave', frame, chunk_size=50)
+    assert inserted == len(names) and errors['Row'].tolist() == [len(names) + 1], (inserted, errors)
+
+    stored = get_portfolio('dave')
+    expected = sorted(zip(stored['Asset Name'], stored['ID']), key=lambda item: (item[0].encode(), item[1]))
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_holdings_page('dave', sort='asset_name', cursor=cursor, limit=25)
+        seen.extend(zip(page['Asset Name'], page['ID']))
+        if cursor is None:
+            break
+    assert seen == expected, "asset_name order differs from byte order"
+
+    page, _ = get_holdings_page('dave', sort='current_value', descending=True, limit=3)
+    assert page['Value'].tolist() == sorted(stored['Value'], reverse=True)[:3]
+    assert count_holdings('dave', name_query='ASSET 00') == 20, "name search must ignore case"
+    assert count_holdings('dave', name_query='%') == 1, "LIKE wildcards must be escaped"
+    assert count_holdings('dave', name_query='_') == 1
+    assert count_holdings('dave', asset_types=['Gold']) == int((stored['Type'] == 'Gold').sum())
+    assert count_holdings('dave', date_from=date(2024, 1, 2), date_to=date(2024, 1, 2)) == len(names)
+    assert count_holdings('dave', date_from=date(2024, 1, 3)) == 0
+
+
+def check_summary():
+    from portfolio import get_portfolio, get_portfolio_summary
+
+    stored = get_portfolio('dave')
+    summary = get_portfolio_summary('dave')
+    assert summary['count'] == len(stored)
+    assert abs(summary['total_value'] - stored['Value'].sum()) < 1e-6
+    by_type = summary['by_type'].set_index('Type')
+    for asset_type, values in stored.groupby('Type')['Value']:
+        assert by_type.loc[asset_type, 'Count'] == len(values)
+        assert abs(by_type.loc[asset_type, 'Total Value'] - values.sum()) < 1e-6
+
+
+def check_history():
+    import numpy as np
+
+    from portfolio import add_asset
+    from timeseries import load_history, record_valuations, to_day
+
+    today = to_day()
+    asset_id = add_asset('erin', 'Index fund', 'Mutual Fund', 100.0)
+    record_valuations([(asset_id, (today - 10) * 86400, 80.0), (asset_id, (today - 5) * 86400, 90.0)])
+    record_valuations([(asset_id, (today - 5) * 86400, 95.0)])  # same day: replaces 90
+    history = load_history('erin', days=15, end=today)
+    values = history['values'][:, list(history['asset_ids']).index(asset_id)]
+    # Window is today-14 .. today
+    assert values[0] == 0 and values[3] == 0, "no value before the first valuation"
+    assert values[4] == 80.0 and values[8] == 80.0, "last value carried forward"
+    assert values[9] == 95.0 and values[-1] == 100.0, values
+    assert np.isfinite(values).all()
+
+
+def check_batch():
+    from auth import register_user
+    from batch import load_summary, run_batch
+    from portfolio import add_asset
+
+    register_user('dave', 'dave@example.com', PASSWORD)  # the job walks the users table
+    stats = run_batch(job='conformance', workers=1, restart=True)
+    assert stats['processed'] >= 1
+    summary = load_summary('dave')
+    assert summary is not None and summary['count'] > 0 and 'advice' in summary
+    add_asset('dave', 'Late asset', 'Others', 1.0)
+    assert load_summary('dave') is None, "summary must go stale when the revision moves"
+
+
+def check_export():
+    from export import iter_portfolio_chunks, write_export
+    from portfolio import get_portfolio
+
+    stored = get_portfolio('dave')
+    chunks = list(iter_portfolio_chunks('dave', chunk_size=7))
+    assert all(len(chunk) == 7 for chunk in chunks[:-1])
+    assert [row[0] for chunk in chunks for row in chunk] == sorted(stored['ID'].tolist())
+    everyone = [row for chunk in iter_portfolio_chunks(None, chunk_size=50) for row in chunk]
+    assert [row[1] for row in everyone] == sorted(row[1] for row in everyone)
+    out = io.BytesIO()
+    assert write_export(out, 'csv', username='dave') == len(stored)
+
+
+def check_currencies():
+    import pandas as pd
+
+    from fx import convert, convert_history, record_rates
+    from portfolio import add_asset, get_portfolio, get_portfolio_summary, import_assets, update_assets
+    from timeseries import load_history, record_valuations, to_day
+
+    today = to_day()
+    try:
+        add_asset('frank', 'S&P 500 ETF', 'Stock', 100.0, 'USD')
+        raise AssertionError("holding accepted without a USD rate")
+    except ValueError:
+        pass
+    assert record_rates([('USD', (today - 10) * 86400, 80.0), ('USD', None, 83.0), ('EUR', None, 90.0)]) == 3
+    usd = add_asset('frank', 'S&P 500 ETF', 'Stock', 100.0, 'USD')
+    add_asset('frank', 'Nifty ETF', 'Stock', 1000.0)
+    assert get_portfolio('frank')['Currency'].tolist() == ['USD', 'INR']
+
+    summary = get_portfolio_summary('frank')
+    assert summary['currency'] == 'INR' and abs(summary['total_value'] - 9300.0) < 1e-6, summary
+    assert summary['by_type'].set_index('Type').loc['Stock', 'Count'] == 2
+    in_usd = get_portfolio_summary('frank', 'USD')
+    assert abs(in_usd['total_value'] - (100.0 + 1000.0 / 83.0)) < 1e-6, in_usd
+    assert abs(convert([90.0], ['EUR'], 'USD')[0] - 90.0 * 90.0 / 83.0) < 1e-9
+
+    record_rates([('USD', None, 84.0)])  # a new rate must reach cached summaries
+    assert abs(get_portfolio_summary('frank')['total_value'] - 9400.0) < 1e-6
+
+    record_valuations([(usd, (today - 10) * 86400, 100.0)])
+    history = convert_history(load_history('frank', days=15, end=today))
+    values = history['values'][:, list(history['asset_ids']).index(usd)]
+    assert values[3] == 0 and values[4] == 8000.0 and values[-1] == 8400.0, values
+
+    try:
+        update_assets('frank', [{'id': usd, 'currency': 'GBP'}])
+        raise AssertionError("currency without a rate accepted")
+    except ValueError:
+        pass
+    inserted, errors = import_assets('frank', pd.DataFrame({
+        'Asset Name': ['Bund', 'Sovereign'], 'Type': ['Others', 'Gold'],
+        'Value': [10.0, 5.0], 'Currency': ['eur', 'GBP'],
+    }))
+    assert inserted == 1 and errors['Row'].tolist() == [2], errors
+
+
+def check_ledger():
+    import pandas as pd
+
+    from auth import register_user
+    from database import get_db
+    from ledger import compact, holdings_as_of, ledger_events
+    from portfolio import add_asset, delete_asset, get_portfolio_as_of, import_assets, update_assets
+
+    register_user('grace', 'grace@example.com', PASSWORD)
+    inserted, _ = import_assets('grace', pd.DataFrame({
+        'Asset Name': ['Old fund', 'Newer fund'], 'Type': ['Mutual Fund', 'Mutual Fund'],
+        'Value': [100.0, 200.0], 'Date Added': ['2020-03-01', '2021-06-01'],
+    }))
+    assert inserted == 2
+    kept = add_asset('grace', 'Index', 'Stock', 1000.0)
+    gone = add_asset('grace', 'Coins', 'Gold', 50.0)
+    update_assets('grace', [{'id': kept, 'current_value': 1500.0}, {'id': gone, 'asset_type': 'Others'}])
+    delete_asset(gone)
+    kinds = [event[2] for event in ledger_events('grace')]
+    assert kinds == ['delete', 'update', 'revalue', 'add', 'add', 'add', 'add'], kinds
+
+    with get_db().connection() as conn:
+        grouped = sorted(conn.execute(
+            "SELECT username, asset_type, currency, SUM(current_value), COUNT(*) "
+            "FROM portfolio GROUP BY username, asset_type, currency"
+        ).fetchall())
+        snapshots = sorted(conn.execute(
+            "SELECT username, asset_type, currency, total_value, asset_count FROM holding_snapshots"
+        ).fetchall())
+    assert [(*row[:3], round(row[3], 6), row[4]) for row in grouped] == \
+        [(*row[:3], round(row[3], 6), row[4]) for row in snapshots], (grouped, snapshots)
+
+    assert [row[1] for row in holdings_as_of('grace', date(2020, 12, 31))] == ['Old fund']
+    now = get_portfolio_as_of('grace', date.today())
+    assert now['Asset Name'].tolist() == ['Old fund', 'Newer fund', 'Index'], now
+    assert now['Value'].tolist() == [100.0, 200.0, 1500.0]
+
+    early = holdings_as_of('grace', date(2020, 12, 31))
+    assert compact(checkpoint_events=1)['checkpoints'] >= 1
+    assert holdings_as_of('grace', date(2020, 12, 31)) == early
+    assert [row[1] for row in holdings_as_of('grace', date.today())] == ['Old fund', 'Newer fund', 'Index']
+    add_asset('grace', 'Later', 'Crypto', 5.0)
+    assert compact(checkpoint_events=1, retain_days=-1)['pruned'] > 0  # prune everything checkpointed
+    assert [row[1] for row in holdings_as_of('grace', date.today())][-1] == 'Later'
+    try:
+        holdings_as_of('grace', date(2020, 12, 31))
+        raise AssertionError("read before the pruned checkpoint")
+    except LookupError:
+        pass
+
+
+def check_transactions():
+    from database import get_db
+
+    db = get_db()
+    try:
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO batch_runs (job, started_at, updated_at) VALUES ('rollback', 1, 1)")
+            raise KeyError('abort')
+    except KeyError:
+        pass
+    with db.transaction() as outer:
+        outer.execute("INSERT INTO batch_runs (job, started_at, updated_at) VALUES ('nested', 1, 1)")
+        with db.transaction() as inner:
+            assert inner is outer
+    with db.connection() as conn:
+        jobs = {row[0] for row in conn.execute("SELECT job FROM batch_runs")}
+        assert conn.execute("SELECT '100%', ?", ('?',)).fetchone() == ('100%', '?')
+    assert 'nested' in jobs and 'rollback' not in jobs
+    try:
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO batch_runs (job, started_at, updated_at) VALUES ('nested', 1, 1)")
+        raise AssertionError("duplicate key accepted")
+    except db.IntegrityError:
+        pass
+
+    with db.snapshot() as conn:
+        before = conn.execute("SELECT COUNT(*) FROM batch_runs").fetchone()[0]
+        writer = threading.Thread(target=_insert_job, args=(db, 'concurrent'))
+        writer.start()
+        writer.join()
+        assert conn.execute("SELECT COUNT(*) FROM batch_runs").fetchone()[0] == before, "snapshot moved"
+    stats = db.stats()
+    assert stats['in_use'] == 0 and stats['open'] <= stats['pool_size'], stats
+
+
+def _insert_job(db, job):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO batch_runs (job, started_at, updated_at) VALUES (?, 1, 1)", (job,))
+
+
+CHECKS = [check_users, check_sessions, check_portfolio_writes, check_import_and_pages, check_summary,
+          check_history, check_batch, check_export, check_currencies, check_ledger, check_transactions]
+
+# ============================================
+# ⏱️ TIMINGS
+# ============================================
+
+def timed(timings, name, fn, repeat=1):
+    """Best of ``repeat`` runs of ``fn`` in seconds"""
+    best = min(_elapsed(fn) for _ in range(repeat))
+    timings[name] = best
+    return best
+
+
+def _elapsed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def run_timings(rows, threads):
+    import numpy as np
+    import pandas as pd
+
+    from export import iter_portfolio_chunks
+    from portfolio import (ASSET_TYPES, add_asset, count_holdings, get_holdings_page, import_assets,
+                           invalidate_portfolio, portfolio_cache)
+    from sessions import create_session, session_cache, validate_session
+    from timeseries import history_cache, load_history, record_valuations, to_day
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'Asset Name': [f"Holding {i}" for i in range(rows)],
+        'Type': rng.choice(ASSET_TYPES, rows),
+        'Value': rng.uniform(100, 100000, rows).round(2),
+    })
+    timings = {}
+    timed(timings, f"import {rows} rows", lambda: import_assets('perf', frame))
+
+    def cold(fn):
+        def run():
+            portfolio_cache().clear()
+            fn()
+        return run
+
+    from portfolio import get_portfolio, get_portfolio_summary
+    timed(timings, "get_portfolio (cold)", cold(lambda: get_portfolio('perf')), repeat=5)
+    timed(timings, "summary (cold)", cold(lambda: get_portfolio_summary('perf')), repeat=5)
+    timed(timings, "count by name (cold)", cold(lambda: count_holdings('perf', name_query='holding 99')), repeat=5)
+
+    def walk_pages():
+        cursor, pages = None, 0
+        while pages < 40:
+            _, cursor = get_holdings_page('perf', sort='current_value', cursor=cursor)
+            pages += 1
+            if cursor is None:
+                break
+    timed(timings, "40 holdings pages (cold)", cold(walk_pages), repeat=3)
+
+    ids = get_portfolio('perf')['ID'].to_numpy()[:500]
+    today = to_day()
+    points = [(int(asset_id), (today - d) * 86400, 100.0 + d) for d in range(30) for asset_id in ids]
+    timed(timings, f"record {len(points)} valuations", lambda: record_valuations(points))
+
+    def history():
+        history_cache().clear()
+        load_history('perf')
+    timed(timings, "load_history (cold)", history, repeat=3)
+    timed(timings, f"stream {rows} rows", lambda: sum(len(c) for c in iter_portfolio_chunks('perf')), repeat=3)
+
+    tokens = [create_session(f"user_{i}") for i in range(200)]
+
+    def validate_uncached():
+        session_cache().clear()
+        for token in tokens:
+            validate_session(token)
+    timed(timings, "validate 200 sessions (uncached)", validate_uncached, repeat=3)
+
+    writes = 100
+
+    def writer(worker):
+        for i in range(writes):
+            add_asset(f"writer_{worker}", f"Asset {i}", 'Stock', 10.0 + i)
+
+    def concurrent_writes():
+        pool = [threading.Thread(target=writer, args=(w,)) for w in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    elapsed = timed(timings, f"{threads * writes} add_asset on {threads} threads", concurrent_writes)
+    timings[f"add_asset per second, {threads} threads"] = threads * writes / elapsed
+    for worker in range(threads):
+        invalidate_portfolio(f"writer_{worker}")
+    return timings
+
+# ============================================
+# 🚀 RUNNER
+# ============================================
+
+def run_child(args):
+    """Run the suite in this process against FINSIGHT_DB_URL; print JSON"""
+    results = {'checks': [], 'timings': {}}
+    for check in CHECKS:
+        try:
+            check()
+            results['checks'].append([check.__name__, None])
+        except Exception:
+            results['checks'].append([check.__name__, traceback.format_exc(limit=3)])
+    if not args.skip_timings:
+        results['timings'] = run_timings(args.rows, args.threads)
+    from database import get_db
+    results['backend'] = get_db().backend
+    print(json.dumps(results))
+
+
+def with_search_path(url, schema):
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}options={quote(f'-c search_path={schema}')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--postgres', help="PostgreSQL URL to test besides SQLite")
+    parser.add_argument('--rows', type=int, default=20000, help="holdings for the timings")
+    parser.add_argument('--threads', type=int, default=8, help="concurrent writers")
+    parser.add_argument('--skip-timings', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return run_child(args)
+
+    targets = {'sqlite': f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='finsight-bench-'), 'bench.db')}"}
+    schema = None
+    if args.postgres:
+        import psycopg
+
+        schema = f"finsight_bench_{uuid.uuid4().hex[:8]}"
+        with psycopg.connect(args.postgres, autocommit=True) as conn:
+            conn.execute(f"CREATE SCHEMA {schema}")
+        targets['postgresql'] = with_search_path(args.postgres, schema)
+
+    child_args = [sys.executable, os.path.abspath(__file__), '--child', '--rows', str(args.rows),
+                  '--threads', str(args.threads)] + (['--skip-timings'] if args.skip_timings else [])
+    reports = {}
+    try:
+        for name, url in targets.items():
+            env = dict(os.environ, FINSIGHT_DB_URL=url)
+            result = subprocess.run(child_args, env=env, cwd=ROOT, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{name}: suite crashed\n{result.stderr}")
+                sys.exit(1)
+            reports[name] = json.loads(result.stdout.strip().splitlines()[-1])
+    finally:
+        if schema:
+            with psycopg.connect(args.postgres, autocommit=True) as conn:
+                conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+    failed = False
+    for name, report in reports.items():
+        passed = sum(error is None for _, error in report['checks'])
+        print(f"{name}: {passed}/{len(report['checks'])} conformance checks passed")
+        for check, error in report['checks']:
+            if error is not None:
+                failed = True
+                print(f"  FAIL {check}\n    " + error.strip().replace('\n', '\n    '))
+
+    if not args.skip_timings:
+        names = list(reports)
+        print(f"\n{'timing':38s}" + ''.join(f"{name:>14s}" for name in names))
+        for metric in reports[names[0]]['timings']:
+            cells = []
+            for name in names:
+                value = reports[name]['timings'].get(metric)
+                cells.append(f"{value:11.0f}/s " if 'per second' in metric
+                             else f"{value * 1000:11.1f} ms")
+            print(f"{metric:38s}" + ''.join(f"{cell:>14s}" for cell in cells))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
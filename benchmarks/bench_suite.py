@@ -0,0 +1,461 @@
+"""
+⏱️ Benchmark suite with baseline regression checks
+
+Seeds a temporary database with synthetic.py (N users x M holdings plus
+daily valuation history), then times the public service functions one
+at a time (micro) and whole page loads, including headless Streamlit
+AppTest reruns (e2e). Benchmarks named "(cold)" clear every in-process
+cache first. Results can be saved as JSON; compared with a saved
+baseline, any benchmark whose median is more than --threshold slower is
+reported and the exit status is 1.
+
+    python benchmarks/bench_suite.py --save baseline.json
+    python benchmarks/bench_suite.py --baseline baseline.json --threshold 0.25
+    python benchmarks/bench_suite.py --only chart --repeat 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+REGRESSION_THRESHOLD = 0.25  # flag medians more than 25% slower than the baseline
+E2E_REPEAT_DIVISOR = 4  # AppTest reruns are slow; they get a quarter of --repeat
+
+# ============================================
+# 🗂️ REGISTRY
+# ============================================
+
+BENCHMARKS = []
+
+
+def benchmark(name, kind='micro', cold=False):
+    """Register ``setup(ctx) -> callable``; the callable is what gets timed"""
+    def register(setup):
+        BENCHMARKS.append({'name': f"{name} (cold)" if cold else name, 'kind': kind,
+                           'cold': cold, 'setup': setup})
+        return setup
+    return register
+
+
+def clear_caches():
+    from cache import cache_stats, get_cache
+
+    for name in cache_stats():
+        get_cache(name).clear()
+
+
+def build_context(user):
+    """Shared inputs for the micro benchmarks, computed once"""
+    import pandas as pd
+
+    from portfolio import get_portfolio, get_portfolio_summary, predict_portfolio_value
+    from risk import user_risk_report
+    from timeseries import load_history, portfolio_value_series
+
+    holdings = get_portfolio(user)
+    history = load_history(user)
+    summary = get_portfolio_summary(user)
+    frame = pd.concat([holdings] * 20, ignore_index=True)[['Asset Name', 'Type', 'Value', 'Currency']]
+    return {
+        'user': user,
+        'holdings': holdings,
+        'summary': summary,
+        'history': history,
+        'series': portfolio_value_series(history),
+        'risk': user_risk_report(user),
+        'projection': predict_portfolio_value(summary, 10),
+        'allocation': dict(zip(summary['by_type']['Type'], summary['by_type']['Total Value'])),
+        'import_frame': frame,
+        'summary_rows': [
+            (t, c, float(group['Value'].sum()), len(group))
+            for (t, c), group in holdings.groupby(['Type', 'Currency'])
+        ],
+    }
+
+# ============================================
+# 🔬 MICRO BENCHMARKS
+# ============================================
+
+@benchmark('portfolio.get_portfolio', cold=True)
+@benchmark('portfolio.get_portfolio')
+def _get_portfolio(ctx):
+    from portfolio import get_portfolio
+    return lambda: get_portfolio(ctx['user'])
+
+
+@benchmark('portfolio.get_holdings_page', cold=True)
+def _holdings_page(ctx):
+    from portfolio import get_holdings_page
+    return lambda: get_holdings_page(ctx['user'], sort='current_value', descending=True)
+
+
+@benchmark('portfolio.count_holdings', cold=True)
+def _count_holdings(ctx):
+    from portfolio import count_holdings
+    return lambda: count_holdings(ctx['user'], asset_types=['Stock', 'Crypto'])
+
+
+@benchmark('portfolio.get_portfolio_summary', cold=True)
+@benchmark('portfolio.get_portfolio_summary')
+def _summary(ctx):
+    from portfolio import get_portfolio_summary
+    return lambda: get_portfolio_summary(ctx['user'])
+
+
+@benchmark('portfolio.get_portfolio_summary USD', cold=True)
+def _summary_usd(ctx):
+    from portfolio import get_portfolio_summary
+    return lambda: get_portfolio_summary(ctx['user'], 'USD')
+
+
+@benchmark('ledger.holdings_as_of')
+def _holdings_as_of(ctx):
+    from datetime import date, timedelta
+
+    from ledger import holdings_as_of
+    return lambda: holdings_as_of(ctx['user'], date.today() - timedelta(days=30))
+
+
+@benchmark('portfolio.validate_assets')
+def _validate(ctx):
+    from portfolio import validate_assets
+    return lambda: validate_assets(ctx['import_frame'])
+
+
+@benchmark('portfolio.predict_portfolio_value', cold=True)
+@benchmark('portfolio.predict_portfolio_value')
+def _predict(ctx):
+    from portfolio import predict_portfolio_value
+    return lambda: predict_portfolio_value(ctx['summary'], 10)
+
+
+@benchmark('projections.simulate_projection')
+def _simulate(ctx):
+    from projections import simulate_projection
+    return lambda: simulate_projection(ctx['allocation'], seed=0)
+
+
+@benchmark('advice.generate_investment_advice')
+def _advice(ctx):
+    from advice import generate_investment_advice
+    return lambda: generate_investment_advice(ctx['summary'], ctx['risk'])
+
+
+@benchmark('advice.user_advice', cold=True)
+@benchmark('advice.user_advice')
+def _user_advice(ctx):
+    from advice import user_advice
+    return lambda: user_advice(ctx['user'])
+
+
+@benchmark('advice.evaluate_advice all users')
+def _advice_all_users(ctx):
+    from advice import evaluate_advice, holdings_features
+    from database import get_db
+
+    with get_db().connection() as conn:
+        rows = conn.execute(
+            "SELECT username, asset_type, currency, total_value, asset_count FROM holding_snapshots"
+        ).fetchall()
+    return lambda: evaluate_advice(holdings_features(rows))
+
+
+@benchmark('charts.create_pie_chart')
+def _pie(ctx):
+    from charts import create_pie_chart
+    return lambda: create_pie_chart(ctx['summary'])
+
+
+@benchmark('charts.create_growth_chart')
+def _growth(ctx):
+    from charts import create_growth_chart
+    return lambda: create_growth_chart(ctx['history']['days'], ctx['series'])
+
+
+@benchmark('charts.create_projection_chart')
+def _projection_chart(ctx):
+    from charts import create_projection_chart
+    return lambda: create_projection_chart(ctx['projection'])
+
+
+@benchmark('charts.create_correlation_heatmap')
+def _heatmap(ctx):
+    from charts import create_correlation_heatmap
+    return lambda: create_correlation_heatmap(ctx['risk'])
+
+
+@benchmark('figures.data_hash')
+def _data_hash(ctx):
+    from figures import data_hash
+    return lambda: data_hash(ctx['history']['days'], ctx['series'], ctx['summary']['by_type'])
+
+
+@benchmark('timeseries.load_history', cold=True)
+def _load_history(ctx):
+    from timeseries import load_history
+    return lambda: load_history(ctx['user'])
+
+
+@benchmark('timeseries.portfolio_value_series')
+def _value_series(ctx):
+    from timeseries import portfolio_value_series
+    return lambda: portfolio_value_series(ctx['history'])
+
+
+@benchmark('timeseries.resample')
+def _resample(ctx):
+    from timeseries import resample
+    return lambda: resample(ctx['history']['days'], ctx['series'], 'W')
+
+
+@benchmark('timeseries.rolling_returns')
+def _rolling(ctx):
+    from timeseries import rolling_returns
+    return lambda: rolling_returns(ctx['series'], 30)
+
+
+@benchmark('timeseries.lttb')
+def _lttb(ctx):
+    from timeseries import lttb
+    return lambda: lttb(ctx['history']['days'], ctx['series'], 100)
+
+
+@benchmark('risk.risk_report')
+def _risk_report(ctx):
+    from risk import risk_report
+    return lambda: risk_report(ctx['history'])
+
+
+@benchmark('risk.user_risk_report', cold=True)
+def _user_risk(ctx):
+    from risk import user_risk_report
+    return lambda: user_risk_report(ctx['user'])
+
+
+@benchmark('rebalance.rebalance_plan')
+def _rebalance(ctx):
+    from rebalance import TARGET_PRESETS, rebalance_plan
+    return lambda: rebalance_plan(ctx['allocation'], TARGET_PRESETS['Balanced'])
+
+
+@benchmark('rebalance.history_targets')
+def _history_targets(ctx):
+    from rebalance import history_targets
+    return lambda: history_targets(ctx['history'])
+
+
+@benchmark('fx.convert')
+def _convert(ctx):
+    from fx import convert
+    holdings = ctx['holdings']
+    return lambda: convert(holdings['Value'].to_numpy(), holdings['Currency'].to_numpy(), 'USD')
+
+
+@benchmark('fx.convert_history')
+def _convert_history(ctx):
+    from fx import convert_history
+    return lambda: convert_history(ctx['history'], 'USD')
+
+
+@benchmark('batch.build_summary')
+def _build_summary(ctx):
+    from batch import build_summary
+    return lambda: build_summary(ctx['summary_rows'])
+
+
+@benchmark('export.export_portfolio csv')
+def _export(ctx):
+    from export import export_portfolio
+    return lambda: export_portfolio(ctx['user'], 'csv')
+
+
+@benchmark('sessions.validate_session')
+def _validate_session(ctx):
+    from sessions import create_session, validate_session
+    token = create_session(ctx['user'])
+    return lambda: validate_session(token)
+
+
+@benchmark('auth.authenticate_user')
+def _authenticate(ctx):
+    from auth import authenticate_user
+    from synthetic import PASSWORD
+    return lambda: authenticate_user(ctx['user'], PASSWORD)
+
+# ============================================
+# 🎬 END-TO-END BENCHMARKS
+# ============================================
+
+def _app_rerun(ctx, page):
+    """Time one AppTest rerun of ``page`` (None = login screen)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    if page is not None:
+        at.session_state.logged_in = True
+        at.session_state.username = ctx['user']
+    at.run()
+    if page is not None:
+        at.sidebar.radio[0].set_value(page).run()
+
+    def rerun():
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{page or 'login'} raised: {at.exception[0].value}")
+    return rerun
+
+
+@benchmark('app rerun: login screen', kind='e2e')
+def _app_login(ctx):
+    return _app_rerun(ctx, None)
+
+
+@benchmark('app rerun: dashboard', kind='e2e', cold=True)
+@benchmark('app rerun: dashboard', kind='e2e')
+def _app_dashboard(ctx):
+    return _app_rerun(ctx, "🏠 Dashboard")
+
+
+@benchmark('app rerun: analytics', kind='e2e', cold=True)
+@benchmark('app rerun: analytics', kind='e2e')
+def _app_analytics(ctx):
+    return _app_rerun(ctx, "📊 Analytics")
+
+
+@benchmark('app rerun: predictions', kind='e2e')
+def _app_predictions(ctx):
+    return _app_rerun(ctx, "🔮 Predictions")
+
+
+@benchmark('app rerun: rebalance', kind='e2e')
+def _app_rebalance(ctx):
+    return _app_rerun(ctx, "⚖️ Rebalance")
+
+
+@benchmark('analytics data pipeline', kind='e2e', cold=True)
+def _analytics_pipeline(ctx):
+    """Everything the Analytics page computes, without Streamlit"""
+    from charts import create_growth_chart, create_pie_chart
+    from fx import convert_history
+    from portfolio import get_portfolio_summary
+    from risk import user_risk_report
+    from timeseries import load_history, portfolio_value_series, rolling_returns
+
+    def run():
+        summary = get_portfolio_summary(ctx['user'], 'USD')
+        history = convert_history(load_history(ctx['user']), 'USD')
+        series = portfolio_value_series(history)
+        create_pie_chart({'by_type': summary['by_type'], 'currency': 'USD'})
+        create_growth_chart(history['days'], series, 'USD')
+        rolling_returns(series, 30)
+        user_risk_report(ctx['user'], currency='USD')
+    return run
+
+# ============================================
+# 📏 HARNESS
+# ============================================
+
+def measure(fn, repeat, cold):
+    fn()  # warm-up: imports, first-touch caches and page-ins
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        'runs': repeat,
+        'min_ms': samples[0],
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[max(0, int(len(samples) * 0.95) - 1)],
+        'mean_ms': statistics.fmean(samples),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks whose median regressed, printing each"""
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = stats['p50_ms'] / before['p50_ms'] if before['p50_ms'] else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {before['p50_ms']:.2f} ms -> {stats['p50_ms']:.2f} ms "
+                  f"({(ratio - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--holdings', type=int, default=50, help="holdings per user")
+    parser.add_argument('--days', type=int, default=365, help="days of valuation history")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per micro benchmark")
+    parser.add_argument('--only', help="run benchmarks whose name contains this text")
+    parser.add_argument('--kind', choices=['micro', 'e2e'], help="run one kind only")
+    parser.add_argument('--save', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare against a saved JSON file")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown of the median before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    os.environ['FINSIGHT_DB'] = os.path.join(tempfile.mkdtemp(prefix='finsight_bench_'), 'bench.db')
+    from synthetic import generate, username
+
+    t0 = time.perf_counter()
+    data = generate(args.users, args.holdings, args.days, args.seed)
+    print(f"Seeded {args.users:,} users, {data['holdings']:,} holdings, {data['points']:,} valuations "
+          f"in {time.perf_counter() - t0:.1f}s")
+    ctx = build_context(username(args.users // 2))
+
+    selected = [
+        b for b in BENCHMARKS
+        if (args.only is None or args.only in b['name']) and (args.kind is None or b['kind'] == args.kind)
+    ]
+    results = {}
+    print(f"{'benchmark':48s} {'p50 ms':>10} {'p95 ms':>10} {'min ms':>10}")
+    for bench in sorted(selected, key=lambda b: (b['kind'] == 'e2e', b['name'])):
+        repeat = args.repeat if bench['kind'] == 'micro' else max(3, args.repeat // E2E_REPEAT_DIVISOR)
+        stats = measure(bench['setup'](ctx), repeat, bench['cold'])
+        results[bench['name']] = {'kind': bench['kind'], **stats}
+        print(f"{bench['name']:48s} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} {stats['min_ms']:>10.2f}")
+
+    report = {
+        'meta': {
+            'users': args.users, 'holdings': args.holdings, 'days': args.days, 'seed': args.seed,
+            'repeat': args.repeat, 'python': platform.python_version(), 'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        scale = ('users', 'holdings', 'days', 'seed')
+        if any(baseline['meta'].get(key) != report['meta'][key] for key in scale):
+            print("WARNING baseline was recorded with a different data set: "
+                  + ", ".join(f"{key}={baseline['meta'].get(key)}" for key in scale))
+        regressions = compare(results, baseline['results'], args.threshold)
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} "
+              f"across {len(set(results) & set(baseline['results']))} shared benchmarks")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
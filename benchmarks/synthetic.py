@@ -0,0 +1,148 @@
+"""
+🧪 Seeded synthetic portfolio data
+
+Fills an empty database with N users x M holdings spread over the six
+asset types, a mix of INR and foreign-currency holdings, daily exchange
+rates, a daily valuation history and a ledger add for every holding. The same seed
+always produces the same rows, so benchmark runs are comparable.
+
+    python benchmarks/synthetic.py --users 1000 --holdings 50 --db synthetic.db
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'correct horse'
+SEED = 0
+# Share of holdings in each currency
+CURRENCY_MIX = {'INR': 0.8, 'USD': 0.12, 'EUR': 0.05, 'GBP': 0.03}
+# INR per unit on the first day; each walks at 0.4% daily volatility
+START_RATES = {'USD': 83.0, 'EUR': 90.0, 'GBP': 105.0}
+FX_VOLATILITY = 0.004
+USERS_PER_CHUNK = 100  # users whose holdings and history are written per transaction
+
+
+def username(i):
+    return f"bench_{i:05d}"
+
+
+def _fx_rows(rng, first_day, days):
+    rows = []
+    for currency, start in START_RATES.items():
+        walk = start * np.cumprod(1 + rng.normal(0, FX_VOLATILITY, days))
+        rows.extend((currency, (first_day + d) * 86400, rate) for d, rate in enumerate(walk))
+    return rows
+
+
+def _walks(rng, asset_types, values, days):
+    """Daily value paths (days x assets) ending at each holding's value"""
+    from projections import ASSET_ASSUMPTIONS
+
+    drift, vol = np.array([ASSET_ASSUMPTIONS[t] for t in asset_types]).T
+    steps = rng.normal(drift / 365, vol / np.sqrt(365), (days, len(values)))
+    paths = np.cumprod(1 + np.clip(steps, -0.5, 0.5), axis=0)
+    return paths * (values / paths[-1])
+
+
+def generate(users=100, holdings=50, days=365, seed=SEED, progress=None):
+    """Write the synthetic data set; returns counts and the usernames.
+
+    The database must be empty. Every user gets the password
+    ``PASSWORD`` (hashed once and shared, since hashing is deliberately
+    slow), ``holdings`` assets added on random days in the window, and a
+    valuation per asset for each day it was held.
+    """
+    from auth import hash_password
+    from database import get_db
+    from fx import record_rates
+    from ledger import record_events
+    from portfolio import ASSET_TYPES
+    from timeseries import record_valuations, to_day
+
+    rng = np.random.default_rng(seed)
+    today = to_day()
+    first_day = today - days + 1
+    record_rates(_fx_rows(rng, first_day, days))
+
+    stored = hash_password(PASSWORD)
+    names = [username(i) for i in range(users)]
+    with get_db().transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+            ((name, f"{name}@example.com", stored) for name in names)
+        )
+
+    currencies, weights = list(CURRENCY_MIX), np.array(list(CURRENCY_MIX.values()))
+    points = 0
+    for lo in range(0, users, USERS_PER_CHUNK):
+        chunk = names[lo:lo + USERS_PER_CHUNK]
+        n = len(chunk) * holdings
+        types = rng.choice(ASSET_TYPES, n)
+        held = rng.choice(currencies, n, p=weights / weights.sum())
+        values = np.round(rng.lognormal(11, 1.2, n), 2)
+        added = rng.integers(first_day, today + 1, n)
+        owners = np.repeat(chunk, holdings)
+        with get_db().transaction() as conn:
+            conn.executemany(
+                "INSERT INTO portfolio (username, asset_name, asset_type, current_value, currency, added_date) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (str(owners[k]), f"{types[k]} {k % holdings:04d}", str(types[k]), float(values[k]),
+                     str(held[k]), int(added[k]) * 86400)
+                    for k in range(n)
+                )
+            )
+            rows = conn.execute(
+                "SELECT id, username, added_date, asset_name, asset_type, currency, current_value "
+                f"FROM portfolio WHERE username IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                chunk
+            ).fetchall()
+            adds = {user: [] for user in chunk}
+            for asset_id, user, at, *state in rows:
+                adds[user].append((asset_id, at, None, tuple(state)))
+            for user, changes in adds.items():
+                record_events(conn, user, changes)
+            ids = [row[0] for row in rows]
+
+        paths = _walks(rng, types, values, days)
+        offsets = added - first_day
+        points += record_valuations(
+            (asset_id, (first_day + d) * 86400, paths[d, k])
+            for k, asset_id in enumerate(ids)
+            for d in range(offsets[k], days)
+        )
+        if progress:
+            progress(min(lo + USERS_PER_CHUNK, users), users)
+
+    return {'users': names, 'holdings': users * holdings, 'points': points, 'days': days, 'seed': seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--holdings', type=int, default=50, help="holdings per user")
+    parser.add_argument('--days', type=int, default=365, help="days of valuation history")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--db', required=True, help="SQLite file to create")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+    os.environ['FINSIGHT_DB'] = args.db
+
+    started = time.perf_counter()
+    data = generate(args.users, args.holdings, args.days, args.seed,
+                    progress=lambda done, total: print(f"\r{done:,} / {total:,} users", end='', flush=True))
+    print(f"\n{args.users:,} users, {data['holdings']:,} holdings, {data['points']:,} valuations "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+🧠 FinSight In-Process Caches
+Thread-safe LRU caches with TTL expiry, a memory cap and hit/miss counters
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================
+# 📏 SIZE ESTIMATION
+# ============================================
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes"""
+    if hasattr(value, 'memory_usage'):  # pandas DataFrame / Series
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):  # NumPy arrays
+        return int(value.nbytes)
+    if hasattr(value, 'to_plotly_json'):  # Plotly figures: the object itself is a thin shell
+        return len(value.to_json())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+# ============================================
+# 🗃️ LRU CACHE
+# ============================================
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by entry count, bytes and age.
+
+    Entries may carry a ``tag`` (e.g. a username) so every value derived
+    from the same source can be dropped at once with ``invalidate_tag``.
+    Cached objects are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (value, size, expires_at, tag)
+        self._tags = {}  # tag -> set of keys
+        self._generations = {}  # tag -> bumped on every invalidate_tag
+        self._bytes = 0
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+
+    def _remove(self, key):
+        value, size, _, tag = self._data.pop(key)
+        self._bytes -= size
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._counters['misses'] += 1
+                return default
+            if entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value, tag=None, ttl=None):
+        size = estimate_size(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                return value  # never cache something bigger than the whole budget
+            self._data[key] = (value, size, expires_at, tag)
+            self._bytes += size
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self._counters['evictions'] += 1
+        return value
+
+    def get_or_set(self, key, factory, tag=None, ttl=None):
+        """Return the cached value or compute, store and return it.
+
+        If the tag is invalidated while ``factory`` runs, the (possibly stale)
+        result is returned but not stored.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self._generations.get(tag, 0)
+            value = factory()
+            if self._generations.get(tag, 0) == generation:
+                self.set(key, value, tag=tag, ttl=ttl)
+        return value
+
+    def pop(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                self._counters['invalidations'] += 1
+
+    def invalidate_tag(self, tag):
+        """Drop every entry stored with ``tag``"""
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                self._counters['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._counters)
+            snapshot['entries'] = len(self._data)
+            snapshot['bytes'] = self._bytes
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_rate'] = snapshot['hits'] / lookups if lookups else 0.0
+        return snapshot
+
+# ============================================
+# 🌐 PROCESS-WIDE REGISTRY
+# ============================================
+
+# Streamlit re-executes app.py on every rerun, so caches live here (an
+# imported module) to survive reruns and be shared across sessions.
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(name, **options):
+    """Return the named process-wide cache, creating it with ``options`` once"""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = LRUCache(**options)
+    return cache
+
+def cache_stats():
+    """Hit/miss/size counters for every registered cache"""
+    return {name: cache.stats() for name, cache in list(_caches.items())}
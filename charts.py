@@ -0,0 +1,151 @@
+"""
+📊 FinSight Charts
+Plotly figure builders, imported on first use so the login screen never loads Plotly
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from figures import MAX_CHART_POINTS
+from fx import BASE_CURRENCY, currency_symbol
+from timeseries import lttb, to_dates
+
+# ============================================
+# 📊 ANALYTICS & VISUALIZATION
+# ============================================
+
+def create_pie_chart(summary):
+    """Create interactive pie chart for asset distribution"""
+    symbol = currency_symbol(summary.get('currency', BASE_CURRENCY))
+    fig = px.pie(
+        summary['by_type'],
+        values='Total Value',
+        names='Type',
+        title='📊 Portfolio Distribution by Asset Type',
+        hole=0.4,
+        color_discrete_sequence=px.colors.sequential.Plasma
+    )
+    
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate=f'<b>%{{label}}</b><br>Value: {symbol}%{{value:,.0f}}<br>Percentage: %{{percent}}<extra></extra>'
+    )
+    
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=14),
+        title_font=dict(size=20, color='#00d4ff'),
+        showlegend=True,
+        height=500
+    )
+    
+    return fig
+
+def create_growth_chart(days, values, currency=BASE_CURRENCY):
+    """Create growth trend chart from the daily portfolio value series"""
+    if len(values) > MAX_CHART_POINTS:
+        kept = lttb(days, values, MAX_CHART_POINTS)
+        days, values = days[kept], values[kept]
+    dates = to_dates(days)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=values,
+        mode='lines',
+        name='Portfolio Value',
+        line=dict(color='#00d4ff', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(0, 212, 255, 0.1)'
+    ))
+    
+    fig.update_layout(
+        title='📈 Portfolio Growth Trend (Last 12 Months)',
+        xaxis_title='Date',
+        yaxis_title=f'Portfolio Value ({currency_symbol(currency).strip()})',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(30, 42, 58, 0.5)',
+        font=dict(color='white', size=14),
+        title_font=dict(size=20, color='#00d4ff'),
+        hovermode='x unified',
+        height=400
+    )
+    
+    return fig
+
+def create_correlation_heatmap(risk):
+    """Create heatmap of return correlations between asset types"""
+    by_type = risk['by_type']
+    
+    fig = px.imshow(
+        np.round(by_type['correlation'], 2),
+        x=by_type['types'],
+        y=by_type['types'],
+        zmin=-1,
+        zmax=1,
+        text_auto=True,
+        color_continuous_scale='RdBu_r',
+        title='🔗 Return Correlation by Asset Type'
+    )
+    
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', size=14),
+        title_font=dict(size=20, color='#00d4ff'),
+        height=400
+    )
+    
+    return fig
+
+def create_projection_chart(projection, currency=BASE_CURRENCY):
+    """Create projection chart with P5–P95 uncertainty band"""
+    years_range = projection['years']
+    years = int(years_range[-1])
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=years_range,
+        y=projection['p95'],
+        mode='lines',
+        name='Optimistic (P95)',
+        line=dict(color='rgba(0, 255, 136, 0.4)', width=1, dash='dot')
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=years_range,
+        y=projection['p5'],
+        mode='lines',
+        name='Pessimistic (P5)',
+        line=dict(color='rgba(255, 0, 110, 0.4)', width=1, dash='dot'),
+        fill='tonexty',
+        fillcolor='rgba(0, 212, 255, 0.1)'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=years_range,
+        y=projection['p50'],
+        mode='lines+markers',
+        name='Expected (P50)',
+        line=dict(color='#00ff88', width=3),
+        marker=dict(size=8)
+    ))
+    
+    fig.update_layout(
+        title=f'📈 {years}-Year Portfolio Growth Projection',
+        xaxis_title='Years',
+        yaxis_title=f'Portfolio Value ({currency_symbol(currency).strip()})',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(30, 42, 58, 0.5)',
+        font=dict(color='white', size=14),
+        title_font=dict(size=20, color='#00d4ff'),
+        hovermode='x unified',
+        height=400
+    )
+    
+    return fig
@@ -0,0 +1,721 @@
+"""
+🏠 FinSight Dashboard
+Logged-in pages; loaded by app.py only after sign-in, and charts or
+projections only when a page first needs them
+"""
+
+import html
+import json
+import random
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from advice import user_advice
+from auth import is_admin
+from export import EXPORT_FORMATS, export_portfolio
+from figures import cached_figure
+from fx import (BASE_CURRENCY, CURRENCIES, convert, convert_history, currency_symbol, format_money,
+                has_rate, latest_rates, record_rates)
+from ledger import ledger_events
+from login import end_session
+from metrics import collect, prometheus_text, recent_profiles, recent_traces, reset, span
+from portfolio import (ASSET_TYPES, HOLDINGS_PAGE_SIZE, add_asset, count_holdings, delete_assets,
+                       get_holdings_page, get_portfolio_as_of, get_portfolio_summary, import_assets,
+                       predict_portfolio_value, read_asset_file)
+from risk import user_risk_report
+from timeseries import load_history, portfolio_value_series, rolling_returns, to_dates
+
+# ============================================
+# 💡 FINANCIAL TIPS
+# ============================================
+
+FINANCIAL_TIPS = [
+    "💡 Invest regularly through SIP to benefit from rupee cost averaging.",
+    "📚 Diversification is the only free lunch in investing.",
+    "⏰ Time in the market beats timing the market.",
+    "🎯 Set clear financial goals before making investment decisions.",
+    "📊 Review and rebalance your portfolio every 6 months.",
+    "💰 Emergency fund first, investments second.",
+    "🔍 Research thoroughly before investing in any asset.",
+    "📈 Long-term investing reduces risk and increases returns.",
+    "🎓 Invest in your financial education continuously.",
+    "⚖️ Balance risk and return based on your age and goals."
+]
+
+# ============================================
+# 🏠 MAIN DASHBOARD
+# ============================================
+
+HOLDINGS_SORT_LABELS = {
+    "📅 Date Added": 'added_date',
+    "🔤 Name": 'asset_name',
+    "🏷️ Type": 'asset_type',
+    "💵 Value": 'current_value',
+}
+
+def _holdings_next_page(cursor):
+    st.session_state.holdings_cursors.append(cursor)
+
+def _holdings_prev_page():
+    st.session_state.holdings_cursors.pop()
+
+def show_holdings(username, currency):
+    """Paginated holdings table with filters, sorting and bulk delete.
+
+    Only one page is fetched and rendered per rerun, as a single dataframe
+    widget, so render cost is bounded by HOLDINGS_PAGE_SIZE. Each value is
+    shown in its own currency and converted into the reporting ``currency``.
+    """
+    col1, col2, col3, col4 = st.columns([3, 3, 3, 2])
+    with col1:
+        name_query = st.text_input("🔍 Search", placeholder="Asset name", key="holdings_name").strip()
+    with col2:
+        asset_types = st.multiselect("🏷️ Type", ASSET_TYPES, key="holdings_types")
+    with col3:
+        date_range = st.date_input("📅 Added between", value=(), key="holdings_dates")
+    with col4:
+        sort_label = st.selectbox("↕️ Sort by", list(HOLDINGS_SORT_LABELS), key="holdings_sort")
+        descending = st.toggle("Descending", key="holdings_desc")
+
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else date_from
+    filters = dict(asset_types=asset_types, name_query=name_query or None,
+                   date_from=date_from, date_to=date_to)
+
+    # Any change to filters or sort restarts paging from the first page
+    view_key = (username, HOLDINGS_SORT_LABELS[sort_label], descending,
+                tuple(asset_types), name_query, date_from, date_to)
+    if st.session_state.get('holdings_view') != view_key:
+        st.session_state.holdings_view = view_key
+        st.session_state.holdings_cursors = [None]
+    cursors = st.session_state.holdings_cursors
+
+    page_df, next_cursor = get_holdings_page(
+        username, sort=HOLDINGS_SORT_LABELS[sort_label], descending=descending,
+        cursor=cursors[-1], **filters
+    )
+    total = count_holdings(username, **filters)
+    converted = f"Value ({currency})"
+    shown = page_df.assign(**{converted: convert(page_df['Value'], page_df['Currency'], currency)})
+
+    event = st.dataframe(
+        shown,
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"holdings_table_{len(cursors)}",
+        column_config={
+            'ID': None,
+            'Value': st.column_config.NumberColumn(format="%.2f"),
+            converted: st.column_config.NumberColumn(format=f"{currency_symbol(currency)}%.2f"),
+            'Date Added': st.column_config.DatetimeColumn(format="YYYY-MM-DD"),
+        },
+    )
+
+    first = (len(cursors) - 1) * HOLDINGS_PAGE_SIZE
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    with col1:
+        st.button("⬅️ Prev", disabled=len(cursors) == 1, on_click=_holdings_prev_page,
+                  use_container_width=True)
+    with col2:
+        st.markdown(f"<p style='text-align: center;'>{first + 1 if len(page_df) else 0}"
+                    f"–{first + len(page_df)} of {total}</p>", unsafe_allow_html=True)
+    with col3:
+        st.button("Next ➡️", disabled=next_cursor is None, on_click=_holdings_next_page,
+                  args=(next_cursor,), use_container_width=True)
+    with col4:
+        selected = page_df.iloc[event.selection.rows]['ID'].tolist()
+        if st.button(f"🗑️ Delete selected ({len(selected)})", disabled=not selected,
+                     use_container_width=True):
+            delete_assets(username, selected)
+            if len(page_df) == len(selected) and len(cursors) > 1:
+                cursors.pop()
+            st.rerun()
+
+LEDGER_KIND_LABELS = {'add': "➕ Added", 'revalue': "💵 Revalued", 'update': "✏️ Edited", 'delete': "🗑️ Deleted"}
+
+def show_portfolio_history(username, currency):
+    """Holdings as of a chosen day, rebuilt from the ledger, and recent activity"""
+    day = st.date_input("🕰️ Holdings as of", value=date.today(), max_value=date.today(), key="as_of_day")
+    try:
+        held = get_portfolio_as_of(username, day)
+    except LookupError as e:
+        st.warning(f"⚠️ {e}")
+    else:
+        converted = f"Value ({currency})"
+        values = convert(held['Value'], held['Currency'], currency, day)
+        st.metric(f"💰 Worth on {day:%Y-%m-%d}", format_money(float(values.sum()), currency),
+                  help="Recorded values as of that day, at that day's exchange rates")
+        st.dataframe(
+            held.assign(**{converted: values}),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'ID': None,
+                'Value': st.column_config.NumberColumn(format="%.2f"),
+                converted: st.column_config.NumberColumn(format=f"{currency_symbol(currency)}%.2f"),
+                'Date Added': st.column_config.DatetimeColumn(format="YYYY-MM-DD"),
+            },
+        )
+
+    events = pd.DataFrame(ledger_events(username, limit=20),
+                          columns=['Seq', 'When', 'Change', 'ID', 'Asset Name', 'Type', 'Currency', 'Value'])
+    events['When'] = pd.to_datetime(events['When'], unit='s')
+    events['Change'] = events['Change'].map(LEDGER_KIND_LABELS)
+    st.caption("Recent activity")
+    st.dataframe(
+        events.drop(columns=['Seq', 'ID']),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'When': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+            'Value': st.column_config.NumberColumn(format="%.2f"),
+        },
+    )
+
+def _percent(value, digits=2):
+    return "—" if np.isnan(value) else f"{value * 100:,.{digits}f}%"
+
+def show_risk_panel(risk):
+    """Portfolio risk metrics, per-type table and correlation heatmap"""
+    portfolio = risk['portfolio']
+    if risk['observations'] < 2:
+        st.info("📭 Not enough valuation history yet. Risk metrics appear once your assets have a few days of valuations.")
+        return
+    
+    confidence = f"{risk['confidence']:.0%}"
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🌪️ Annual Volatility", _percent(portfolio['volatility']))
+    with col2:
+        st.metric("⛰️ Max Drawdown", _percent(portfolio['max_drawdown']))
+    with col3:
+        st.metric(f"🛡️ 1-Day VaR ({confidence})", _percent(portfolio['var_historical']),
+                  help=f"Parametric: {_percent(portfolio['var_parametric'])}")
+    with col4:
+        st.metric(f"🔥 1-Day CVaR ({confidence})", _percent(portfolio['cvar_historical']),
+                  help=f"Parametric: {_percent(portfolio['cvar_parametric'])}")
+    
+    by_type = risk.get('by_type')
+    if by_type is not None and len(by_type['types']):
+        table = pd.DataFrame({
+            'Type': by_type['types'],
+            'Volatility (%)': by_type['volatility'] * 100,
+            'Max Drawdown (%)': by_type['max_drawdown'] * 100,
+            f'1-Day VaR {confidence} (%)': by_type['var_historical'] * 100,
+        }).round(2)
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        if len(by_type['types']) > 1:
+            from charts import create_correlation_heatmap
+            st.plotly_chart(
+                cached_figure('correlation', create_correlation_heatmap, {'by_type': by_type}),
+                use_container_width=True
+            )
+
+def show_rebalance(username, summary):
+    """Target allocation picker and the trades needed to reach it"""
+    from rebalance import DEFAULT_TOLERANCE, TARGET_PRESETS, history_targets, rebalance_plan
+    
+    currency = summary['currency']
+    symbol = currency_symbol(currency).strip()
+    by_type = summary['by_type']
+    allocation = dict(zip(by_type['Type'], by_type['Total Value']))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        source = st.selectbox("🎯 Target allocation", [*TARGET_PRESETS, "Optimised from history", "Custom"],
+                              key="rebalance_target")
+    with col2:
+        contribution = st.number_input(f"💵 New money to invest ({symbol}, negative to withdraw)",
+                                       step=1000.0, format="%.2f", key="rebalance_contribution")
+    tolerance = st.slider("↔️ Drift tolerance (%)", 0, 20, int(DEFAULT_TOLERANCE * 100),
+                          key="rebalance_tolerance") / 100
+    
+    if source == "Custom":
+        cols = st.columns(3)
+        targets = {}
+        for i, asset_type in enumerate(ASSET_TYPES):
+            default = int(round(TARGET_PRESETS['Balanced'].get(asset_type, 0) * 100))
+            with cols[i % 3]:
+                targets[asset_type] = st.number_input(f"{asset_type} (%)", 0, 100, default,
+                                                      key=f"rebalance_{asset_type}") / 100
+        if sum(targets.values()) == 0:
+            st.warning("⚠️ Set at least one target weight.")
+            return
+    elif source == "Optimised from history":
+        targets = history_targets(convert_history(load_history(username), currency))
+        if not targets:
+            st.info("📭 Not enough valuation history yet to optimise. Pick a preset instead.")
+            return
+        st.caption("Long-only mean-variance weights from each asset type's daily returns over the last year.")
+    else:
+        targets = TARGET_PRESETS[source]
+    
+    if summary['total_value'] + contribution <= 0:
+        st.warning("⚠️ The withdrawal exceeds your portfolio value.")
+        return
+    
+    plan = rebalance_plan(allocation, targets, tolerance, contribution)
+    trades = [row for row in plan if abs(row['trade']) >= 0.01]
+    if not trades:
+        st.success("✅ Every asset type is within tolerance of its target. No trades needed.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("🛒 Total Buys", format_money(sum(row['trade'] for row in trades if row['trade'] > 0), currency))
+        with col2:
+            st.metric("💸 Total Sells", format_money(-sum(row['trade'] for row in trades if row['trade'] < 0), currency))
+    
+    table = pd.DataFrame({
+        'Type': [row['type'] for row in plan],
+        f'Current ({symbol})': [row['current_value'] for row in plan],
+        'Current (%)': [row['current_weight'] * 100 for row in plan],
+        'Target (%)': [row['target_weight'] * 100 for row in plan],
+        'Action': ["Buy" if row['trade'] >= 0.01 else "Sell" if row['trade'] <= -0.01 else "Hold" for row in plan],
+        f'Trade ({symbol})': [row['trade'] for row in plan],
+        'After (%)': [row['new_weight'] * 100 for row in plan],
+    }).round(2)
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+def show_currencies():
+    """Latest exchange rates plus forms to record one rate or upload many"""
+    st.caption(f"Rates are {BASE_CURRENCY} per unit of each currency; conversions on a day use "
+               "the latest rate on or before it.")
+    latest = latest_rates()
+    if latest:
+        st.dataframe(pd.DataFrame({
+            'Currency': list(latest),
+            f'Rate ({BASE_CURRENCY})': [rate for _, rate in latest.values()],
+            'As of': to_dates([day for day, _ in latest.values()]),
+        }), hide_index=True, use_container_width=True)
+    else:
+        st.info(f"📭 No exchange rates yet. Every holding is valued in {BASE_CURRENCY} until you add some.")
+    
+    with st.form("fx_rate_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            fx_currency = st.selectbox("Currency", [c for c in CURRENCIES if c != BASE_CURRENCY], key="fx_currency")
+        with col2:
+            fx_rate = st.number_input(f"Rate ({BASE_CURRENCY})", min_value=0.0, step=0.01, format="%.4f", key="fx_rate")
+        with col3:
+            fx_day = st.date_input("Date", key="fx_date")
+        if st.form_submit_button("💾 Save Rate", use_container_width=True):
+            try:
+                record_rates([(fx_currency, fx_day, fx_rate)])
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.success(f"✅ Saved {fx_currency} rate")
+                st.rerun()
+    
+    uploaded = st.file_uploader("Upload rates CSV (currency, date, rate)", type=["csv"], key="fx_file")
+    if uploaded is not None and st.button("📥 Import Rates", use_container_width=True):
+        try:
+            frame = pd.read_csv(uploaded, dtype={'currency': str})
+            dates = pd.to_datetime(frame['date'], format='ISO8601')
+            written = record_rates(zip(frame['currency'].str.upper(), dates.dt.date, frame['rate']))
+        except (KeyError, ValueError) as e:
+            st.error(f"❌ Could not import rates: {e}")
+        else:
+            st.success(f"✅ Imported {written:,} rates")
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+def show_performance():
+    """Admin view of span latencies, recent rerun traces, caches, the pool and profiles"""
+    metrics = collect()
+    st.caption("Latencies in milliseconds; percentiles cover the most recent calls of each span "
+               "in this server process.")
+    
+    spans = metrics['spans']
+    if spans:
+        st.dataframe(pd.DataFrame({
+            'Span': list(spans),
+            'Calls': [stats['count'] for stats in spans.values()],
+            'Mean': [_ms(stats['mean']) for stats in spans.values()],
+            'p50': [_ms(stats['p50']) for stats in spans.values()],
+            'p95': [_ms(stats['p95']) for stats in spans.values()],
+            'p99': [_ms(stats['p99']) for stats in spans.values()],
+            'Max': [_ms(stats['max']) for stats in spans.values()],
+        }).sort_values('p95', ascending=False), hide_index=True, use_container_width=True)
+    else:
+        st.info("📭 No spans recorded yet (FINSIGHT_METRICS=0 disables them).")
+    
+    st.markdown("---")
+    
+    # Span tree of one recent rerun or API request
+    st.subheader("🧵 Recent Reruns")
+    traces = recent_traces()
+    if traces:
+        labels = [
+            f"{datetime.fromtimestamp(t['started']).strftime('%H:%M:%S')} · {t['name']} · "
+            f"{t['label'] or '—'} · {_ms(t['seconds'])} ms"
+            for t in traces
+        ]
+        chosen = st.selectbox("Trace", range(len(traces)), format_func=labels.__getitem__, key="perf_trace")
+        st.dataframe(pd.DataFrame({
+            'Span': ["\u00a0\u00a0" * depth + name for name, depth, _, _ in traces[chosen]['spans']],
+            'Start (ms)': [_ms(offset) for _, _, offset, _ in traces[chosen]['spans']],
+            'Duration (ms)': [_ms(seconds) for _, _, _, seconds in traces[chosen]['spans']],
+        }), hide_index=True, use_container_width=True)
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("🗃️ Caches")
+        caches = metrics['caches']
+        if caches:
+            st.dataframe(pd.DataFrame.from_dict(caches, orient='index'), use_container_width=True)
+    with col2:
+        st.subheader("🔌 Connection Pool")
+        st.dataframe(pd.DataFrame({'Value': metrics['database']}), use_container_width=True)
+    
+    st.markdown("---")
+    
+    # The profile runs around the whole of the next rerun (see app.main)
+    st.subheader("🔬 Profiling")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⏱️ Profile next rerun (CPU)", use_container_width=True):
+            st.session_state.profile_next = 'cpu'
+            st.rerun()
+    with col2:
+        if st.button("🧠 Profile next rerun (Memory)", use_container_width=True):
+            st.session_state.profile_next = 'memory'
+            st.rerun()
+    for profile in recent_profiles():
+        started = datetime.fromtimestamp(profile['started']).strftime('%H:%M:%S')
+        with st.expander(f"{started} · {profile['kind']} · {profile['label'] or '—'} · {profile['seconds']:.2f}s"):
+            st.code(profile['report'], language=None)
+    
+    st.markdown("---")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("📥 Prometheus text", prometheus_text(metrics), file_name="finsight_metrics.txt",
+                           mime="text/plain", use_container_width=True)
+    with col2:
+        st.download_button("📥 JSON", json.dumps(metrics, indent=2), file_name="finsight_metrics.json",
+                           mime="application/json", use_container_width=True)
+    with col3:
+        if st.button("🗑️ Reset Metrics", use_container_width=True):
+            reset()
+            st.rerun()
+
+def show_dashboard(username):
+    """Display main portfolio dashboard"""
+    
+    # Sidebar Profile Section
+    with st.sidebar:
+        st.markdown(f"""
+        <div class="profile-section">
+            <h2 style="margin: 0; color: white;">👤 {html.escape(username)}</h2>
+            <p style="margin: 5px 0; color: rgba(255,255,255,0.8);">Portfolio Manager</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Navigation
+        pages = ["🏠 Dashboard", "📊 Analytics", "🔮 Predictions", "⚖️ Rebalance", "💱 Currencies", "ℹ️ About"]
+        if is_admin(username):
+            pages.append("🩺 Performance")
+        page = st.radio("📍 Navigate", pages, label_visibility="collapsed")
+        
+        # Totals, charts and advice are shown in this currency
+        priced = [c for c in CURRENCIES if has_rate(c)]
+        currency = st.selectbox("💱 Reporting currency", priced, key="report_currency")
+        
+        st.markdown("---")
+        
+        # Add Asset Form
+        st.subheader("➕ Add New Asset")
+        with st.form("add_asset_form"):
+            asset_name = st.text_input("Asset Name", placeholder="e.g., Apple Stock", key="asset_name")
+            asset_type = st.selectbox("Asset Type", ASSET_TYPES, key="asset_type")
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                current_value = st.number_input("Current Value", min_value=0.0, step=1000.0, format="%.2f", key="asset_value")
+            with col2:
+                asset_currency = st.selectbox("Currency", priced, key="asset_currency")
+            add_btn = st.form_submit_button("💾 Add Asset", use_container_width=True)
+            
+            if add_btn:
+                if asset_name and current_value > 0:
+                    try:
+                        add_asset(username, asset_name, asset_type, current_value, asset_currency)
+                    except Exception as e:
+                        st.error(f"Error adding asset: {e}")
+                    else:
+                        st.success(f"✅ {asset_name} added successfully!")
+                        st.rerun()
+                else:
+                    st.warning("⚠️ Please fill all fields!")
+        
+        # Bulk Import
+        with st.expander("📤 Bulk Import"):
+            uploaded = st.file_uploader(
+                "CSV, gzip CSV, Parquet or JSON Lines in the export format",
+                type=["csv", "gz", "parquet", "jsonl"],
+                key="import_file"
+            )
+            if uploaded is not None and st.button("📥 Import Assets", use_container_width=True):
+                try:
+                    frame = read_asset_file(uploaded.name, uploaded.getvalue())
+                except Exception as e:
+                    st.error(f"❌ Could not read file: {e}")
+                else:
+                    bar = st.progress(0.0, text="Importing...")
+                    inserted, errors = import_assets(
+                        username, frame,
+                        progress=lambda done, total: bar.progress(done / total, text=f"Imported {done:,} / {total:,}")
+                    )
+                    bar.empty()
+                    st.success(f"✅ Imported {inserted:,} assets")
+                    if not errors.empty:
+                        st.warning(f"⚠️ {errors['Row'].nunique():,} rows skipped")
+                        st.dataframe(errors, hide_index=True, use_container_width=True)
+        
+        st.markdown("---")
+        
+        if st.button("🚪 Logout", use_container_width=True):
+            end_session()
+            st.rerun()
+    
+    # Main Content
+    # One span per page, so slow pages stand out on the performance page
+    with span(f"page.{page.split(' ', 1)[1].lower()}"):
+        st.markdown('<h1 class="animated-title">💼 FinSight Dashboard</h1>', unsafe_allow_html=True)
+    
+        # Get aggregated portfolio data (holdings rows are only loaded on the Dashboard)
+        summary = get_portfolio_summary(username, currency)
+        total_value = summary['total_value']
+    
+        if page == "🏠 Dashboard":
+            # Key Metrics
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("💰 Total Portfolio Worth", format_money(total_value, currency))
+            with col2:
+                st.metric("📦 Total Assets", summary['count'])
+            with col3:
+                st.metric("📊 Average Asset Value", format_money(summary['average'], currency))
+        
+            st.markdown("---")
+        
+            # Portfolio Table
+            if summary['count'] > 0:
+                st.subheader("📋 Your Portfolio")
+                show_holdings(username, currency)
+
+                # Expanders run even when collapsed; replay the ledger only on request
+                with st.expander("🕰️ Portfolio history"):
+                    if st.toggle("Show history", key="show_history"):
+                        show_portfolio_history(username, currency)
+            
+                st.markdown("---")
+            
+                # Export (streamed from the database only when requested)
+                col1, col2 = st.columns([1, 2])
+                with col1:
+                    export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format",
+                                                 label_visibility="collapsed")
+                with col2:
+                    if st.button("📦 Prepare Export", use_container_width=True):
+                        st.session_state.export_file = (username, export_format, export_portfolio(username, export_format))
+            
+                prepared = st.session_state.get('export_file')
+                if prepared and prepared[0] == username:
+                    _, fmt, data = prepared
+                    extension, mime = EXPORT_FORMATS[fmt]
+                    st.download_button(
+                        label=f"📥 Download Portfolio ({fmt})",
+                        data=data,
+                        file_name=f"portfolio_{username}_{datetime.now().strftime('%Y%m%d')}{extension}",
+                        mime=mime,
+                        use_container_width=True
+                    )
+            else:
+                st.info("📭 Your portfolio is empty. Add your first asset to get started!")
+        
+            # Random Financial Tip
+            st.markdown("---")
+            st.markdown(f"""
+            <div class="info-card">
+                <h3>💡 Financial Tip of the Day</h3>
+                <p style="font-size: 1.1em; line-height: 1.8; margin: 10px 0;">{random.choice(FINANCIAL_TIPS)}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+            st.markdown("---")
+        
+            # Disclaimer
+            st.warning("""
+            ⚠️ **Disclaimer:** FinSight is an educational tool for portfolio tracking and analysis. 
+            Predictions are based on historical-like simulated data and should not be considered as financial advice. 
+            Always consult with a certified financial advisor before making investment decisions.
+            """)
+    
+        elif page == "📊 Analytics":
+            if summary['count'] > 0:
+                st.subheader("📊 Portfolio Analytics")
+                from charts import create_growth_chart, create_pie_chart
+            
+                # Pie Chart
+                fig_pie = cached_figure('pie', create_pie_chart, {'by_type': summary['by_type'], 'currency': currency})
+                st.plotly_chart(fig_pie, use_container_width=True)
+            
+                st.markdown("---")
+            
+                # Growth Chart
+                history = convert_history(load_history(username), currency)
+                series = portfolio_value_series(history)
+                fig_growth = cached_figure('growth', create_growth_chart, history['days'], series, currency)
+                st.plotly_chart(fig_growth, use_container_width=True)
+            
+                # Trailing returns from the daily history
+                col1, col2, col3 = st.columns(3)
+                for col, (label, window) in zip((col1, col2, col3), (("1 Month", 30), ("3 Months", 91), ("1 Year", 364))):
+                    trailing = rolling_returns(series, window)[-1]
+                    with col:
+                        st.metric(f"📈 {label} Return", "—" if np.isnan(trailing) else f"{trailing * 100:,.2f}%")
+            
+                st.markdown("---")
+            
+                # Risk Analysis from the stored valuation history
+                st.subheader("🛡️ Risk Analysis")
+                risk = user_risk_report(username, currency=currency)
+                show_risk_panel(risk)
+            
+                st.markdown("---")
+            
+                # Asset Type Breakdown Table
+                st.subheader("📈 Asset Type Breakdown")
+                symbol = currency_symbol(currency).strip()
+                breakdown = summary['by_type'].round(2).rename(columns={
+                    'Total Value': f'Total Value ({symbol})', 'Avg Value': f'Avg Value ({symbol})',
+                })
+                st.dataframe(breakdown, use_container_width=True)
+            else:
+                st.info("📭 No data available for analytics. Add assets to your portfolio first!")
+    
+        elif page == "🔮 Predictions":
+            st.subheader("🔮 AI-Powered Portfolio Predictions")
+        
+            if total_value > 0:
+                # Prediction Input
+                years = st.slider("📅 Predict portfolio value after how many years?", 1, 20, 5)
+            
+                if st.button("🚀 Generate Prediction", use_container_width=True):
+                    with st.spinner("🤖 Simulating thousands of market scenarios..."):
+                        projection = predict_portfolio_value(summary, years)
+                        predicted_value = projection['p50'][-1]
+                        growth_percentage = ((predicted_value - total_value) / total_value) * 100
+                    
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("📊 Current Portfolio Value", format_money(total_value, currency))
+                        with col2:
+                            st.metric(
+                                f"🎯 Predicted Value ({years} years)",
+                                format_money(predicted_value, currency),
+                                f"{growth_percentage:,.2f}%"
+                            )
+                        with col3:
+                            st.metric(
+                                "📉 Likely Range (P5–P95)",
+                                f"{format_money(projection['p5'][-1], currency, 0)} – {format_money(projection['p95'][-1], currency, 0)}"
+                            )
+                    
+                        st.markdown("---")
+                    
+                        # Prediction Visualization
+                        from charts import create_projection_chart
+                        fig_pred = cached_figure('projection', create_projection_chart, projection, currency)
+                        st.plotly_chart(fig_pred, use_container_width=True)
+            
+                st.markdown("---")
+            
+                # Investment Advice
+                st.subheader("🧠 Smart Investment Advice")
+                advice_list = user_advice(username, currency)
+            
+                for advice in advice_list:
+                    st.markdown(f"""
+                    <div class="info-card">
+                        <p style="font-size: 1.1em; margin: 0;">{html.escape(advice)}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.info("📭 Add assets to your portfolio to see predictions and advice!")
+    
+        elif page == "⚖️ Rebalance":
+            st.subheader("⚖️ Portfolio Rebalancing")
+        
+            if total_value > 0:
+                show_rebalance(username, summary)
+            else:
+                st.info("📭 Add assets to your portfolio to plan a rebalance!")
+    
+        elif page == "💱 Currencies":
+            st.subheader("💱 Exchange Rates")
+            show_currencies()
+    
+        elif page == "ℹ️ About":
+            st.subheader("ℹ️ About FinSight")
+        
+            st.markdown("""
+            <div class="info-card">
+                <h3>🎯 What is FinSight?</h3>
+                <p style="font-size: 1.1em; line-height: 1.8;">
+                    FinSight is an AI-powered portfolio management platform that helps you track, analyze, and predict 
+                    the performance of your investment portfolio. Built with cutting-edge machine learning algorithms 
+                    and modern data visualization techniques, FinSight provides actionable insights to help you make 
+                    smarter investment decisions.
+                </p>
+            </div>
+        
+            <div class="info-card">
+                <h3>✨ Key Features</h3>
+                <ul style="font-size: 1.1em; line-height: 1.8;">
+                    <li>🔐 Secure user authentication system</li>
+                    <li>💼 Multi-asset portfolio management (Stocks, Crypto, Mutual Funds, Real Estate, Gold)</li>
+                    <li>💱 Holdings in several currencies, reported in the currency of your choice</li>
+                    <li>📊 Interactive charts and analytics</li>
+                    <li>🤖 Monte Carlo portfolio projections with uncertainty bands</li>
+                    <li>🧠 Smart investment advice and diversification tips</li>
+                    <li>⚖️ Rebalancing planner with presets and mean-variance targets</li>
+                    <li>📥 Export portfolio data to CSV</li>
+                    <li>🎨 Beautiful, modern, futuristic UI</li>
+                </ul>
+            </div>
+        
+            <div class="info-card">
+                <h3>🛠️ Technology Stack</h3>
+                <ul style="font-size: 1.1em; line-height: 1.8;">
+                    <li><strong>Frontend:</strong> Streamlit with custom CSS</li>
+                    <li><strong>Database:</strong> SQLite</li>
+                    <li><strong>Projections:</strong> NumPy Monte Carlo simulation</li>
+                    <li><strong>Visualization:</strong> Plotly</li>
+                    <li><strong>Data Processing:</strong> Pandas, NumPy</li>
+                </ul>
+            </div>
+        
+            <div class="info-card">
+                <h3>👨‍💻 Developer Info</h3>
+                <p style="font-size: 1.1em; line-height: 1.8;">
+                    Created as a comprehensive financial management solution that combines modern web technologies 
+                    with artificial intelligence to deliver a professional-grade portfolio management experience.
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        elif page == "🩺 Performance":
+            st.subheader("🩺 Performance")
+            show_performance()
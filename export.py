@@ -0,0 +1,169 @@
+"""
+📥 FinSight Portfolio Export
+Streams holdings out of the database in chunks and writes CSV, gzip CSV,
+Parquet or JSON Lines without materialising the whole portfolio.
+
+Nightly backup of every user's holdings:
+    python export.py --all --format parquet --output backups/portfolio.parquet
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+
+from database import get_db
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+EXPORT_CHUNK_ROWS = 10000
+
+# Layout of the holdings table and of bulk import files; Value is in Currency
+EXPORT_COLUMNS = ['ID', 'Asset Name', 'Type', 'Value', 'Currency', 'Date Added']
+ADMIN_COLUMNS = ['Username'] + EXPORT_COLUMNS
+
+# format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+}
+
+# ============================================
+# 🚰 ROW STREAMING
+# ============================================
+
+def iter_portfolio_chunks(username=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """Yield lists of holdings rows, ``chunk_size`` at a time, ordered by id.
+
+    One query read through the backend's streaming cursor (server-side on
+    PostgreSQL), so memory stays at one chunk and a full backup comes
+    from a single consistent snapshot. With ``username=None`` every
+    user's holdings are streamed and rows start with the username.
+    """
+    if username is None:
+        sql = ("SELECT username, id, asset_name, asset_type, current_value, currency, added_date "
+               "FROM portfolio ORDER BY id")
+        params = ()
+    else:
+        sql = ("SELECT id, asset_name, asset_type, current_value, currency, added_date "
+               "FROM portfolio WHERE username=? ORDER BY id")
+        params = (username,)
+    yield from get_db().stream(sql, params, chunk_size)
+
+def _format_timestamp(epoch):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+# ============================================
+# ✍️ FORMAT WRITERS
+# ============================================
+
+def _write_csv(out, chunks, columns):
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    written = 0
+    for rows in chunks:
+        writer.writerows(row[:-1] + (_format_timestamp(row[-1]),) for row in rows)
+        written += len(rows)
+    text.flush()
+    text.detach()  # leave ``out`` open for the caller
+    return written
+
+def _write_csv_gz(out, chunks, columns):
+    with gzip.GzipFile(fileobj=out, mode='wb') as compressed:
+        return _write_csv(compressed, chunks, columns)
+
+def _write_jsonl(out, chunks, columns):
+    written = 0
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            record['Date Added'] = _format_timestamp(row[-1])
+            lines.append(json.dumps(record, ensure_ascii=False))
+        out.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        written += len(rows)
+    return written
+
+def _write_parquet(out, chunks, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [
+        pa.field('ID', pa.int64()),
+        pa.field('Asset Name', pa.string()),
+        pa.field('Type', pa.string()),
+        pa.field('Value', pa.float64()),
+        pa.field('Currency', pa.string()),
+        pa.field('Date Added', pa.timestamp('s')),
+    ]
+    if columns[0] == 'Username':
+        fields.insert(0, pa.field('Username', pa.string()))
+    schema = pa.schema(fields)
+
+    written = 0
+    with pq.ParquetWriter(out, schema, compression='snappy') as writer:
+        for rows in chunks:
+            arrays = [pa.array(list(col), type=field.type) for col, field in zip(zip(*rows), fields)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+    return written
+
+_WRITERS = {
+    'csv': _write_csv,
+    'csv.gz': _write_csv_gz,
+    'parquet': _write_parquet,
+    'jsonl': _write_jsonl,
+}
+
+def write_export(out, fmt='csv', username=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """Stream holdings into the binary file object ``out``; returns rows written.
+
+    Memory use is bounded by ``chunk_size`` regardless of table size.
+    ``username=None`` exports every user (admin backup) with a leading
+    Username column.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    columns = ADMIN_COLUMNS if username is None else EXPORT_COLUMNS
+    return _WRITERS[fmt](out, iter_portfolio_chunks(username, chunk_size), columns)
+
+def export_portfolio(username, fmt='csv'):
+    """Encoded export of one user's holdings as bytes (for st.download_button)"""
+    buffer = io.BytesIO()
+    write_export(buffer, fmt, username=username)
+    return buffer.getvalue()
+
+# ============================================
+# 🌙 ADMIN BACKUP CLI
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export FinSight holdings")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--all', action='store_true', help="export every user (backup)")
+    target.add_argument('--user', help="export a single user's holdings")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='parquet')
+    parser.add_argument('--output', required=True, help="destination file, or - for stdout")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    username = None if args.all else args.user
+    if args.output == '-':
+        written = write_export(sys.stdout.buffer, args.format, username, args.chunk_size)
+    else:
+        with open(args.output, 'wb') as out:
+            written = write_export(out, args.format, username, args.chunk_size)
+    print(f"Exported {written:,} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+🖼️ FinSight Figure Cache
+Prebuilt Plotly figures keyed by chart type and a hash of their input data
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from cache import get_cache
+from metrics import span
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+FIGURE_CACHE_OPTIONS = dict(max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=3600)
+# No chart is wider than this many pixels, so longer series are downsampled
+MAX_CHART_POINTS = 1200
+
+# ============================================
+# #️⃣ DATA HASHING
+# ============================================
+
+def _feed(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(repr(key).encode())
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _feed(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+def data_hash(*values):
+    """Stable digest of DataFrames, arrays, dicts, sequences and scalars"""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _feed(digest, value)
+    return digest.hexdigest()
+
+# ============================================
+# 🖼️ CACHED FIGURES
+# ============================================
+
+def figure_cache():
+    """Process-wide cache of built figures, shared by every session"""
+    return get_cache('figures', **FIGURE_CACHE_OPTIONS)
+
+def cached_figure(kind, build, *data):
+    """``build(*data)``, memoized on ``kind`` and the content of ``data``.
+
+    Sessions looking at identical data (or one session rerunning) get the
+    already built figure instead of paying for Plotly Express again. The
+    figure object is shared: pass it straight to ``st.plotly_chart`` and
+    never modify it.
+    """
+    with span(f'figure.{kind}'):
+        return figure_cache().get_or_set((kind, data_hash(*data)), lambda: _build(kind, build, data))
+
+def _build(kind, build, data):
+    with span(f'figure.{kind}.build'):
+        return build(*data)
@@ -0,0 +1,216 @@
+"""
+💱 FinSight Currencies
+Daily exchange rates, an in-memory rate table and vectorized conversion of
+holdings, summaries and history into a reporting currency
+
+Rates are units of the base currency (₹) per unit of a currency:
+    python fx.py --set USD 83.2 --set USDT 83.1              # today
+    python fx.py --set EUR 90.4 --date 2024-06-28
+    python fx.py --load rates.csv                            # currency,date,rate
+    python fx.py --show
+"""
+
+import argparse
+import hashlib
+import math
+import sys
+
+import numpy as np
+
+from cache import get_cache
+from database import get_db
+from metrics import instrument
+from timeseries import to_day
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+BASE_CURRENCY = 'INR'
+# Supported currencies -> display symbol
+CURRENCIES = {
+    'INR': '₹',
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'USDT': '₮',
+}
+# One entry (the whole rate table); the TTL bounds how late another
+# process's new rates are picked up
+FX_CACHE_OPTIONS = dict(max_entries=4, max_bytes=16 * 1024 * 1024, ttl=300)
+
+
+class MissingRate(LookupError):
+    """Raised when a currency has no recorded exchange rate"""
+
+
+def currency_symbol(currency):
+    return CURRENCIES.get(currency, f"{currency} ")
+
+def format_money(value, currency=BASE_CURRENCY, digits=2):
+    """``value`` with its currency symbol, e.g. $1,234.50"""
+    return f"{currency_symbol(currency)}{value:,.{digits}f}"
+
+# ============================================
+# 📥 RATE STORAGE
+# ============================================
+
+def rate_cache():
+    """Process-wide cache of the rate table"""
+    return get_cache('fx', **FX_CACHE_OPTIONS)
+
+def record_rates(rates):
+    """Upsert ``(currency, day, rate)`` rows; returns the number written.
+
+    ``day`` is anything ``timeseries.to_day`` accepts (None = today) and
+    ``rate`` is units of BASE_CURRENCY per unit of ``currency``.
+    """
+    rows = []
+    for currency, day, rate in rates:
+        rate = float(rate)
+        if currency not in CURRENCIES or currency == BASE_CURRENCY:
+            raise ValueError(f"Rates can be recorded for: {', '.join(c for c in CURRENCIES if c != BASE_CURRENCY)}")
+        if not math.isfinite(rate) or rate <= 0:
+            raise ValueError(f"Rate for {currency} must be a positive number")
+        rows.append((currency, to_day(day), rate))
+    if not rows:
+        return 0
+    with get_db().transaction() as conn:
+        conn.executemany(
+            "INSERT INTO fx_rates (currency, day, rate) VALUES (?, ?, ?) "
+            "ON CONFLICT (currency, day) DO UPDATE SET rate=excluded.rate",
+            rows
+        )
+    rate_cache().clear()
+    return len(rows)
+
+def load_rates():
+    """Rate table ``{'currencies': {code: (days, rates)}, 'version': str}`` (cached).
+
+    ``days`` are sorted day numbers; ``version`` is a digest of the
+    content, identical in every process that loaded the same rates.
+    """
+    return rate_cache().get_or_set('rates', _load_rates)
+
+@instrument('fx.load')
+def _load_rates():
+    with get_db().connection() as conn:
+        rows = conn.execute("SELECT currency, day, rate FROM fx_rates ORDER BY currency, day").fetchall()
+    grouped = {}
+    for currency, day, rate in rows:
+        grouped.setdefault(currency, ([], []))
+        grouped[currency][0].append(day)
+        grouped[currency][1].append(rate)
+    digest = hashlib.blake2b(digest_size=8)
+    currencies = {}
+    for currency, (days, rates) in grouped.items():
+        currencies[currency] = (np.array(days, dtype='int64'), np.array(rates, dtype=float))
+        digest.update(currency.encode())
+        digest.update(currencies[currency][0].tobytes())
+        digest.update(currencies[currency][1].tobytes())
+    return {'currencies': currencies, 'version': digest.hexdigest()}
+
+def rates_version():
+    """Changes whenever any recorded rate does; part of cache keys and ETags"""
+    return load_rates()['version']
+
+def has_rate(currency):
+    return currency == BASE_CURRENCY or currency in load_rates()['currencies']
+
+def latest_rates():
+    """``{currency: (day, rate)}`` of the most recent rate per currency"""
+    return {
+        currency: (int(days[-1]), float(rates[-1]))
+        for currency, (days, rates) in load_rates()['currencies'].items()
+    }
+
+# ============================================
+# 🔁 VECTORIZED CONVERSION
+# ============================================
+
+def _rates_on(table, currency, days):
+    """Rate of ``currency`` on each day: the latest on or before it, else the earliest known"""
+    if currency == BASE_CURRENCY:
+        return np.ones(len(days))
+    if currency not in table['currencies']:
+        raise MissingRate(f"No exchange rate recorded for {currency}")
+    known_days, rates = table['currencies'][currency]
+    return rates[np.maximum(np.searchsorted(known_days, days, side='right') - 1, 0)]
+
+def rate_matrix(days, currencies, to=BASE_CURRENCY):
+    """(days x holdings) factors converting each holding's currency into ``to``.
+
+    ``days`` are day numbers. Each distinct currency is looked up once and
+    the columns are gathered by index, so the work grows with the number
+    of currencies, not of holdings.
+    """
+    table = load_rates()
+    days = np.atleast_1d(np.asarray(days, dtype='int64'))
+    codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+    per_code = np.empty((len(days), len(codes)))
+    for i, code in enumerate(codes):
+        per_code[:, i] = _rates_on(table, code, days)
+    return (per_code / _rates_on(table, to, days)[:, None])[:, inverse.reshape(-1)]
+
+def _already_in(currencies, to):
+    currencies = np.asarray(currencies, dtype=str)
+    return len(currencies) == 0 or bool((currencies == to).all())
+
+def convert(values, currencies, to=BASE_CURRENCY, day=None):
+    """Amounts each in its own currency -> ``to``, at ``day``'s rates (default today)"""
+    values = np.asarray(values, dtype=float)
+    if _already_in(currencies, to):
+        return values
+    return values * rate_matrix([to_day(day)], currencies, to)[0]
+
+def conversion_factor(source, to, day=None):
+    """Multiplier turning an amount in ``source`` into ``to``"""
+    if source == to:
+        return 1.0
+    return float(rate_matrix([to_day(day)], [source], to)[0, 0])
+
+@instrument('fx.convert_history')
+def convert_history(history, to=BASE_CURRENCY):
+    """load_history result with every asset's daily values in ``to``.
+
+    Each day uses that day's rate, so the series (and risk metrics built
+    on it) include currency moves as seen from the reporting currency.
+    """
+    if _already_in(history['asset_currencies'], to):
+        return history
+    factors = rate_matrix(history['days'], history['asset_currencies'], to)
+    return {**history, 'values': history['values'] * factors}
+
+# ============================================
+# 🖥️ CLI
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record FinSight exchange rates")
+    parser.add_argument('--set', nargs=2, action='append', default=[], metavar=('CURRENCY', 'RATE'),
+                        help=f"units of {BASE_CURRENCY} per unit of CURRENCY")
+    parser.add_argument('--date', help="day the --set rates apply to (YYYY-MM-DD, default today)")
+    parser.add_argument('--load', help="CSV with currency, date and rate columns")
+    parser.add_argument('--show', action='store_true', help="print the latest rate per currency")
+    args = parser.parse_args(argv)
+
+    rows = []
+    if args.set:
+        from datetime import date
+        day = date.fromisoformat(args.date) if args.date else None
+        rows.extend((currency.upper(), day, rate) for currency, rate in args.set)
+    if args.load:
+        import pandas as pd
+        frame = pd.read_csv(args.load, dtype={'currency': str})
+        dates = pd.to_datetime(frame['date'], format='ISO8601')
+        rows.extend(zip(frame['currency'].str.upper(), dates.dt.date, frame['rate']))
+    if rows:
+        print(f"Recorded {record_rates(rows):,} rates", file=sys.stderr)
+    if args.show or not rows:
+        from timeseries import to_dates
+        for currency, (day, rate) in sorted(latest_rates().items()):
+            print(f"{currency:5s} {rate:12.4f} {BASE_CURRENCY} on {to_dates([day])[0]}")
+
+
+if __name__ == '__main__':
+    main()
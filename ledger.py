@@ -0,0 +1,320 @@
+"""
+📒 FinSight Holdings Ledger
+Append-only log of every holding change (add, revalue, update, delete),
+per-user snapshots kept current incrementally on each event, point-in-time
+reconstruction from checkpoints, and the compaction job that writes them.
+
+Nightly compaction (checkpoint busy users, keep a year of raw events):
+    python ledger.py --compact --retain-days 365
+"""
+
+import argparse
+import calendar
+import json
+import sys
+import time
+from datetime import date, datetime
+
+from database import get_db
+from metrics import instrument
+from timeseries import SECONDS_PER_DAY, SQL_VARIABLE_CHUNK
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# Event kinds, derived from the holding's state before and after a change
+LEDGER_KINDS = ('add', 'revalue', 'update', 'delete')
+# Compaction checkpoints a user once this many events follow their last
+# checkpoint, so a point-in-time read replays at most about this many
+CHECKPOINT_EVENTS = 500
+COMPACT_CHUNK_USERS = 200  # users per compaction transaction
+
+# ============================================
+# ✍️ RECORDING
+# ============================================
+
+def holding_states(conn, username, asset_ids):
+    """``{id: (asset_name, asset_type, currency, current_value)}`` of a user's holdings"""
+    asset_ids = [int(asset_id) for asset_id in asset_ids]
+    states = {}
+    for start in range(0, len(asset_ids), SQL_VARIABLE_CHUNK):
+        chunk = asset_ids[start:start + SQL_VARIABLE_CHUNK]
+        for asset_id, *state in conn.execute(
+            "SELECT id, asset_name, asset_type, currency, current_value FROM portfolio "
+            f"WHERE username=? AND id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+            [username, *chunk]
+        ):
+            states[asset_id] = tuple(state)
+    return states
+
+def _kind(before, after):
+    if before is None:
+        return 'add'
+    if after is None:
+        return 'delete'
+    if before[:3] == after[:3]:
+        return 'revalue'
+    return 'update'
+
+def record_events(conn, username, changes):
+    """Append ledger events and apply them to the user's snapshot; returns events written.
+
+    Runs inside the caller's write transaction, next to the portfolio
+    change it describes. ``changes`` holds ``(asset_id, at, before,
+    after)`` where ``at`` is epoch seconds (None or later = now) and
+    ``before`` / ``after`` are ``(asset_name, asset_type, currency,
+    current_value)`` or None for an add / delete. Unchanged holdings are
+    skipped.
+    """
+    now = int(time.time())
+    events = []
+    deltas = {}  # (asset_type, currency) -> [value, count]
+    for asset_id, at, before, after in changes:
+        if before == after:
+            continue
+        state = after if after is not None else before
+        # A future event would sit behind the next checkpoint without being in it
+        events.append((username, int(asset_id), _kind(before, after), now if at is None else min(int(at), now),
+                       *state))
+        if before is not None:
+            delta = deltas.setdefault((before[1], before[2]), [0.0, 0])
+            delta[0] -= before[3]
+            delta[1] -= 1
+        if after is not None:
+            delta = deltas.setdefault((after[1], after[2]), [0.0, 0])
+            delta[0] += after[3]
+            delta[1] += 1
+    if not events:
+        return 0
+
+    conn.executemany(
+        "INSERT INTO ledger (username, asset_id, kind, at, asset_name, asset_type, currency, value) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        events
+    )
+    conn.executemany(
+        "INSERT INTO holding_snapshots (username, asset_type, currency, total_value, asset_count) "
+        "VALUES (?, ?, ?, ?, ?) ON CONFLICT (username, asset_type, currency) DO UPDATE SET "
+        "total_value = holding_snapshots.total_value + excluded.total_value, "
+        "asset_count = holding_snapshots.asset_count + excluded.asset_count",
+        [(username, asset_type, currency, value, count)
+         for (asset_type, currency), (value, count) in deltas.items() if count or value]
+    )
+    if any(count < 0 for _, count in deltas.values()):
+        conn.execute("DELETE FROM holding_snapshots WHERE username=? AND asset_count <= 0", (username,))
+    return len(events)
+
+# ============================================
+# 📖 READING
+# ============================================
+
+@instrument('ledger.snapshot')
+def load_snapshot(username):
+    """``(asset_type, currency, total, count)`` rows of the user's materialized snapshot"""
+    with get_db().connection() as conn:
+        return conn.execute(
+            "SELECT asset_type, currency, total_value, asset_count FROM holding_snapshots "
+            "WHERE username=? ORDER BY asset_type, currency",
+            (username,)
+        ).fetchall()
+
+def as_of_cutoff(when):
+    """Last epoch second a point-in-time read covers.
+
+    A date means its end (UTC); a datetime (naive = UTC) or epoch seconds
+    are used as given.
+    """
+    if isinstance(when, (int, float)):
+        return int(when)
+    if isinstance(when, datetime):
+        return int(when.timestamp()) if when.tzinfo else calendar.timegm(when.timetuple())
+    if isinstance(when, date):
+        return calendar.timegm(when.timetuple()) + SECONDS_PER_DAY - 1
+    raise TypeError(f"Cannot read the ledger as of {when!r}")
+
+def _replay(conn, username, cutoff, through=None):
+    """Holdings state ``{id: [name, type, currency, value, added]}`` at ``cutoff`` and the last seq applied.
+
+    With ``through`` set, applies every event up to that seq whatever its
+    time instead, the way a checkpoint must.
+    """
+    if through is None:
+        checkpoint = conn.execute(
+            "SELECT seq, holdings FROM ledger_checkpoints WHERE username=? AND at <= ? ORDER BY seq DESC LIMIT 1",
+            (username, cutoff)
+        ).fetchone()
+    else:
+        checkpoint = conn.execute(
+            "SELECT seq, holdings FROM ledger_checkpoints WHERE username=? AND seq <= ? ORDER BY seq DESC LIMIT 1",
+            (username, through)
+        ).fetchone()
+    if checkpoint is None:
+        pruned = conn.execute(
+            "SELECT MIN(at) FROM ledger_checkpoints WHERE username=? AND pruned=1", (username,)
+        ).fetchone()[0]
+        if pruned is not None:
+            raise LookupError(
+                f"Ledger history before {time.strftime('%Y-%m-%d', time.gmtime(pruned))} has been compacted"
+            )
+        seq, state = 0, {}
+    else:
+        seq, state = checkpoint[0], {int(k): v for k, v in json.loads(checkpoint[1]).items()}
+
+    if through is None:
+        bound, params = "at <= ?", (username, seq, cutoff)
+    else:
+        bound, params = "seq <= ?", (username, seq, through)
+    for event_seq, asset_id, kind, at, *fields in conn.execute(
+        "SELECT seq, asset_id, kind, at, asset_name, asset_type, currency, value FROM ledger "
+        f"WHERE username=? AND seq > ? AND {bound} ORDER BY at, seq",
+        params
+    ):
+        if kind == 'add':
+            state[asset_id] = [*fields, at]
+        elif kind == 'delete':
+            state.pop(asset_id, None)
+        elif asset_id in state:
+            state[asset_id][:4] = fields
+        seq = max(seq, event_seq)
+    return state, seq
+
+@instrument('ledger.as_of')
+def holdings_as_of(username, when):
+    """``(id, name, type, value, currency, added)`` rows the user held at ``when``.
+
+    ``when`` is a date (its end), datetime or epoch seconds. Starts from
+    the latest checkpoint at or before then and replays the events since.
+    Raises LookupError when that history was pruned by compaction.
+    """
+    cutoff = as_of_cutoff(when)
+    with get_db().snapshot() as conn:
+        state, _ = _replay(conn, username, cutoff)
+    rows = [(asset_id, name, asset_type, value, currency, added)
+            for asset_id, (name, asset_type, currency, value, added) in state.items()]
+    return sorted(rows, key=lambda row: (row[5], row[0]))
+
+def ledger_events(username, limit=100, before_seq=None):
+    """Newest-first ``(seq, at, kind, asset_id, name, type, currency, value)`` audit rows"""
+    where, params = "username=?", [username]
+    if before_seq is not None:
+        where += " AND seq < ?"
+        params.append(before_seq)
+    with get_db().connection() as conn:
+        return conn.execute(
+            "SELECT seq, at, kind, asset_id, asset_name, asset_type, currency, value FROM ledger "
+            f"WHERE {where} ORDER BY seq DESC LIMIT ?",
+            [*params, limit]
+        ).fetchall()
+
+# ============================================
+# 🗜️ COMPACTION
+# ============================================
+
+def _compact_user(conn, username, now, retain_before):
+    # Every event written so far, by seq: a cutoff on ``at`` could leave out
+    # an event that later replays skip because its seq is behind the checkpoint
+    through, latest = conn.execute(
+        "SELECT MAX(seq), MAX(at) FROM ledger WHERE username=?", (username,)
+    ).fetchone()
+    state, seq = _replay(conn, username, None, through=through)
+    conn.execute(
+        "INSERT INTO ledger_checkpoints (username, seq, at, holdings) VALUES (?, ?, ?, ?)",
+        (username, seq, max(now, latest), json.dumps(state, separators=(',', ':')))
+    )
+    # Re-materialize the snapshot exactly, dropping float drift from many deltas
+    conn.execute("DELETE FROM holding_snapshots WHERE username=?", (username,))
+    conn.execute(
+        "INSERT INTO holding_snapshots (username, asset_type, currency, total_value, asset_count) "
+        "SELECT username, asset_type, currency, SUM(current_value), COUNT(*) FROM portfolio "
+        "WHERE username=? GROUP BY username, asset_type, currency",
+        (username,)
+    )
+    if retain_before is None:
+        return 0
+    base = conn.execute(
+        "SELECT seq FROM ledger_checkpoints WHERE username=? AND at < ? ORDER BY seq DESC LIMIT 1",
+        (username, retain_before)
+    ).fetchone()
+    if base is None:
+        return 0
+    pruned = conn.execute("DELETE FROM ledger WHERE username=? AND seq <= ?", (username, base[0])).rowcount
+    conn.execute("DELETE FROM ledger_checkpoints WHERE username=? AND seq < ?", (username, base[0]))
+    conn.execute("UPDATE ledger_checkpoints SET pruned=1 WHERE username=? AND seq=?", (username, base[0]))
+    return pruned
+
+@instrument('ledger.compact')
+def compact(checkpoint_events=CHECKPOINT_EVENTS, retain_days=None, chunk_users=COMPACT_CHUNK_USERS,
+            progress=None):
+    """Checkpoint every user with ``checkpoint_events`` or more events since their last checkpoint.
+
+    Each checkpoint also rebuilds the user's snapshot from the holdings.
+    With ``retain_days`` set, events older than that which an earlier
+    checkpoint already covers are deleted; point-in-time reads then
+    reach back to that checkpoint only. Without it the full audit trail
+    is kept. Returns ``{'users', 'checkpoints', 'pruned'}``.
+    """
+    stats = {'users': 0, 'checkpoints': 0, 'pruned': 0}
+    after = ''
+    while True:
+        with get_db().transaction() as conn:
+            # Read under the write lock: events written since are after it
+            now = int(time.time())
+            retain_before = None if retain_days is None else now - int(retain_days * SECONDS_PER_DAY)
+            usernames = [row[0] for row in conn.execute(
+                "SELECT username FROM users WHERE username > ? ORDER BY username LIMIT ?",
+                (after, chunk_users)
+            )]
+            for username in usernames:
+                last = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM ledger_checkpoints WHERE username=?", (username,)
+                ).fetchone()[0]
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM ledger WHERE username=? AND seq > ?", (username, last)
+                ).fetchone()[0]
+                if pending >= max(checkpoint_events, 1):
+                    stats['pruned'] += _compact_user(conn, username, now, retain_before)
+                    stats['checkpoints'] += 1
+        stats['users'] += len(usernames)
+        if progress is not None:
+            progress(stats)
+        if len(usernames) < chunk_users:
+            return stats
+        after = usernames[-1]
+
+# ============================================
+# 🌙 CLI
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FinSight holdings ledger")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--compact', action='store_true', help="checkpoint users with long event tails")
+    action.add_argument('--as-of', nargs=2, metavar=('USER', 'DATE'), help="holdings at the end of DATE")
+    action.add_argument('--events', metavar='USER', help="a user's most recent events")
+    parser.add_argument('--checkpoint-events', type=int, default=CHECKPOINT_EVENTS)
+    parser.add_argument('--retain-days', type=float, help="prune events older than this (keeps all by default)")
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.compact:
+        started = time.perf_counter()
+        stats = compact(args.checkpoint_events, args.retain_days,
+                        progress=lambda s: print(f"\r{s['users']:,} users checked", end='', file=sys.stderr))
+        print(f"\n{stats['checkpoints']:,} checkpoints written, {stats['pruned']:,} events pruned "
+              f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    elif args.as_of:
+        username, day = args.as_of
+        rows = holdings_as_of(username, date.fromisoformat(day))
+        for asset_id, name, asset_type, value, currency, added in rows:
+            print(f"{asset_id:>8} {time.strftime('%Y-%m-%d', time.gmtime(added))} {asset_type:12s} "
+                  f"{value:>16,.2f} {currency:4s} {name}")
+        print(f"{len(rows):,} holdings", file=sys.stderr)
+    else:
+        for seq, at, kind, asset_id, name, asset_type, currency, value in ledger_events(args.events, args.limit):
+            print(f"{seq:>10} {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(at))} {kind:8s} {asset_id:>8} "
+                  f"{asset_type:12s} {value:>16,.2f} {currency:4s} {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+🎭 FinSight Login
+Login/sign-up page and session token handling; imports nothing heavier than Streamlit
+
+The session cookie is set from page script, so it cannot be HttpOnly:
+any script running on the page can read the token. HTML rendered with
+unsafe_allow_html must therefore pass user values through html.escape.
+"""
+
+import streamlit as st
+
+from auth import AuthBusy, LoginThrottled, authenticate_user, client_key, register_user
+from sessions import SESSION_TTL, create_session, revoke_session, validate_session
+
+# ============================================
+# 🎟️ SESSION STATE
+# ============================================
+
+SESSION_COOKIE = 'finsight_session'  # the token survives page refreshes in a cookie
+
+def _write_cookie(token):
+    """Set the session cookie on the app's page, or clear it for None.
+
+    Streamlit has no response to attach Set-Cookie to, so a zero-height
+    component (same origin as the app) writes it for the next connection.
+    """
+    import json
+
+    import streamlit.components.v1 as components
+
+    value, max_age = (token, SESSION_TTL) if token else ('', 0)
+    cookie = json.dumps(f"{SESSION_COOKIE}={value}; Max-Age={max_age}; Path=/; SameSite=Strict")
+    components.html(
+        "<script>const page = window.parent;"
+        f"page.document.cookie = {cookie} + (page.location.protocol === 'https:' ? '; Secure' : '');"
+        "</script>",
+        height=0,
+    )
+
+def start_session(username):
+    """Log in this browser session and remember it in a signed token"""
+    token = create_session(username)
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.session_token = token
+    st.session_state.pending_cookie = token
+
+def restore_session():
+    """Re-check the session token on every rerun (a memory lookup once validated).
+
+    Restores the login after a refresh or reconnect, and logs out when the
+    session expired or was revoked in any process.
+    """
+    if 'pending_cookie' in st.session_state:
+        _write_cookie(st.session_state.pop('pending_cookie'))
+    # Links from before the cookie carried the token in the URL
+    st.query_params.pop('sid', None)
+    token = st.session_state.get('session_token')
+    if token is None:
+        token = st.context.cookies.get(SESSION_COOKIE)
+    if not token:
+        return
+    username = validate_session(token)
+    if username is None:
+        end_session()
+        return
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.session_token = token
+
+def end_session():
+    """Log out, revoking the session token everywhere"""
+    revoke_session(st.session_state.get('session_token'))
+    st.session_state.logged_in = False
+    st.session_state.username = None
+    # '' rather than None: the cookie this connection started with is stale now
+    st.session_state.session_token = ''
+    st.session_state.pending_cookie = None
+
+def _peer_address():
+    """Address of this browser's websocket connection, if Streamlit exposes it"""
+    try:
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        info = Runtime.instance()._session_mgr.get_session_info(get_script_run_ctx().session_id)
+        return info.client.request.remote_ip
+    except Exception:
+        # Internal API: without it only the per-username limit applies
+        return None
+
+def client_address():
+    """Caller address for the login limiter (see auth.client_key)"""
+    return client_key(st.context.headers.get('X-Forwarded-For'), _peer_address())
+
+# ============================================
+# 🎭 AUTHENTICATION UI
+# ============================================
+
+def show_auth_page():
+    """Display login/signup page"""
+    st.markdown('<h1 class="animated-title">💼 FinSight</h1>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; color: #00d4ff; font-size: 1.2em;">Smart Portfolio Manager & Investment Predictor</p>', unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    tab1, tab2 = st.tabs(["🔐 Login", "📝 Sign Up"])
+    
+    with tab1:
+        st.subheader("Welcome Back!")
+        with st.form("login_form"):
+            username = st.text_input("Username", placeholder="Enter your username")
+            password = st.text_input("Password", type="password", placeholder="Enter your password")
+            login_btn = st.form_submit_button("🚀 Login", use_container_width=True)
+            
+            if login_btn:
+                if username and password:
+                    try:
+                        authenticated = authenticate_user(username, password, client_address())
+                    except (LoginThrottled, AuthBusy) as e:
+                        st.error(f"⏳ {e}")
+                        authenticated = None
+                    if authenticated:
+                        start_session(username)
+                        st.success("✅ Login successful!")
+                        st.rerun()
+                    elif authenticated is False:
+                        st.error("❌ Invalid credentials!")
+                else:
+                    st.warning("⚠️ Please fill all fields!")
+    
+    with tab2:
+        st.subheader("Create Your Account")
+        with st.form("signup_form"):
+            new_username = st.text_input("Username", placeholder="Choose a username", key="su_user")
+            new_email = st.text_input("Email", placeholder="your.email@example.com", key="su_email")
+            new_password = st.text_input("Password", type="password", placeholder="Create a strong password", key="su_pw")
+            confirm_password = st.text_input("Confirm Password", type="password", placeholder="Re-enter password", key="su_pw2")
+            signup_btn = st.form_submit_button("✨ Create Account", use_container_width=True)
+            
+            if signup_btn:
+                if new_username and new_email and new_password and confirm_password:
+                    if new_password == confirm_password:
+                        success, message = register_user(new_username, new_email, new_password)
+                        if success:
+                            st.success(message)
+                        else:
+                            st.error(message)
+                    else:
+                        st.error("❌ Passwords don't match!")
+                else:
+                    st.warning("⚠️ Please fill all fields!")
@@ -0,0 +1,284 @@
+"""
+📏 FinSight Instrumentation
+Timing spans around hot paths, rolling latency percentiles, per-rerun traces,
+on-demand cProfile/tracemalloc captures and Prometheus/JSON export.
+Standard library only, so every module (and the login screen) can import it.
+"""
+
+import functools
+import io
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# FINSIGHT_METRICS=0 turns every span into a no-op
+METRICS_ENABLED = os.environ.get('FINSIGHT_METRICS', '1') != '0'
+HISTOGRAM_WINDOW = 2048  # latest samples per span behind the percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+TRACE_HISTORY = 50  # recent reruns/requests kept with their span trees
+MAX_TRACE_SPANS = 500  # spans recorded per trace; later ones only feed the histograms
+PROFILE_HISTORY = 5
+PROFILE_TOP = 30  # functions or allocation sites per profile report
+
+# ============================================
+# 📊 ROLLING HISTOGRAMS
+# ============================================
+
+class Histogram:
+    """Durations of one span: lifetime count/sum plus a rolling sample window.
+
+    Percentiles come from the last ``window`` samples, so they follow the
+    current behaviour of the process rather than its whole history.
+    """
+
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self.count, self.total
+        last = len(samples) - 1
+        snapshot = {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0,
+            'max': samples[-1] if samples else 0.0,
+        }
+        for q in QUANTILES:
+            snapshot[f"p{round(q * 100)}"] = samples[round(q * last)] if samples else 0.0
+        return snapshot
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+def histogram(name):
+    """Return the named process-wide histogram, creating it once"""
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.get(name)
+            if hist is None:
+                hist = _histograms[name] = Histogram()
+    return hist
+
+def observe(name, seconds):
+    """Record a duration measured elsewhere (e.g. a finished HTTP request)"""
+    if METRICS_ENABLED:
+        histogram(name).observe(seconds)
+
+# ============================================
+# ⏱️ SPANS & TRACES
+# ============================================
+
+_local = threading.local()
+_traces = deque(maxlen=TRACE_HISTORY)
+
+@contextmanager
+def span(name):
+    """Time a block into the ``name`` histogram and the thread's active trace"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    local = _local
+    spans = getattr(local, 'spans', None)
+    entry = None
+    started = time.perf_counter()
+    if spans is not None:
+        if len(spans) < MAX_TRACE_SPANS:
+            entry = [name, local.depth, started - local.origin, 0.0]
+            spans.append(entry)
+        local.depth += 1
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram(name).observe(elapsed)
+        if spans is not None:
+            local.depth -= 1
+            if entry is not None:
+                entry[3] = elapsed
+
+def instrument(name):
+    """Decorator form of ``span``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def trace(name, label=None):
+    """Collect every span this thread enters in the block (one rerun or request).
+
+    The finished trace joins ``recent_traces()`` as ``name``, ``label``,
+    ``started`` (epoch), ``seconds`` and ``spans``: ``(name, depth,
+    offset, seconds)`` tuples in the order they were entered. Nested
+    traces fold into the outer one.
+    """
+    local = _local
+    if not METRICS_ENABLED or getattr(local, 'spans', None) is not None:
+        with span(name):
+            yield
+        return
+    local.spans, local.depth, local.origin = [], 0, time.perf_counter()
+    started = time.time()
+    try:
+        with span(name):
+            yield
+    finally:
+        spans, local.spans = local.spans, None
+        _traces.appendleft({
+            'name': name,
+            'label': label,
+            'started': started,
+            'seconds': spans[0][3],
+            'spans': [tuple(entry) for entry in spans],
+        })
+
+def recent_traces():
+    """Most recent traces first"""
+    return list(_traces)
+
+# ============================================
+# 🔬 PROFILING
+# ============================================
+
+_profiles = deque(maxlen=PROFILE_HISTORY)
+_profile_lock = threading.Lock()  # one interpreter-wide profiler at a time
+
+@contextmanager
+def profiled(kind, label=None):
+    """Capture a cProfile ('cpu') or tracemalloc ('memory') report of the block.
+
+    Reports join ``recent_profiles()``. If another capture is running
+    the block runs unprofiled.
+    """
+    if kind not in ('cpu', 'memory'):
+        raise ValueError(f"Unsupported profile kind: {kind}")
+    if not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    started = time.time()
+    report = None
+    try:
+        if kind == 'cpu':
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+                report = out.getvalue()
+        else:
+            import tracemalloc
+
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            try:
+                yield
+            finally:
+                after = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if not was_tracing:
+                    tracemalloc.stop()
+                lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MB", "Top allocation sites (growth):"]
+                lines.extend(str(stat) for stat in after.compare_to(before, 'lineno')[:PROFILE_TOP])
+                report = '\n'.join(lines)
+    finally:
+        # Also kept when the block raised (st.rerun() ends a rerun by raising)
+        if report is not None:
+            _profiles.appendleft({
+                'kind': kind,
+                'label': label,
+                'started': started,
+                'seconds': time.time() - started,
+                'report': report,
+            })
+        _profile_lock.release()
+
+def recent_profiles():
+    """Most recent profile reports first"""
+    return list(_profiles)
+
+# ============================================
+# 📤 EXPORT
+# ============================================
+
+def snapshot():
+    """``{span name: count/sum/mean/max/p50/p95/p99}`` in seconds"""
+    return {name: hist.snapshot() for name, hist in sorted(_histograms.items())}
+
+def collect():
+    """Span percentiles plus cache and connection-pool counters (JSON-ready)"""
+    from cache import cache_stats
+    from database import get_db
+
+    return {
+        'spans': snapshot(),
+        'caches': cache_stats(),
+        'database': get_db().stats(),
+    }
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text(metrics=None):
+    """``collect()`` in the Prometheus text exposition format"""
+    metrics = metrics or collect()
+    lines = [
+        "# HELP finsight_span_seconds Time in instrumented code paths; quantiles over recent calls",
+        "# TYPE finsight_span_seconds summary",
+    ]
+    for name, stats in metrics['spans'].items():
+        for q in QUANTILES:
+            lines.append(f'finsight_span_seconds{{span="{_label(name)}",quantile="{q}"}} '
+                         f'{stats[f"p{round(q * 100)}"]:.9f}')
+        lines.append(f'finsight_span_seconds_sum{{span="{_label(name)}"}} {stats["sum"]:.9f}')
+        lines.append(f'finsight_span_seconds_count{{span="{_label(name)}"}} {stats["count"]}')
+
+    cache_metrics = (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'),
+                     ('entries', 'gauge'), ('bytes', 'gauge'))
+    for key, kind in cache_metrics:
+        metric = f"finsight_cache_{key}" + ('_total' if kind == 'counter' else '')
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{cache="{_label(name)}"}} {stats[key]}'
+                     for name, stats in sorted(metrics['caches'].items()))
+
+    for key, value in metrics['database'].items():
+        lines.append(f"# TYPE finsight_db_pool_{key} gauge")
+        lines.append(f"finsight_db_pool_{key} {value}")
+    return '\n'.join(lines) + '\n'
+
+def reset():
+    """Forget every histogram, trace and profile"""
+    with _histograms_lock:
+        _histograms.clear()
+    _traces.clear()
+    _profiles.clear()
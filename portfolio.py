@@ -0,0 +1,447 @@
+"""
+💼 FinSight Portfolio Data
+Holdings storage, caching, bulk import and aggregate queries, free of any UI
+"""
+
+import calendar
+import io
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from batch import build_summary, load_summary
+from cache import get_cache
+from database import bump_revision, get_db, portfolio_revision
+from fx import BASE_CURRENCY, CURRENCIES, has_rate, rates_version
+from ledger import as_of_cutoff, holding_states, holdings_as_of, load_snapshot, record_events
+from metrics import instrument
+from timeseries import delete_history, invalidate_history, record_valuations
+
+# ============================================
+# 💼 PORTFOLIO MANAGEMENT FUNCTIONS
+# ============================================
+
+ASSET_TYPES = ["Stock", "Crypto", "Mutual Fund", "Real Estate", "Gold", "Others"]
+
+HOLDINGS_PAGE_SIZE = 25
+
+IMPORT_CHUNK_SIZE = 5000  # rows per INSERT transaction during bulk import
+IMPORT_INSERT_ROWS = 500  # rows per multi-row INSERT ... RETURNING, well under SQLite's variable limit
+
+# Columns of every holdings DataFrame; Value is in the holding's own Currency
+HOLDINGS_COLUMNS = ['ID', 'Asset Name', 'Type', 'Value', 'Currency', 'Date Added']
+
+# Sort keys accepted by get_holdings_page -> (column, position in the SELECT)
+HOLDINGS_SORT_COLUMNS = {
+    'added_date': 5,
+    'asset_name': 1,
+    'asset_type': 2,
+    'current_value': 3,
+}
+
+# Per-user cache of holdings and aggregates, shared across reruns and sessions.
+# Writes invalidate the user's entries; the TTL bounds staleness when another
+# process writes to the same database.
+PORTFOLIO_CACHE_OPTIONS = dict(max_entries=2048, max_bytes=128 * 1024 * 1024, ttl=300)
+
+def portfolio_cache():
+    """Process-wide per-user portfolio cache"""
+    return get_cache('portfolio', **PORTFOLIO_CACHE_OPTIONS)
+
+def invalidate_portfolio(username):
+    """Drop every cached view of a user's portfolio after a write"""
+    portfolio_cache().invalidate_tag(username)
+    invalidate_history(username)
+
+def get_revision(username):
+    """Current portfolio revision of a user; every write advances it"""
+    with get_db().connection() as conn:
+        return portfolio_revision(conn, username)
+
+_seen_revisions = {}  # username -> revision this process last served
+
+def sync_revision(username):
+    """Current revision, first dropping cached views if another process wrote since.
+
+    Read the revision before the data it labels: the data is then at least
+    as new as the revision, so an ETag never vouches for stale content.
+    """
+    revision = get_revision(username)
+    if _seen_revisions.get(username) != revision:
+        invalidate_portfolio(username)
+        _seen_revisions[username] = revision
+    return revision
+
+def check_currency(currency):
+    """Raise ValueError unless holdings can be recorded in ``currency``"""
+    if currency not in CURRENCIES:
+        raise ValueError(f"Currency must be one of: {', '.join(CURRENCIES)}")
+    if not has_rate(currency):
+        raise ValueError(f"No exchange rate recorded for {currency} yet")
+
+@instrument('portfolio.add')
+def add_asset(username, asset_name, asset_type, current_value, currency=BASE_CURRENCY):
+    """Add new asset to user's portfolio; returns its id"""
+    check_currency(currency)
+    with get_db().transaction() as conn:
+        asset_id = conn.execute(
+            "INSERT INTO portfolio (username, asset_name, asset_type, current_value, currency) "
+            "VALUES (?, ?, ?, ?, ?) RETURNING id",
+            (username, asset_name, asset_type, current_value, currency)
+        ).fetchone()[0]
+        record_valuations([(asset_id, None, current_value)], conn=conn)
+        record_events(conn, username, [(asset_id, None, None, (asset_name, asset_type, currency, current_value))])
+        bump_revision(conn, username)
+    invalidate_portfolio(username)
+    return asset_id
+
+def get_portfolio(username):
+    """Retrieve user's portfolio (cached; treat the DataFrame as read-only)"""
+    return portfolio_cache().get_or_set(
+        ('rows', username), lambda: _load_portfolio(username), tag=username
+    )
+
+@instrument('portfolio.load')
+def _load_portfolio(username):
+    with get_db().connection() as conn:
+        data = conn.execute(
+            "SELECT id, asset_name, asset_type, current_value, currency, added_date FROM portfolio "
+            "WHERE username=? ORDER BY added_date, id",
+            (username,)
+        ).fetchall()
+    if data:
+        df = pd.DataFrame(data, columns=HOLDINGS_COLUMNS)
+        df['Date Added'] = pd.to_datetime(df['Date Added'], unit='s')
+        return df
+    return pd.DataFrame()
+
+def delete_asset(asset_id):
+    """Delete asset from portfolio"""
+    with get_db().transaction() as conn:
+        row = conn.execute("SELECT username FROM portfolio WHERE id=?", (asset_id,)).fetchone()
+        if row:
+            state = holding_states(conn, row[0], [asset_id])[asset_id]
+        conn.execute("DELETE FROM portfolio WHERE id=?", (asset_id,))
+        delete_history(conn, [asset_id])
+        if row:
+            record_events(conn, row[0], [(asset_id, None, state, None)])
+            bump_revision(conn, row[0])
+    if row:
+        invalidate_portfolio(row[0])
+
+@instrument('portfolio.delete')
+def delete_assets(username, asset_ids):
+    """Delete several of a user's assets in one statement; returns rows removed"""
+    asset_ids = [int(asset_id) for asset_id in asset_ids]
+    if not asset_ids:
+        return 0
+    placeholders = ','.join('?' * len(asset_ids))
+    with get_db().transaction() as conn:
+        owned = holding_states(conn, username, asset_ids)
+        deleted = conn.execute(
+            f"DELETE FROM portfolio WHERE username=? AND id IN ({placeholders})",
+            [username, *asset_ids]
+        ).rowcount
+        delete_history(conn, list(owned))
+        record_events(conn, username, [(asset_id, None, state, None) for asset_id, state in owned.items()])
+        bump_revision(conn, username)
+    invalidate_portfolio(username)
+    return deleted
+
+@instrument('portfolio.update')
+def update_assets(username, updates):
+    """Batch-update a user's assets; returns rows changed.
+
+    ``updates`` is an iterable of dicts (or a DataFrame) with an ``id`` and
+    any of ``asset_name``, ``asset_type``, ``current_value`` and
+    ``currency``; missing or None fields keep their stored value.
+    """
+    if hasattr(updates, 'to_dict'):
+        updates = updates.to_dict('records')
+    params = [
+        (u.get('asset_name'), u.get('asset_type'), u.get('current_value'), u.get('currency'),
+         username, int(u['id']))
+        for u in updates
+    ]
+    if not params:
+        return 0
+    for currency in {p[3] for p in params} - {None}:
+        check_currency(currency)
+    with get_db().transaction() as conn:
+        before = holding_states(conn, username, [p[-1] for p in params])
+        changed = conn.executemany(
+            "UPDATE portfolio SET asset_name=COALESCE(?, asset_name), "
+            "asset_type=COALESCE(?, asset_type), current_value=COALESCE(?, current_value), "
+            "currency=COALESCE(?, currency) "
+            "WHERE username=? AND id=?",
+            params
+        ).rowcount
+        after = holding_states(conn, username, before)
+        revalued = {p[-1] for p in params if p[2] is not None}
+        # Today's valuation for every asset whose value changed
+        record_valuations(
+            [(asset_id, None, state[3]) for asset_id, state in after.items() if asset_id in revalued],
+            conn=conn
+        )
+        record_events(conn, username, [(asset_id, None, before[asset_id], state) for asset_id, state in after.items()])
+        bump_revision(conn, username)
+    invalidate_portfolio(username)
+    return changed
+
+def read_asset_file(name, data):
+    """Load an uploaded file in any export format into a DataFrame"""
+    name = name.lower()
+    if name.endswith('.parquet'):
+        return pd.read_parquet(io.BytesIO(data))
+    if name.endswith('.jsonl'):
+        return pd.read_json(io.BytesIO(data), lines=True, dtype={'Currency': str, 'Date Added': str})
+    return pd.read_csv(io.BytesIO(data),
+                       dtype={'Asset Name': str, 'Type': str, 'Currency': str, 'Date Added': str},
+                       compression='gzip' if name.endswith('.gz') else None)
+
+@instrument('portfolio.validate')
+def validate_assets(df):
+    """Vectorized validation of rows in the CSV export layout.
+
+    Returns ``(valid, errors)``: ``valid`` has columns asset_name,
+    asset_type, current_value, currency and added_date (epoch seconds)
+    ready for insertion; ``errors`` lists ``Row`` (1-based data row) and
+    ``Error``. An ``ID`` column, if present, is ignored so exports can be
+    re-imported. ``Currency`` defaults to BASE_CURRENCY, and files from
+    before multi-currency support (a ``Value (₹)`` column) still import.
+    """
+    if 'Value' not in df.columns and 'Value (₹)' in df.columns:
+        df = df.rename(columns={'Value (₹)': 'Value'})
+    missing = [c for c in ('Asset Name', 'Type', 'Value') if c not in df.columns]
+    if missing:
+        return pd.DataFrame(), pd.DataFrame({'Row': [0], 'Error': [f"Missing columns: {', '.join(missing)}"]})
+
+    names = df['Asset Name'].astype('string').str.strip()
+    types = df['Type'].astype('string').str.strip()
+    values = pd.to_numeric(df['Value'], errors='coerce')
+    if 'Currency' in df.columns:
+        currencies = df['Currency'].astype('string').str.strip().str.upper().fillna(BASE_CURRENCY)
+        currencies = currencies.mask(currencies == '', BASE_CURRENCY)
+    else:
+        currencies = pd.Series(BASE_CURRENCY, index=df.index, dtype='string')
+    known = currencies.isin(CURRENCIES).astype(bool)
+    priced = currencies.isin([c for c in CURRENCIES if has_rate(c)]).astype(bool)
+    if 'Date Added' in df.columns:
+        raw_dates = df['Date Added']
+        dates = pd.to_datetime(raw_dates, errors='coerce', format='ISO8601')
+        bad_dates = dates.isna() & raw_dates.notna() & (raw_dates.astype('string').str.strip() != '')
+    else:
+        dates = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+        bad_dates = pd.Series(False, index=df.index)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+    # Ledger checkpoints cover events up to the time they are taken
+    future_dates = dates > pd.Timestamp.now('UTC').tz_localize(None)
+
+    checks = [
+        (names.isna() | (names == ''), "Asset name is empty"),
+        (~types.isin(ASSET_TYPES).fillna(False).astype(bool), f"Type must be one of: {', '.join(ASSET_TYPES)}"),
+        (values.isna(), "Value is not a number"),
+        (values.notna() & (values <= 0), "Value must be greater than 0"),
+        (bad_dates, "Date Added is not a valid date"),
+        (future_dates, "Date Added is in the future"),
+        (~known, f"Currency must be one of: {', '.join(CURRENCIES)}"),
+        (known & ~priced, "No exchange rate recorded for this currency yet"),
+    ]
+    row_numbers = pd.Series(range(1, len(df) + 1), index=df.index)
+    errors = pd.concat(
+        [pd.DataFrame({'Row': row_numbers[mask], 'Error': message}) for mask, message in checks],
+        ignore_index=True
+    ).sort_values('Row', kind='stable', ignore_index=True)
+
+    ok = ~row_numbers.isin(errors['Row'])
+    epochs = (dates[ok] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    valid = pd.DataFrame({
+        'asset_name': names[ok].astype(object),
+        'asset_type': types[ok].astype(object),
+        'current_value': values[ok].astype(float),
+        'currency': currencies[ok].astype(object),
+        'added_date': epochs.fillna(int(datetime.now().timestamp())).astype('int64'),
+    })
+    return valid, errors
+
+@instrument('portfolio.import')
+def import_assets(username, df, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """Validate and bulk-insert holdings; returns ``(inserted, errors)``.
+
+    Valid rows are written with multi-row ``INSERT ... RETURNING`` in
+    transactions of ``chunk_size`` rows. ``progress(done, total)`` is
+    called after each chunk. Invalid rows are skipped and reported in
+    ``errors``.
+    """
+    valid, errors = validate_assets(df)
+    total = len(valid)
+    inserted = 0
+    try:
+        for start in range(0, total, chunk_size):
+            chunk = valid.iloc[start:start + chunk_size]
+            with get_db().transaction() as conn:
+                added = []
+                for offset in range(0, len(chunk), IMPORT_INSERT_ROWS):
+                    part = chunk.iloc[offset:offset + IMPORT_INSERT_ROWS]
+                    params = [value for row in zip(
+                        [username] * len(part), part['asset_name'], part['asset_type'],
+                        part['current_value'].tolist(), part['currency'], part['added_date'].tolist()
+                    ) for value in row]
+                    # RETURNING, not a MAX(id) window: concurrent imports can interleave ids on PostgreSQL
+                    added += conn.execute(
+                        "INSERT INTO portfolio (username, asset_name, asset_type, current_value, currency, "
+                        f"added_date) VALUES {', '.join(['(?, ?, ?, ?, ?, ?)'] * len(part))} "
+                        "RETURNING id, added_date, asset_name, asset_type, currency, current_value",
+                        params
+                    ).fetchall()
+                # First valuation and ledger add of each new holding on its added date
+                record_valuations([(row[0], row[1], row[5]) for row in added], conn=conn)
+                record_events(conn, username, [(row[0], row[1], None, tuple(row[2:])) for row in added])
+                bump_revision(conn, username)
+            inserted += len(chunk)
+            if progress is not None:
+                progress(inserted, total)
+    finally:
+        if inserted:
+            invalidate_portfolio(username)
+    return inserted, errors
+
+def _epoch(day):
+    """UTC midnight of a date as epoch seconds (matches strftime('%s'))"""
+    return calendar.timegm(day.timetuple())
+
+def _holdings_filter(username, asset_types=None, name_query=None, date_from=None, date_to=None):
+    where, params = ["username=?"], [username]
+    if asset_types:
+        where.append(f"asset_type IN ({','.join('?' * len(asset_types))})")
+        params.extend(asset_types)
+    if name_query:
+        escaped = name_query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        # LOWER on both sides: case-insensitive on every backend, like SQLite's LIKE
+        where.append("LOWER(asset_name) LIKE LOWER(?) ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if date_from is not None:
+        where.append("added_date >= ?")
+        params.append(_epoch(date_from))
+    if date_to is not None:
+        where.append("added_date < ?")
+        params.append(_epoch(date_to + timedelta(days=1)))
+    return where, params
+
+def get_holdings_page(username, sort='added_date', descending=False, asset_types=None,
+                      name_query=None, date_from=None, date_to=None, cursor=None,
+                      limit=HOLDINGS_PAGE_SIZE):
+    """Fetch one page of holdings using keyset pagination.
+
+    ``cursor`` is the ``(sort value, id)`` pair of the last row on the
+    previous page (None for the first page). Returns ``(df, next_cursor)``
+    where ``next_cursor`` is None on the last page. The query cost depends
+    on the page size, not on how deep into the portfolio the page is.
+    """
+    if sort not in HOLDINGS_SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort column: {sort}")
+    key = ('page', username, sort, descending, tuple(asset_types or ()), name_query,
+           date_from, date_to, cursor, limit)
+    return portfolio_cache().get_or_set(
+        key,
+        lambda: _load_holdings_page(username, sort, descending, asset_types, name_query,
+                                    date_from, date_to, cursor, limit),
+        tag=username
+    )
+
+@instrument('portfolio.page')
+def _load_holdings_page(username, sort, descending, asset_types, name_query,
+                        date_from, date_to, cursor, limit):
+    where, params = _holdings_filter(username, asset_types, name_query, date_from, date_to)
+    order = 'DESC' if descending else 'ASC'
+    if cursor is not None:
+        where.append(f"({sort}, id) {'<' if descending else '>'} (?, ?)")
+        params.extend(cursor)
+    with get_db().connection() as conn:
+        data = conn.execute(
+            "SELECT id, asset_name, asset_type, current_value, currency, added_date FROM portfolio "
+            f"WHERE {' AND '.join(where)} ORDER BY {sort} {order}, id {order} LIMIT ?",
+            [*params, limit + 1]
+        ).fetchall()
+
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        last = data[-1]
+        next_cursor = (last[HOLDINGS_SORT_COLUMNS[sort]], last[0])
+    df = pd.DataFrame(data, columns=HOLDINGS_COLUMNS)
+    df['Date Added'] = pd.to_datetime(df['Date Added'], unit='s')
+    return df, next_cursor
+
+def count_holdings(username, asset_types=None, name_query=None, date_from=None, date_to=None):
+    """Number of holdings matching the holdings-page filters"""
+    key = ('count', username, tuple(asset_types or ()), name_query, date_from, date_to)
+
+    @instrument('portfolio.count')
+    def load():
+        where, params = _holdings_filter(username, asset_types, name_query, date_from, date_to)
+        with get_db().connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM portfolio WHERE {' AND '.join(where)}", params
+            ).fetchone()[0]
+
+    return portfolio_cache().get_or_set(key, load, tag=username)
+
+def get_portfolio_summary(username, currency=BASE_CURRENCY):
+    """Totals and per-type sum/count/mean/percentage for a user in ``currency``.
+
+    Uses the batch job's precomputed row (with advice and projection) when
+    it matches the current portfolio revision; otherwise the user's
+    materialized ledger snapshot, a handful of rows however many holdings
+    there are. Cached per user alongside get_portfolio and
+    keyed on the rate table's version, so new rates are picked up.
+    """
+    return portfolio_cache().get_or_set(
+        ('summary', username, currency, rates_version()),
+        lambda: _load_portfolio_summary(username, currency),
+        tag=username
+    )
+
+@instrument('portfolio.summary')
+def _load_portfolio_summary(username, currency):
+    stored = load_summary(username, currency)
+    if stored is not None:
+        return stored
+    return build_summary(load_snapshot(username), currency)
+
+def get_portfolio_as_of(username, when):
+    """Holdings as they stood at ``when`` (a date means its end), rebuilt from the ledger.
+
+    Same columns as get_portfolio, with values as of then. Raises
+    LookupError if compaction pruned that far back. Cached per user
+    until their next write.
+    """
+    cutoff = as_of_cutoff(when)
+
+    def load():
+        df = pd.DataFrame(holdings_as_of(username, cutoff), columns=HOLDINGS_COLUMNS)
+        df['Date Added'] = pd.to_datetime(df['Date Added'], unit='s')
+        return df
+
+    return portfolio_cache().get_or_set(('as_of', username, cutoff), load, tag=username)
+
+# ============================================
+# 🤖 PROJECTIONS
+# ============================================
+
+@instrument('projection.predict')
+def predict_portfolio_value(summary, years):
+    """Monte Carlo projection of the portfolio for 0..years.
+
+    Simulates every asset type in the summary with its own drift and
+    volatility and returns P5/P50/P95 bands. Results are memoized by
+    allocation, so repeated clicks and slider moves skip the simulation.
+    """
+    if 'projection' in summary:
+        # Precomputed by the batch job for every horizon up to MAX_YEARS
+        return {name: values[:years + 1] for name, values in summary['projection'].items()}
+    from projections import PROJECTION_SEED, cached_projection
+
+    allocation = dict(zip(summary['by_type']['Type'], summary['by_type']['Total Value']))
+    return cached_projection(allocation, years, seed=PROJECTION_SEED)
@@ -0,0 +1,178 @@
+"""
+🔮 FinSight Projection Engine
+Vectorized Monte Carlo simulation of portfolio value by asset type
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from cache import get_cache
+from metrics import instrument
+
+# ============================================
+# ⚙️ ASSUMPTIONS
+# ============================================
+
+# Annual expected return and volatility per asset type
+ASSET_ASSUMPTIONS = {
+    'Stock': (0.11, 0.18),
+    'Crypto': (0.20, 0.70),
+    'Mutual Fund': (0.10, 0.14),
+    'Real Estate': (0.08, 0.10),
+    'Gold': (0.07, 0.15),
+    'Others': (0.06, 0.10),
+}
+FALLBACK_TYPE = 'Others'
+
+DEFAULT_PATHS = 10000
+PROJECTION_SEED = 42  # fixed seed: the same portfolio always gets the same projection
+MAX_YEARS = 20
+PERCENTILES = (5, 50, 95)
+
+# Allocations are keyed by their per-type weights rounded to this many
+# decimals, so portfolios with the same composition share one simulation.
+WEIGHT_DECIMALS = 4
+PROJECTION_CACHE_OPTIONS = dict(max_entries=20000, max_bytes=32 * 1024 * 1024)
+# Directory for persisted projections (unset disables the disk tier)
+PROJECTION_CACHE_DIR = os.environ.get('FINSIGHT_PROJECTION_CACHE_DIR')
+
+# ============================================
+# 🎲 SIMULATION
+# ============================================
+
+@instrument('projection.simulate')
+def simulate_projection(allocation, years=MAX_YEARS, n_paths=DEFAULT_PATHS, seed=None,
+                        assumptions=None, correlation=None, percentiles=PERCENTILES):
+    """Simulate yearly portfolio values and return percentile bands.
+
+    ``allocation`` maps asset type -> current value. Each type follows a
+    geometric Brownian motion with its (drift, volatility) from
+    ``assumptions``; all types and paths are drawn as one
+    ``(types, paths, years)`` array. ``correlation`` is an optional
+    types x types matrix (in ``allocation`` order) applied through its
+    Cholesky factor. Pass ``seed`` for reproducible results.
+
+    Returns a dict with ``years`` (0..years), ``mean`` and one
+    ``p<N>`` array per requested percentile, each of length years + 1
+    with the current total at index 0.
+    """
+    if not 1 <= years <= MAX_YEARS:
+        raise ValueError(f"years must be between 1 and {MAX_YEARS}")
+    assumptions = assumptions or ASSET_ASSUMPTIONS
+    types = [t for t, value in allocation.items() if value > 0]
+    values = np.array([allocation[t] for t in types], dtype=float)
+    total = float(values.sum())
+
+    result = {'years': np.arange(years + 1)}
+    if not types:
+        zeros = np.zeros(years + 1)
+        result['mean'] = zeros
+        for p in percentiles:
+            result[f'p{p}'] = zeros
+        return result
+
+    params = np.array([assumptions.get(t, assumptions[FALLBACK_TYPE]) for t in types])
+    drift, vol = params[:, 0], params[:, 1]
+    log_mean = np.log1p(drift) - 0.5 * vol ** 2
+
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((len(types), n_paths, years))
+    if correlation is not None:
+        chol = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+        shocks = np.einsum('ij,jpy->ipy', chol, shocks)
+
+    log_returns = log_mean[:, None, None] + vol[:, None, None] * shocks
+    growth = np.exp(np.cumsum(log_returns, axis=2))
+    paths = np.einsum('t,tpy->py', values, growth)  # (paths, years)
+
+    bands = np.percentile(paths, percentiles, axis=0)
+    result['mean'] = np.concatenate(([total], paths.mean(axis=0)))
+    for p, band in zip(percentiles, bands):
+        result[f'p{p}'] = np.concatenate(([total], band))
+    return result
+
+# ============================================
+# 🧠 MEMOIZED PROJECTIONS
+# ============================================
+
+def allocation_weights(allocation):
+    """Total value and rounded per-type weights of an allocation"""
+    items = {t: float(v) for t, v in allocation.items() if v > 0}
+    total = sum(items.values())
+    if total <= 0:
+        return 0.0, {}
+    return total, {t: round(v / total, WEIGHT_DECIMALS) for t, v in sorted(items.items())}
+
+def projection_key(weights, n_paths, seed, assumptions=None):
+    """Stable hash of everything that determines a normalised projection"""
+    payload = json.dumps(
+        [weights, n_paths, seed, assumptions or ASSET_ASSUMPTIONS],
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def _disk_path(key):
+    return os.path.join(PROJECTION_CACHE_DIR, f"{key}.npz")
+
+def _load_from_disk(key):
+    if not PROJECTION_CACHE_DIR:
+        return None
+    try:
+        with np.load(_disk_path(key)) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+
+def _save_to_disk(key, bands):
+    if not PROJECTION_CACHE_DIR:
+        return
+    os.makedirs(PROJECTION_CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=PROJECTION_CACHE_DIR, suffix='.npz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **bands)
+        os.replace(tmp, _disk_path(key))
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def projection_cache():
+    """Process-wide cache of normalised projections keyed by (hash, years)"""
+    return get_cache('projections', **PROJECTION_CACHE_OPTIONS)
+
+def cached_projection(allocation, years, n_paths=DEFAULT_PATHS, seed=PROJECTION_SEED):
+    """Memoized simulate_projection for a seeded run.
+
+    The projection is simulated once per composition for all horizons up
+    to MAX_YEARS on a total of 1.0, stored per horizon in the LRU cache
+    (and on disk when PROJECTION_CACHE_DIR is set), then scaled by the
+    portfolio total. Moving the horizon slider is therefore a lookup.
+    """
+    if not 1 <= years <= MAX_YEARS:
+        raise ValueError(f"years must be between 1 and {MAX_YEARS}")
+    total, weights = allocation_weights(allocation)
+    if not weights:
+        return simulate_projection({}, years=years)
+
+    key = projection_key(weights, n_paths, seed)
+    cache = projection_cache()
+    bands = cache.get((key, years))
+    if bands is None:
+        full = _load_from_disk(key)
+        if full is None:
+            full = simulate_projection(weights, years=MAX_YEARS, n_paths=n_paths, seed=seed)
+            _save_to_disk(key, full)
+        for horizon in range(1, MAX_YEARS + 1):
+            sliced = {name: values[:horizon + 1] for name, values in full.items()}
+            cache.set((key, horizon), sliced)
+            if horizon == years:
+                bands = sliced
+
+    return {
+        name: values if name == 'years' else values * total
+        for name, values in bands.items()
+    }
@@ -0,0 +1,146 @@
+"""
+⚖️ FinSight Rebalancing
+Minimal-trade solver toward target allocations and long-only
+mean-variance optimisation, vectorized across many portfolios at once
+"""
+
+import numpy as np
+
+from projections import ASSET_ASSUMPTIONS
+from risk import PERIODS_PER_YEAR, covariance_matrix, daily_returns, group_columns
+
+# ============================================
+# 🎯 TARGET PRESETS
+# ============================================
+
+ASSET_TYPES = list(ASSET_ASSUMPTIONS)
+
+TARGET_PRESETS = {
+    'Conservative': {'Stock': 0.20, 'Crypto': 0.00, 'Mutual Fund': 0.40, 'Real Estate': 0.15, 'Gold': 0.20, 'Others': 0.05},
+    'Balanced': {'Stock': 0.35, 'Crypto': 0.05, 'Mutual Fund': 0.30, 'Real Estate': 0.10, 'Gold': 0.15, 'Others': 0.05},
+    'Aggressive': {'Stock': 0.55, 'Crypto': 0.15, 'Mutual Fund': 0.15, 'Real Estate': 0.05, 'Gold': 0.10, 'Others': 0.00},
+}
+
+DEFAULT_TOLERANCE = 0.05  # absolute drift in weight allowed before trading
+RISK_AVERSION = 3.0
+MV_ITERATIONS = 500
+
+# ============================================
+# 🧮 MINIMAL-TRADE SOLVER
+# ============================================
+
+def solve_rebalance(current, targets, tolerance=DEFAULT_TOLERANCE, contribution=0.0):
+    """Smallest trades that bring every weight within ``tolerance`` of target.
+
+    ``current`` is (users, types) or (types,) values, ``targets`` the
+    matching weights (each row summing to 1) and ``contribution`` new cash
+    (negative to withdraw). Each type is first clipped into its band
+    ``[target - tol, target + tol]`` of the post-trade total; any net cash
+    left over is then placed in the types with the most room in their
+    band. Total turnover is the minimum any feasible solution needs, and
+    types already inside their band are traded only when the cash must go
+    somewhere. Returns trades with the shape of ``current``
+    (positive = buy).
+    """
+    current = np.asarray(current, dtype=float)
+    single = current.ndim == 1
+    current = np.atleast_2d(current)
+    targets = np.broadcast_to(np.asarray(targets, dtype=float), current.shape)
+    contribution = np.broadcast_to(np.asarray(contribution, dtype=float), current.shape[:1])
+
+    total = current.sum(axis=1) + contribution
+    lower = np.clip(targets - tolerance, 0.0, None) * total[:, None]
+    upper = np.clip(targets + tolerance, None, 1.0) * total[:, None]
+
+    after = np.clip(current, lower, upper)
+    surplus = contribution - (after - current).sum(axis=1)  # cash still to place (+) or raise (-)
+
+    # Place the remainder in the types with the most room first, so it
+    # touches as few extra types as possible
+    room = np.where(surplus[:, None] > 0, upper - after, after - lower)
+    order = np.argsort(-room, axis=1)
+    sorted_room = np.take_along_axis(room, order, axis=1)
+    filled_before = np.cumsum(sorted_room, axis=1) - sorted_room
+    fill = np.clip(np.abs(surplus)[:, None] - filled_before, 0.0, sorted_room)
+    np.put_along_axis(room, order, fill, axis=1)
+    after = after + np.sign(surplus)[:, None] * room
+
+    trades = after - current
+    return trades[0] if single else trades
+
+def rebalance_plan(allocation, targets, tolerance=DEFAULT_TOLERANCE, contribution=0.0):
+    """Trade list for one portfolio as a list of dicts, largest trades first.
+
+    ``allocation`` and ``targets`` map asset type -> value / weight; types
+    missing from either side count as zero.
+    """
+    types = list(dict.fromkeys([*ASSET_TYPES, *allocation, *targets]))
+    current = np.array([float(allocation.get(t, 0.0)) for t in types])
+    weights = np.array([float(targets.get(t, 0.0)) for t in types])
+    if weights.sum() > 0:
+        weights = weights / weights.sum()
+    trades = solve_rebalance(current, weights, tolerance, contribution)
+
+    total = current.sum()
+    new_total = total + contribution
+    plan = []
+    for t, value, weight, trade in zip(types, current, weights, trades):
+        if value == 0 and weight == 0:
+            continue
+        plan.append({
+            'type': t,
+            'current_value': value,
+            'current_weight': value / total if total else 0.0,
+            'target_weight': weight,
+            'trade': float(trade),
+            'new_weight': (value + trade) / new_total if new_total else 0.0,
+        })
+    plan.sort(key=lambda row: -abs(row['trade']))
+    return plan
+
+# ============================================
+# 📈 MEAN-VARIANCE OPTIMISATION
+# ============================================
+
+def project_to_simplex(weights):
+    """Euclidean projection of each row onto {w >= 0, sum(w) = 1}"""
+    weights = np.atleast_2d(weights)
+    n = weights.shape[1]
+    ordered = -np.sort(-weights, axis=1)
+    cumulative = np.cumsum(ordered, axis=1) - 1
+    index = np.arange(1, n + 1)
+    rho = np.count_nonzero(ordered - cumulative / index > 0, axis=1)
+    theta = cumulative[np.arange(len(weights)), rho - 1] / rho
+    return np.clip(weights - theta[:, None], 0.0, None)
+
+def mean_variance_weights(mu, cov, risk_aversion=RISK_AVERSION, iterations=MV_ITERATIONS):
+    """Long-only weights maximising ``w.mu - risk_aversion / 2 * w'Σw``.
+
+    Solved by projected gradient ascent; ``mu`` may be (types,) or
+    (users, types) and ``cov`` (types, types) or (users, types, types), so
+    a nightly batch optimises every portfolio in the same array operations.
+    """
+    mu = np.atleast_2d(np.asarray(mu, dtype=float))
+    cov = np.asarray(cov, dtype=float)
+    if cov.ndim == 2:
+        cov = np.broadcast_to(cov, (len(mu),) + cov.shape)
+    # Step 1/L with L bounding the gradient's Lipschitz constant (trace >= max eigenvalue)
+    lipschitz = risk_aversion * np.trace(cov, axis1=1, axis2=2)
+    step = 1.0 / np.where(lipschitz > 0, lipschitz, 1.0)
+
+    weights = np.full(mu.shape, 1.0 / mu.shape[1])
+    for _ in range(iterations):
+        gradient = mu - risk_aversion * np.einsum('uij,uj->ui', cov, weights)
+        weights = project_to_simplex(weights + step[:, None] * gradient)
+    return weights
+
+def history_targets(history, risk_aversion=RISK_AVERSION):
+    """Mean-variance target weights per asset type from a load_history result"""
+    types, type_values = group_columns(history['values'], history['asset_types'])
+    returns = daily_returns(type_values)
+    if len(types) == 0 or np.all(np.isnan(returns)):
+        return {}
+    mu = np.nan_to_num(np.nanmean(returns, axis=0), nan=0.0) * PERIODS_PER_YEAR
+    cov = np.nan_to_num(covariance_matrix(returns), nan=0.0)
+    weights = mean_variance_weights(mu, cov, risk_aversion)[0]
+    return dict(zip(types, weights.tolist()))
@@ -0,0 +1,175 @@
+"""
+🛡️ FinSight Risk Analytics
+Volatility, drawdown, VaR/CVaR and correlation over valuation history,
+computed as batched NumPy operations across every asset at once
+"""
+
+import warnings
+from contextlib import contextmanager
+from statistics import NormalDist
+
+import numpy as np
+
+from fx import BASE_CURRENCY, convert_history, rates_version
+from metrics import instrument
+from timeseries import history_cache, load_history, HISTORY_DAYS, to_day
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+# History is recorded every calendar day, so annualise over 365 periods
+PERIODS_PER_YEAR = 365
+VAR_CONFIDENCE = 0.95
+MIN_OBSERVATIONS = 2  # returns needed before a statistic is reported
+
+# ============================================
+# 📐 BATCHED METRICS
+# ============================================
+
+def daily_returns(values):
+    """Simple returns per period; NaN where the previous value is 0 (not yet held)"""
+    values = np.asarray(values, dtype=float)
+    previous = values[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(previous > 0, values[1:] / previous - 1, np.nan)
+
+def _dense(returns):
+    """True when no NaNs are present, so faster non-nan reductions are exact"""
+    return not np.isnan(returns).any()
+
+@contextmanager
+def _quiet():
+    """Silence all-NaN / empty-slice warnings; those columns come back NaN"""
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
+
+def _observations(returns):
+    return np.sum(~np.isnan(returns), axis=0)
+
+def _nan_where_sparse(stat, returns):
+    return np.where(_observations(returns) >= MIN_OBSERVATIONS, stat, np.nan)
+
+def volatility(returns, periods=PERIODS_PER_YEAR):
+    """Annualised standard deviation of returns per column"""
+    std_fn = np.std if _dense(returns) else np.nanstd
+    with _quiet():
+        std = std_fn(returns, axis=0, ddof=1)
+    return _nan_where_sparse(std * np.sqrt(periods), returns)
+
+def max_drawdown(values):
+    """Largest peak-to-trough fall per column, as a negative fraction"""
+    values = np.asarray(values, dtype=float)
+    peaks = np.maximum.accumulate(values, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, values / peaks - 1, 0.0)
+    return drawdowns.min(axis=0)
+
+def historical_var(returns, confidence=VAR_CONFIDENCE):
+    """Historical VaR and CVaR per column as positive loss fractions"""
+    returns = np.asarray(returns, dtype=float)
+    percentile = np.percentile if _dense(returns) else np.nanpercentile
+    with _quiet():
+        cutoff = percentile(returns, (1 - confidence) * 100, axis=0)
+        tail = returns <= cutoff
+        tail_count = tail.sum(axis=0)
+        tail_sum = np.where(tail, returns, 0.0).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cvar = np.where(tail_count > 0, -tail_sum / tail_count, np.nan)
+    return _nan_where_sparse(-cutoff, returns), _nan_where_sparse(cvar, returns)
+
+def parametric_var(returns, confidence=VAR_CONFIDENCE):
+    """Gaussian VaR and CVaR per column as positive loss fractions"""
+    z = NormalDist().inv_cdf(1 - confidence)
+    dense = _dense(returns)
+    with _quiet():
+        mean = (np.mean if dense else np.nanmean)(returns, axis=0)
+        std = (np.std if dense else np.nanstd)(returns, axis=0, ddof=1)
+    var = -(mean + z * std)
+    cvar = -(mean - std * NormalDist().pdf(z) / (1 - confidence))
+    return _nan_where_sparse(var, returns), _nan_where_sparse(cvar, returns)
+
+def covariance_matrix(returns, periods=PERIODS_PER_YEAR):
+    """Annualised covariance of column returns.
+
+    Days an asset was not held (NaN) count as a zero return, which keeps
+    the matrix positive semi-definite and the computation a single
+    matrix product even for thousands of assets.
+    """
+    filled = np.nan_to_num(np.asarray(returns, dtype=float), nan=0.0)
+    if len(filled) < MIN_OBSERVATIONS:
+        return np.full((filled.shape[1], filled.shape[1]), np.nan)
+    centered = filled - filled.mean(axis=0)
+    return centered.T @ centered / (len(filled) - 1) * periods
+
+def correlation_matrix(returns):
+    """Correlation of column returns (NaN for constant columns)"""
+    cov = covariance_matrix(returns, periods=1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return cov / np.outer(std, std)
+
+def group_columns(values, labels):
+    """Sum the columns of a (days x assets) matrix by label -> (names, matrix)"""
+    names, inverse = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    one_hot = np.zeros((len(labels), len(names)))
+    one_hot[np.arange(len(labels)), inverse] = 1.0
+    return names.tolist(), np.asarray(values, dtype=float) @ one_hot
+
+# ============================================
+# 📋 REPORTS
+# ============================================
+
+@instrument('risk.report')
+def risk_report(history, confidence=VAR_CONFIDENCE):
+    """Portfolio, per-asset and per-type risk metrics from a load_history result"""
+    values = history['values']
+    totals = values.sum(axis=1)
+    total_returns = daily_returns(totals[:, None])
+    asset_returns = daily_returns(values)
+
+    hist_var, hist_cvar = historical_var(total_returns, confidence)
+    param_var, param_cvar = parametric_var(total_returns, confidence)
+    current = float(totals[-1]) if len(totals) else 0.0
+
+    report = {
+        'confidence': confidence,
+        'observations': int(_observations(total_returns)[0]),
+        'portfolio': {
+            'volatility': float(volatility(total_returns)[0]),
+            'max_drawdown': float(max_drawdown(totals[:, None])[0]),
+            'var_historical': float(hist_var[0]),
+            'cvar_historical': float(hist_cvar[0]),
+            'var_parametric': float(param_var[0]),
+            'cvar_parametric': float(param_cvar[0]),
+            'value': current,
+        },
+        'assets': {
+            'asset_ids': history['asset_ids'],
+            'volatility': volatility(asset_returns),
+            'max_drawdown': max_drawdown(values),
+            'var_historical': historical_var(asset_returns, confidence)[0],
+        },
+    }
+
+    if 'asset_types' in history:
+        types, type_values = group_columns(values, history['asset_types'])
+        type_returns = daily_returns(type_values)
+        report['by_type'] = {
+            'types': types,
+            'volatility': volatility(type_returns),
+            'max_drawdown': max_drawdown(type_values),
+            'var_historical': historical_var(type_returns, confidence)[0],
+            'correlation': correlation_matrix(type_returns),
+        }
+    return report
+
+def user_risk_report(username, days=HISTORY_DAYS, currency=BASE_CURRENCY):
+    """risk_report for a user's stored history valued in ``currency``, cached alongside that history"""
+    end = to_day()
+    return history_cache().get_or_set(
+        ('risk', username, days, end, currency, rates_version()),
+        lambda: risk_report(convert_history(load_history(username, days, end), currency)),
+        tag=username
+    )
@@ -0,0 +1,136 @@
+"""
+🎟️ FinSight Sessions
+Signed login tokens backed by the sessions table, with an in-process LRU
+of validated tokens so restoring a session usually skips the database
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+
+from cache import get_cache
+from database import get_db
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+SESSION_TTL = int(os.environ.get('FINSIGHT_SESSION_TTL', str(7 * 24 * 3600)))
+# Validated tokens are trusted from memory for this long, which bounds how
+# late another process notices a logout or revocation
+SESSION_CACHE_TTL = 60
+SESSION_CACHE_OPTIONS = dict(max_entries=50000, max_bytes=16 * 1024 * 1024, ttl=SESSION_CACHE_TTL)
+# Shared HMAC key; when unset, one is generated once and kept in app_secrets
+# so every process on the same database signs with the same key
+SESSION_SECRET = os.environ.get('FINSIGHT_SESSION_SECRET')
+
+# ============================================
+# 🔏 TOKEN SIGNING
+# ============================================
+
+_key = None
+_key_lock = threading.Lock()
+
+def _signing_key():
+    global _key
+    if _key is None:
+        with _key_lock:
+            if _key is None:
+                if SESSION_SECRET:
+                    _key = SESSION_SECRET.encode('utf-8')
+                else:
+                    with get_db().transaction() as conn:
+                        conn.execute(
+                            "INSERT INTO app_secrets (name, value) VALUES ('session_key', ?) ON CONFLICT (name) DO NOTHING",
+                            (secrets.token_bytes(32),)
+                        )
+                        _key = conn.execute(
+                            "SELECT value FROM app_secrets WHERE name='session_key'"
+                        ).fetchone()[0]
+    return _key
+
+def _sign(session_id, username, expires_at):
+    message = f"{session_id}.{username}.{expires_at}".encode('utf-8')
+    return base64.urlsafe_b64encode(hmac.new(_signing_key(), message, hashlib.sha256).digest()).decode().rstrip('=')
+
+def _parse(token):
+    """(session_id, username, expires_at) of a well-signed token, else None"""
+    try:
+        session_id, user_b64, expires_at, signature = token.split('.')
+        username = base64.urlsafe_b64decode(user_b64 + '=' * (-len(user_b64) % 4)).decode('utf-8')
+        expires_at = int(expires_at)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(signature, _sign(session_id, username, expires_at)):
+        return None
+    return session_id, username, expires_at
+
+# ============================================
+# 🎟️ SESSIONS
+# ============================================
+
+def session_cache():
+    """Process-wide LRU of session id -> username for validated tokens"""
+    return get_cache('sessions', **SESSION_CACHE_OPTIONS)
+
+def create_session(username, ttl=SESSION_TTL):
+    """Start a session for ``username`` and return its signed token"""
+    now = int(time.time())
+    session_id = secrets.token_urlsafe(16)
+    expires_at = now + ttl
+    with get_db().transaction() as conn:
+        conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT INTO sessions (id, username, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (session_id, username, now, expires_at)
+        )
+    session_cache().set(session_id, username, tag=username, ttl=min(SESSION_CACHE_TTL, ttl))
+    user_b64 = base64.urlsafe_b64encode(username.encode('utf-8')).decode().rstrip('=')
+    return f"{session_id}.{user_b64}.{expires_at}.{_sign(session_id, username, expires_at)}"
+
+def validate_session(token):
+    """Username for a live session token, or None.
+
+    Forged or expired tokens are rejected from the signature alone. A
+    token validated in this process within SESSION_CACHE_TTL is accepted
+    from memory; otherwise the sessions table is checked, so a session
+    started or revoked by another process is honoured.
+    """
+    parsed = _parse(token) if token else None
+    if parsed is None:
+        return None
+    session_id, username, expires_at = parsed
+    now = time.time()
+    if expires_at <= now:
+        return None
+
+    cache = session_cache()
+    if cache.get(session_id) == username:
+        return username
+    with get_db().connection() as conn:
+        row = conn.execute(
+            "SELECT username FROM sessions WHERE id=? AND expires_at > ?", (session_id, int(now))
+        ).fetchone()
+    if row is None or row[0] != username:
+        return None
+    cache.set(session_id, username, tag=username, ttl=min(SESSION_CACHE_TTL, expires_at - now))
+    return username
+
+def revoke_session(token):
+    """End one session (logout)"""
+    parsed = _parse(token) if token else None
+    if parsed is None:
+        return
+    with get_db().transaction() as conn:
+        conn.execute("DELETE FROM sessions WHERE id=?", (parsed[0],))
+    session_cache().pop(parsed[0])
+
+def revoke_user_sessions(username):
+    """End every session of a user, e.g. after a password change"""
+    with get_db().transaction() as conn:
+        conn.execute("DELETE FROM sessions WHERE username=?", (username,))
+    session_cache().invalidate_tag(username)
@@ -0,0 +1,41 @@
+"""
+🧪 Shared test fixtures
+Every test gets its own SQLite file and empty process-wide caches
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read at import time by the modules under test: keep stray files out of
+# the checkout and hashing cheap
+os.environ.setdefault('FINSIGHT_DB', os.path.join(tempfile.mkdtemp(prefix='finsight_tests_'), 'default.db'))
+os.environ.setdefault('FINSIGHT_SCRYPT_N', str(2 ** 10))
+os.environ.setdefault('FINSIGHT_PBKDF2_ITERATIONS', '1000')
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path):
+    """A fresh, migrated database installed as the process-wide backend"""
+    import auth
+    import cache
+    import database
+    import portfolio
+    import sessions
+
+    for shared in list(cache._caches.values()):
+        shared.clear()
+    portfolio._seen_revisions.clear()
+    sessions._key = None
+    for limiter in (auth.user_limiter, auth.client_limiter):
+        limiter._failures.clear()
+
+    database._db = database.Database(str(tmp_path / 'test.db'))
+    yield database._db
+    database._db.close()
+    database._db = None
@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+import pytest
+
+from advice import (advice_rules, compile_rules, evaluate_advice, generate_investment_advice, holdings_features,
+                    load_rules)
+from batch import build_summary
+from fx import BASE_CURRENCY, conversion_factor, format_money, record_rates
+from timeseries import to_day
+
+ASSET_TYPES = ["Stock", "Crypto", "Mutual Fund", "Real Estate", "Gold", "Others"]
+
+
+def legacy_advice(summary, risk=None):
+    """The hard-coded rules advice_rules.json replaced, kept as the reference"""
+    advice = []
+    if summary['count'] == 0:
+        return ["💡 Start building your portfolio by adding your first asset!"]
+    currency = summary.get('currency', BASE_CURRENCY)
+    type_distribution = summary['by_type'].set_index('Type')['Percentage']
+    if 'Crypto' in type_distribution and type_distribution['Crypto'] > 30:
+        advice.append("⚠️ High crypto exposure detected (>30%). Consider diversifying into stable assets like mutual funds or gold.")
+    if len(type_distribution) < 3:
+        advice.append("📊 Low diversification! Try adding different asset types to balance risk and returns.")
+    if type_distribution.max() > 50:
+        advice.append("🎯 One asset type dominates your portfolio (>50%). Spread investments to reduce risk.")
+    if risk is not None:
+        portfolio = risk['portfolio']
+        vol = portfolio['volatility']
+        if not math.isnan(vol) and vol > 0.25:
+            advice.append(f"📉 Your portfolio's annualised volatility is {vol:.0%}. Adding lower-volatility assets like mutual funds or gold can smooth the ride.")
+        drawdown = portfolio['max_drawdown']
+        if drawdown < -0.20:
+            advice.append(f"⛰️ Your portfolio fell {-drawdown:.0%} from its peak in the last year. Make sure your risk level matches your goals.")
+        var = portfolio['var_historical']
+        if not math.isnan(var) and var > 0.03:
+            advice.append(f"🛡️ On a bad day (1 in {round(1 / (1 - risk['confidence']))}) your portfolio could lose about {format_money(var * portfolio['value'], currency, 0)} ({var:.1%}). Consider hedging volatile positions.")
+        by_type = risk.get('by_type')
+        if by_type is not None and len(type_distribution) >= 3:
+            corr = by_type['correlation']
+            off_diagonal = corr[~np.eye(len(corr), dtype=bool)]
+            mean_corr = np.nanmean(off_diagonal) if np.any(~np.isnan(off_diagonal)) else math.nan
+            if not math.isnan(mean_corr) and mean_corr > 0.8:
+                advice.append(f"🔗 Your asset types move together (average correlation {mean_corr:.2f}), so diversification is weaker than it looks.")
+    if len(type_distribution) >= 4 and type_distribution.max() < 40:
+        advice.append("✅ Excellent diversification! Your portfolio is well-balanced across multiple asset types.")
+    if 'Gold' not in type_distribution or type_distribution.get('Gold', 0) < 5:
+        advice.append("💰 Consider adding 5-10% gold to your portfolio as a hedge against inflation.")
+    base_value = summary['total_value'] * conversion_factor(currency, BASE_CURRENCY)
+    if base_value < 100000:
+        advice.append("🚀 Great start! Consider systematic investing (SIP) to grow your portfolio steadily.")
+    elif base_value > 1000000:
+        advice.append("🎉 Impressive portfolio! Consider consulting a financial advisor for tax-efficient strategies.")
+    if not advice:
+        advice.append("✅ Your portfolio looks healthy. Keep monitoring and rebalancing regularly!")
+    return advice
+
+
+def random_users(rng, users):
+    """``(username, asset_type, currency, total, count)`` rows and risk reports, edge cases first"""
+    rows = [('edge_0', 'Crypto', 'INR', 300000.0, 1), ('edge_0', 'Stock', 'INR', 500000.0, 1),
+            ('edge_0', 'Gold', 'INR', 200000.0, 1),
+            ('edge_1', 'Stock', 'INR', 40000.0, 1), ('edge_1', 'Gold', 'INR', 30000.0, 1),
+            ('edge_1', 'Crypto', 'INR', 15000.0, 1), ('edge_1', 'Others', 'INR', 15000.0, 1)]
+    risks = {'edge_1': {'confidence': 0.95, 'by_type': {'correlation': np.full((4, 4), np.nan)},
+                        'portfolio': {'volatility': math.nan, 'max_drawdown': -0.2, 'var_historical': math.nan,
+                                      'value': 100000.0}}}
+    names = ['edge_0', 'edge_1', 'edge_2']  # edge_2 holds nothing
+    for i in range(users):
+        name = f"user_{i:03d}"
+        names.append(name)
+        held = rng.choice(ASSET_TYPES, int(rng.integers(1, 7)), replace=False)
+        for asset_type in held:
+            rows.append((name, str(asset_type), str(rng.choice(['INR', 'INR', 'USD'])),
+                         float(rng.lognormal(11, 1.5)), int(rng.integers(1, 5))))
+        if rng.random() < 0.8:
+            corr = rng.uniform(0.3, 1.0, (len(held), len(held)))
+            np.fill_diagonal(corr, 1.0)
+            risks[name] = {
+                'confidence': 0.95,
+                'portfolio': {'volatility': rng.uniform(0.02, 0.5), 'max_drawdown': -rng.uniform(0, 0.4),
+                              'var_historical': rng.uniform(0.005, 0.06), 'value': rng.lognormal(12, 1)},
+                'by_type': {'correlation': corr},
+            }
+    return names, rows, risks
+
+
+@pytest.fixture
+def users():
+    record_rates([('USD', to_day() * 86400, 83.0)])
+    return random_users(np.random.default_rng(7), 300)
+
+
+@pytest.mark.parametrize('currency', ['INR', 'USD'])
+def test_rules_match_the_hard_coded_advice(users, currency):
+    names, rows, risks = users
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row[0], []).append(row[1:])
+    batch = evaluate_advice(holdings_features(rows, names, currency, risks=risks), currency)
+    for name in names:
+        summary = build_summary(by_user.get(name, []), currency)
+        expected = legacy_advice(summary, risks.get(name))
+        assert generate_investment_advice(summary, risks.get(name)) == expected, name
+        assert batch[name] == expected, name
+
+
+def test_hits_count_matching_users(users):
+    names, rows, risks = users
+    hits = {}
+    advice = evaluate_advice(holdings_features(rows, names, risks=risks), hits=hits)
+    assert set(hits) == {rule['id'] for rule in advice_rules()['rules']}
+    assert hits['empty-portfolio'] == 1
+    assert sum(hits.values()) == sum(len(messages) for messages in advice)
+
+
+def test_version_follows_the_rules():
+    spec = [{'id': 'big', 'when': [['base_value', '>', 10]], 'advice': "Big"}]
+    version = compile_rules(spec)['version']
+    assert compile_rules([dict(spec[0])])['version'] == version
+    assert compile_rules([dict(spec[0], advice="Large")])['version'] != version
+    assert advice_rules()['version'] == load_rules()['version']
+
+
+@pytest.mark.parametrize('rule, message', [
+    ({'when': [['n_types', '<', 3]], 'advice': "x"}, "missing 'id'"),
+    ({'id': 'a', 'when': [['no_such', '<', 3]], 'advice': "x"}, "unknown feature"),
+    ({'id': 'a', 'when': [['n_types', '~', 3]], 'advice': "x"}, "unsupported operator"),
+    ({'id': 'a', 'when': [['n_types', '<']], 'advice': "x"}, "is not [feature, operator, threshold]"),
+    ({'id': 'a', 'advice': "x"}, "needs 'when' conditions or 'otherwise'"),
+    ({'id': 'a', 'when': [], 'advice': "x", 'colour': 'red'}, "unknown keys colour"),
+])
+def test_bad_rules_are_reported(rule, message):
+    with pytest.raises(ValueError, match=r"Advice rule") as error:
+        compile_rules([rule])
+    assert message in str(error.value)
+
+
+def test_duplicate_ids_are_reported():
+    rule = {'id': 'a', 'otherwise': True, 'advice': "x"}
+    with pytest.raises(ValueError, match="Advice rule a: duplicate id"):
+        compile_rules([rule, rule])
@@ -0,0 +1,87 @@
+import json
+
+from tornado.testing import AsyncHTTPTestCase
+
+from api import make_app
+from auth import CLIENT_ATTEMPTS, register_user
+
+
+class ApiTest(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return make_app()
+
+    def call(self, method, path, body=None, token=None, headers=None):
+        headers = dict(headers or {})
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        response = self.fetch(path, method=method, headers=headers, allow_nonstandard_methods=True,
+                              body=None if body is None else json.dumps(body))
+        data = json.loads(response.body) if response.body else None
+        return response, data
+
+    def login(self, username='alice', password='s3cret', headers=None):
+        return self.call('POST', '/api/sessions', {'username': username, 'password': password}, headers=headers)
+
+    def test_portfolio_round_trip(self):
+        register_user('alice', 'a@example.com', 's3cret')
+        response, session = self.login()
+        self.assertEqual(response.code, 201)
+        token = session['token']
+
+        response, data = self.call('POST', '/api/portfolio/assets', {'assets': [
+            {'asset_name': 'Nifty ETF', 'asset_type': 'Stock', 'current_value': 1000},
+            {'asset_name': 'Bitcoin', 'asset_type': 'Crypto', 'current_value': 500},
+            {'asset_name': '', 'asset_type': 'Stock', 'current_value': 1},
+        ]}, token)
+        self.assertEqual(data['inserted'], 2)
+        self.assertEqual(data['errors'], [{'index': 2, 'error': "Asset name is empty"}])
+
+        response, data = self.call('GET', '/api/portfolio/summary', token=token)
+        self.assertEqual(data['total_value'], 1500.0)
+        etag = response.headers['ETag']
+        response, _ = self.call('GET', '/api/portfolio/summary', token=token, headers={'If-None-Match': etag})
+        self.assertEqual(response.code, 304)
+
+        _, data = self.call('GET', '/api/portfolio', token=token)
+        ids = [asset['id'] for asset in data['assets']]
+        _, data = self.call('PATCH', '/api/portfolio/assets', {'updates': [{'id': ids[0], 'current_value': 2000}]},
+                            token)
+        self.assertEqual(data['updated'], 1)
+        response, data = self.call('GET', '/api/portfolio/summary', token=token, headers={'If-None-Match': etag})
+        self.assertEqual((response.code, data['total_value']), (200, 2500.0))
+
+        _, data = self.call('DELETE', f"/api/portfolio/assets/{ids[1]}", token=token)
+        self.assertEqual(data['deleted'], 1)
+        response, _ = self.call('DELETE', '/api/sessions', token=token)
+        self.assertEqual(response.code, 204)
+        response, _ = self.call('GET', '/api/portfolio', token=token)
+        self.assertEqual(response.code, 401)
+
+    def test_bad_requests(self):
+        response, data = self.call('POST', '/api/sessions', {'username': 'alice'})
+        self.assertEqual(response.code, 400)
+        response, _ = self.call('GET', '/api/portfolio/summary')
+        self.assertEqual(response.code, 401)
+        self.assertEqual(self.login()[0].code, 401)
+
+    def test_booleans_are_not_numbers(self):
+        register_user('alice', 'a@example.com', 's3cret')
+        token = self.login()[1]['token']
+        for method, body in [
+            ('PATCH', {'updates': [{'id': True, 'current_value': 10}]}),
+            ('PATCH', {'updates': [{'id': 1, 'current_value': True}]}),
+            ('POST', {'assets': [{'asset_name': 'A', 'asset_type': 'Stock', 'current_value': True}]}),
+            ('DELETE', {'ids': [False]}),
+        ]:
+            response, _ = self.call(method, '/api/portfolio/assets', body, token)
+            self.assertEqual(response.code, 400, (method, body))
+
+    def test_forwarded_header_does_not_dodge_the_client_limit(self):
+        register_user('alice', 'a@example.com', 's3cret')
+        for i in range(CLIENT_ATTEMPTS[0]):
+            response, _ = self.login(f"guess{i}", 'wrong', headers={'X-Forwarded-For': f"198.51.100.{i}"})
+            self.assertEqual(response.code, 401)
+        response, _ = self.login(headers={'X-Forwarded-For': '198.51.100.250'})
+        self.assertEqual(response.code, 429)
+        self.assertIn('Retry-After', response.headers)
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+
+import pytest
+
+import auth
+from auth import (CLIENT_ATTEMPTS, USER_ATTEMPTS, AuthBusy, LoginThrottled, _HashPool, authenticate_user,
+                  client_key, hash_password, needs_rehash, register_user, verify_password)
+from database import get_db
+
+
+def stored_hash(username):
+    with get_db().connection() as conn:
+        return conn.execute("SELECT password FROM users WHERE username=?", (username,)).fetchone()[0]
+
+
+@pytest.mark.parametrize('scheme', ['scrypt', 'pbkdf2_sha256'])
+def test_hashes_are_salted_and_verify(scheme):
+    first, second = hash_password('s3cret', scheme), hash_password('s3cret', scheme)
+    assert first != second
+    assert verify_password('s3cret', first) and not verify_password('wrong', first)
+    assert not verify_password('s3cret', 'scrypt$bad$params$here')
+
+
+def test_legacy_hash_is_upgraded_on_login():
+    legacy = hashlib.sha256(b's3cret').hexdigest()
+    with get_db().transaction() as conn:
+        conn.execute("INSERT INTO users (username, email, password) VALUES ('alice', 'a@example.com', ?)", (legacy,))
+    assert needs_rehash(legacy)
+    assert authenticate_user('alice', 's3cret')
+    upgraded = stored_hash('alice')
+    assert upgraded.startswith(auth.PASSWORD_SCHEME + '$') and not needs_rehash(upgraded)
+    assert authenticate_user('alice', 's3cret')
+
+
+def test_username_is_locked_after_repeated_failures():
+    register_user('alice', 'a@example.com', 's3cret')
+    for _ in range(USER_ATTEMPTS[0]):
+        assert authenticate_user('alice', 'wrong', client=None) is False
+    with pytest.raises(LoginThrottled) as raised:
+        authenticate_user('alice', 's3cret', client=None)  # even the right password waits
+    assert 0 < raised.value.retry_after <= USER_ATTEMPTS[1]
+
+
+def test_client_is_locked_across_usernames():
+    register_user('alice', 'a@example.com', 's3cret')
+    for i in range(CLIENT_ATTEMPTS[0]):
+        assert authenticate_user(f"guess{i}", 'wrong', client='203.0.113.7') is False
+    with pytest.raises(LoginThrottled):
+        authenticate_user('alice', 's3cret', client='203.0.113.7')
+    assert authenticate_user('alice', 's3cret', client='198.51.100.1')
+
+
+def test_success_resets_the_username_count():
+    register_user('alice', 'a@example.com', 's3cret')
+    for _ in range(USER_ATTEMPTS[0] - 1):
+        authenticate_user('alice', 'wrong')
+    assert authenticate_user('alice', 's3cret')
+    assert authenticate_user('alice', 'wrong') is False
+    assert authenticate_user('alice', 's3cret')
+
+
+def test_forwarded_header_counts_only_behind_a_trusted_proxy():
+    forwarded = '198.51.100.9, 203.0.113.7'  # first hop is whatever the client claimed
+    assert client_key(forwarded, '10.0.0.2', trust_proxy=False) == '10.0.0.2'
+    assert client_key(forwarded, '10.0.0.2', trust_proxy=True) == '203.0.113.7'
+    assert client_key(None, '10.0.0.2', trust_proxy=True) == '10.0.0.2'
+    assert client_key(forwarded, None, trust_proxy=False) is None
+
+
+def test_saturated_pool_refuses_work():
+    pool = _HashPool(workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(AuthBusy):
+        pool.run(len, 'x')
+    release.set()
+    worker.join()
+
+
+def test_slow_hash_reports_busy(monkeypatch):
+    import auth
+
+    release = threading.Event()
+    register_user('alice', 'a@example.com', 's3cret')
+    monkeypatch.setattr(auth, 'AUTH_TIMEOUT', 0.05)
+    monkeypatch.setattr(auth, '_check_and_upgrade', lambda *args: release.wait(5) and (True, None))
+    try:
+        with pytest.raises(AuthBusy):
+            authenticate_user('alice', 's3cret')
+    finally:
+        release.set()
@@ -0,0 +1,49 @@
+import pytest
+
+from batch import load_summary, run_batch
+from database import get_db
+from portfolio import add_asset, get_portfolio_summary
+
+USERS = [f"user_{i:02d}" for i in range(7)]
+
+
+@pytest.fixture
+def users():
+    with get_db().transaction() as conn:
+        conn.executemany("INSERT INTO users (username, email, password) VALUES (?, ?, 'x')",
+                         [(name, f"{name}@example.com") for name in USERS])
+    for i, name in enumerate(USERS[1:], 1):
+        add_asset(name, 'Nifty ETF', 'Stock', 1000.0 * i)
+        add_asset(name, 'Bitcoin', 'Crypto', 500.0)
+    return USERS
+
+
+def test_batch_summarises_every_user(users):
+    stats = run_batch(workers=0, chunk_users=3)
+    assert stats['processed'] == len(users)
+    empty = load_summary(users[0])
+    assert empty['count'] == 0 and 'projection' not in empty
+    summary = load_summary(users[2])
+    assert summary['total_value'] == 2500.0
+    assert summary['advice']
+    assert summary['projection']['p50'][0] == pytest.approx(2500.0)
+    assert get_portfolio_summary(users[2])['advice'] == summary['advice']
+
+
+def test_a_write_makes_the_stored_summary_stale(users):
+    run_batch(workers=0)
+    add_asset(users[3], 'Gold coin', 'Gold', 100.0)
+    assert load_summary(users[3]) is None
+    assert get_portfolio_summary(users[3])['total_value'] == 3600.0
+    assert load_summary(users[4]) is not None
+
+
+def test_an_interrupted_run_resumes_after_its_checkpoint(users):
+    with get_db().transaction() as conn:
+        conn.execute("INSERT INTO batch_runs (job, started_at, updated_at, last_username, processed) "
+                     "VALUES ('nightly', 0, 0, ?, 4)", (users[3],))
+    stats = run_batch(workers=0, chunk_users=2)
+    assert stats['resumed_from'] == users[3]
+    assert stats['processed'] == 3
+    assert load_summary(users[2]) is None and load_summary(users[4]) is not None
+    assert run_batch(workers=0)['processed'] == len(users)  # finished runs start over
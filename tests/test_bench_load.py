@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_simulated_users_run_without_errors():
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'benchmarks', 'bench_load.py'), '--users', '2', '3',
+         '--duration', '1', '--think', '0.05', '--ramp', '0.1', '--holdings', '3', '--days', '5',
+         '--p95-target', '60000'],
+        cwd=ROOT, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    totals = [line.split() for line in result.stdout.splitlines() if line.startswith('all ')]
+    assert len(totals) == 2
+    for row in totals:
+        assert int(row[1]) > 0
+        assert row[-3:] == ['0', '0', '0']  # locked, timeout, errors
+    assert "No ceiling up to 3 users" in result.stdout
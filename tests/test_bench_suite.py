@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE = os.path.join(ROOT, 'benchmarks', 'bench_suite.py')
+
+
+def run_suite(*args):
+    return subprocess.run([sys.executable, SUITE, '--users', '2', '--holdings', '3', '--days', '5',
+                           '--repeat', '1', *args], cwd=ROOT, capture_output=True, text=True, timeout=300)
+
+
+def test_suite_runs_at_its_smallest_scale(tmp_path):
+    saved = tmp_path / 'baseline.json'
+    result = run_suite('--save', str(saved))
+    assert result.returncode == 0, result.stderr
+    report = json.loads(saved.read_text())
+    assert report['meta']['users'] == 2
+    kinds = {stats['kind'] for stats in report['results'].values()}
+    assert kinds == {'micro', 'e2e'}
+
+    # Against a baseline that was much faster, every shared benchmark regresses
+    for stats in report['results'].values():
+        stats['p50_ms'] /= 1000
+    saved.write_text(json.dumps(report))
+    result = run_suite('--kind', 'micro', '--only', 'summary', '--baseline', str(saved))
+    assert result.returncode == 1
+    assert 'REGRESSION' in result.stdout
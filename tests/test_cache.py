@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_is_enforced():
+    cache = LRUCache(max_bytes=3000)
+    cache.set('a', np.zeros(200))  # 1600 bytes
+    cache.set('b', np.zeros(200))
+    assert 'a' not in cache and 'b' in cache
+    cache.set('huge', np.zeros(1000))
+    assert 'huge' not in cache and 'b' in cache
+
+
+def test_entries_expire():
+    cache = LRUCache(ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_invalidate_tag_drops_only_that_tag():
+    cache = LRUCache()
+    cache.set('a1', 1, tag='alice')
+    cache.set('a2', 2, tag='alice')
+    cache.set('b1', 3, tag='bob')
+    cache.invalidate_tag('alice')
+    assert len(cache) == 1 and 'b1' in cache
+
+
+def test_result_computed_across_an_invalidation_is_not_stored():
+    cache = LRUCache()
+
+    def factory():
+        cache.invalidate_tag('alice')  # a write lands while the value is built
+        return 'stale'
+
+    assert cache.get_or_set('a', factory, tag='alice') == 'stale'
+    assert 'a' not in cache
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from database import Database, PoolTimeout
+
+
+def count_users(db):
+    with db.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def add_user(conn, name):
+    conn.execute("INSERT INTO users (username, email, password) VALUES (?, ?, 'x')", (name, f"{name}@example.com"))
+
+
+def test_transaction_commits(db):
+    with db.transaction() as conn:
+        add_user(conn, 'alice')
+    assert count_users(db) == 1
+
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            add_user(conn, 'alice')
+            raise RuntimeError("boom")
+    assert count_users(db) == 0
+
+
+def test_nested_transaction_joins_the_outer_one(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as outer:
+            add_user(outer, 'alice')
+            with db.transaction() as inner:
+                assert inner is outer
+                add_user(inner, 'bob')
+            raise RuntimeError("boom")
+    assert count_users(db) == 0
+
+
+def test_connection_is_reentrant_per_thread(db):
+    with db.connection() as first:
+        with db.connection() as second:
+            assert first is second
+    assert db.stats()['in_use'] == 0
+
+
+def test_pool_never_opens_more_than_its_size(tmp_path):
+    pool = Database(str(tmp_path / 'pool.db'), pool_size=2)
+    barrier = threading.Barrier(4)
+
+    def work():
+        barrier.wait()
+        for _ in range(20):
+            count_users(pool)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    pool.close()
+    assert stats['open'] <= 2
+    assert stats['in_use'] == 0
+
+
+def test_checkout_times_out_when_pool_is_exhausted(tmp_path):
+    pool = Database(str(tmp_path / 'pool.db'), pool_size=1, timeout=0.05)
+    errors = []
+
+    def other_thread():
+        try:
+            count_users(pool)
+        except PoolTimeout as e:
+            errors.append(e)
+
+    with pool.connection():
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+    pool.close()
+    assert len(errors) == 1
@@ -0,0 +1,40 @@
+import io
+
+import pandas as pd
+import pytest
+
+from export import EXPORT_FORMATS, export_portfolio, write_export
+from portfolio import get_portfolio, import_assets, read_asset_file
+
+
+@pytest.fixture
+def alice():
+    df = pd.DataFrame({'Asset Name': ['Nifty ETF', 'Bitcoin, "cold"', 'Gold coin'],
+                       'Type': ['Stock', 'Crypto', 'Gold'], 'Value': [1000.5, 500.0, 250.25],
+                       'Date Added': ['2024-01-02 03:04:05', '2024-02-01', '2024-03-01']})
+    import_assets('alice', df)
+    import_assets('bob', df.head(1))
+    return 'alice'
+
+
+@pytest.mark.parametrize('fmt', list(EXPORT_FORMATS))
+def test_exports_import_back_unchanged(alice, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    data = export_portfolio(alice, fmt)
+    inserted, errors = import_assets('copy', read_asset_file('export' + EXPORT_FORMATS[fmt][0], data))
+    assert inserted == 3 and errors.empty
+    columns = ['Asset Name', 'Type', 'Value', 'Currency', 'Date Added']
+    assert get_portfolio('copy')[columns].equals(get_portfolio(alice)[columns])
+
+
+def test_admin_export_streams_every_user_in_chunks(alice):
+    out = io.BytesIO()
+    assert write_export(out, 'csv', username=None, chunk_size=2) == 4
+    exported = pd.read_csv(io.BytesIO(out.getvalue()))
+    assert exported['Username'].tolist() == ['alice', 'alice', 'alice', 'bob']
+
+
+def test_unknown_format_is_rejected(alice):
+    with pytest.raises(ValueError):
+        write_export(io.BytesIO(), 'xlsx', username=alice)
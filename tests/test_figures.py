@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from cache import LRUCache, estimate_size
+from figures import cached_figure, data_hash
+from timeseries import lttb
+
+
+def line(n):
+    return go.Figure(go.Scatter(x=np.arange(n), y=np.arange(n, dtype=float)))
+
+
+def test_data_hash_follows_content():
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    assert data_hash(df, 5) == data_hash(df.copy(), 5)
+    assert data_hash(df, 5) != data_hash(df, 6)
+    assert data_hash(df) != data_hash(df.rename(columns={'a': 'c'}))
+    assert data_hash(np.arange(3)) != data_hash(np.arange(3.0))
+
+
+def test_figures_are_built_once_per_data():
+    calls = []
+
+    def build(df):
+        calls.append(1)
+        return line(len(df))
+
+    df = pd.DataFrame({'a': range(10)})
+    first = cached_figure('test', build, df)
+    assert cached_figure('test', build, df.copy()) is first
+    cached_figure('test', build, df.head(5))
+    assert len(calls) == 2
+
+
+def test_figures_are_sized_by_their_data():
+    # At least a few bytes per plotted number, not the few dozen of the Python object
+    assert estimate_size(line(2000)) - estimate_size(line(100)) > 2 * 1900 * 4
+
+
+def test_byte_budget_bounds_cached_figures():
+    cache = LRUCache(max_bytes=4 * estimate_size(line(1000)))
+    for i in range(10):
+        cache.set(i, line(1000))
+    assert len(cache) <= 4
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    y = np.zeros(1000)
+    y[500] = 10.0
+    kept = lttb(np.arange(1000.0), y, 50)
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999 and 500 in kept
+    assert np.all(np.diff(kept) > 0)
+    assert len(lttb(np.arange(10.0), np.zeros(10), 50)) == 10
@@ -0,0 +1,53 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from fx import MissingRate, conversion_factor, convert, convert_history, has_rate, rates_version, record_rates
+from portfolio import add_asset, get_portfolio_summary
+from timeseries import to_day
+
+JAN_1, JAN_10 = date(2025, 1, 1), date(2025, 1, 10)
+
+
+@pytest.fixture
+def rates():
+    record_rates([('USD', JAN_1, 80.0), ('USD', JAN_10, 85.0), ('EUR', JAN_1, 90.0)])
+
+
+def test_conversion_uses_the_rate_in_force_on_the_day(rates):
+    values = convert([10.0, 10.0, 10.0], ['USD', 'EUR', 'INR'], 'INR', day=date(2025, 1, 5))
+    np.testing.assert_allclose(values, [800.0, 900.0, 10.0])
+    assert convert([10.0], ['USD'], 'INR', day=JAN_10)[0] == 850.0
+    assert convert([10.0], ['USD'], 'INR', day=date(2024, 12, 1))[0] == 800.0  # before the first rate
+    assert conversion_factor('EUR', 'USD', day=JAN_1) == pytest.approx(90 / 80)
+
+
+def test_missing_rates_are_reported(rates):
+    assert has_rate('USD') and not has_rate('GBP')
+    with pytest.raises(MissingRate):
+        convert([1.0], ['GBP'], 'INR')
+    with pytest.raises(ValueError):
+        record_rates([('USD', JAN_1, -1.0)])
+    with pytest.raises(ValueError):
+        add_asset('alice', 'Gilt', 'Others', 100.0, currency='GBP')
+
+
+def test_new_rates_change_the_version_and_summaries(rates):
+    add_asset('alice', 'S&P 500 ETF', 'Stock', 10.0, currency='USD')
+    add_asset('alice', 'Nifty ETF', 'Stock', 150.0)
+    version = rates_version()
+    assert get_portfolio_summary('alice')['total_value'] == 1000.0
+    assert get_portfolio_summary('alice', 'USD')['total_value'] == pytest.approx(1000.0 / 85.0)
+
+    record_rates([('USD', None, 90.0)])
+    assert rates_version() != version
+    assert get_portfolio_summary('alice')['total_value'] == 1050.0
+
+
+def test_history_is_converted_day_by_day(rates):
+    history = {'days': np.array([to_day(JAN_1), to_day(JAN_10)]), 'asset_currencies': ['USD', 'INR'],
+               'values': np.array([[1.0, 1.0], [1.0, 1.0]])}
+    np.testing.assert_allclose(convert_history(history)['values'], [[80.0, 1.0], [85.0, 1.0]])
+    in_base = {**history, 'asset_currencies': ['INR', 'INR']}
+    assert convert_history(in_base) is in_base
@@ -0,0 +1,57 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from portfolio import HOLDINGS_SORT_COLUMNS, count_holdings, get_holdings_page, get_portfolio, import_assets
+
+TYPES = ['Stock', 'Crypto', 'Gold']
+
+
+@pytest.fixture
+def alice():
+    rows = pd.DataFrame({
+        'Asset Name': [f"Asset {i % 17}" for i in range(60)],
+        'Type': [TYPES[i % 3] for i in range(60)],
+        'Value': [float(100 + i % 7) for i in range(60)],  # plenty of ties
+        'Date Added': [f"2024-01-{1 + i % 20:02d}" for i in range(60)],
+    })
+    assert import_assets('alice', rows)[0] == 60
+    import_assets('bob', rows.head(5))
+    return 'alice'
+
+
+def walk(username, limit=7, **filters):
+    ids, cursor = [], None
+    while True:
+        page, cursor = get_holdings_page(username, cursor=cursor, limit=limit, **filters)
+        assert len(page) <= limit
+        ids.extend(page['ID'])
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize('sort', list(HOLDINGS_SORT_COLUMNS))
+@pytest.mark.parametrize('descending', [False, True])
+def test_pages_cover_every_holding_once_in_order(alice, sort, descending):
+    column = {'added_date': 'Date Added', 'asset_name': 'Asset Name',
+              'asset_type': 'Type', 'current_value': 'Value'}[sort]
+    expected = get_portfolio(alice).sort_values([column, 'ID'], ascending=not descending)['ID'].tolist()
+    assert walk(alice, sort=sort, descending=descending) == expected
+
+
+def test_filters_apply_to_pages_and_counts(alice):
+    filters = dict(asset_types=['Stock', 'Gold'], name_query='asset 1', date_from=date(2024, 1, 5),
+                   date_to=date(2024, 1, 15))
+    holdings = get_portfolio(alice)
+    day = holdings['Date Added'].dt.date
+    expected = holdings[holdings['Type'].isin(['Stock', 'Gold'])
+                        & holdings['Asset Name'].str.lower().str.contains('asset 1')
+                        & (day >= date(2024, 1, 5)) & (day <= date(2024, 1, 15))]
+    assert sorted(walk(alice, **filters)) == sorted(expected['ID'])
+    assert count_holdings(alice, **filters) == len(expected)
+
+
+def test_name_query_wildcards_are_literal(alice):
+    assert count_holdings(alice, name_query='%') == 0
+    assert count_holdings(alice, name_query='_') == 0
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from portfolio import get_portfolio, import_assets, update_assets, validate_assets
+
+
+def test_invalid_rows_are_reported_and_skipped():
+    df = pd.DataFrame({
+        'Asset Name': ['Nifty ETF', '', 'Bitcoin', 'Gold coin', 'House', 'Bond'],
+        'Type': ['Stock', 'Stock', 'Coins', 'Gold', 'Real Estate', 'Others'],
+        'Value': ['1000', '5', '10', 'abc', '-1', '20'],
+        'Currency': ['INR', 'INR', 'INR', 'INR', 'INR', 'XYZ'],
+    })
+    inserted, errors = import_assets('alice', df)
+    assert inserted == 1
+    assert errors['Row'].tolist() == [2, 3, 4, 5, 6]
+    assert errors['Error'][0] == "Asset name is empty"
+    assert errors['Error'][2] == "Value is not a number"
+    assert get_portfolio('alice')['Asset Name'].tolist() == ['Nifty ETF']
+
+
+def test_missing_columns_fail_the_whole_file():
+    valid, errors = validate_assets(pd.DataFrame({'Asset Name': ['x']}))
+    assert valid.empty
+    assert errors['Error'][0] == "Missing columns: Type, Value"
+
+
+def test_legacy_exports_import():
+    df = pd.DataFrame({'ID': [7], 'Asset Name': ['Nifty ETF'], 'Type': ['Stock'], 'Value (₹)': [1000.0],
+                       'Date Added': ['2024-01-02 03:04:05']})
+    valid, errors = validate_assets(df)
+    assert errors.empty
+    assert valid.iloc[0].to_dict() == {'asset_name': 'Nifty ETF', 'asset_type': 'Stock', 'current_value': 1000.0,
+                                       'currency': 'INR', 'added_date': 1704164645}
+
+
+def test_import_runs_in_chunks():
+    df = pd.DataFrame({'Asset Name': [f"Asset {i}" for i in range(25)], 'Type': ['Stock'] * 25,
+                       'Value': range(1, 26)})
+    calls = []
+    inserted, errors = import_assets('alice', df, chunk_size=10, progress=lambda done, total: calls.append(done))
+    assert inserted == 25 and errors.empty
+    assert calls == [10, 20, 25]
+    assert get_portfolio('alice')['Value'].sum() == sum(range(1, 26))
+
+
+def test_batch_update_keeps_unset_fields():
+    import_assets('alice', pd.DataFrame({'Asset Name': ['A', 'B'], 'Type': ['Stock', 'Gold'], 'Value': [1, 2]}))
+    import_assets('bob', pd.DataFrame({'Asset Name': ['C'], 'Type': ['Stock'], 'Value': [3]}))
+    ids = get_portfolio('alice')['ID'].tolist()
+    bobs = int(get_portfolio('bob')['ID'][0])
+    changed = update_assets('alice', [{'id': ids[0], 'current_value': 10.0},
+                                      {'id': ids[1], 'asset_name': 'B2', 'current_value': None},
+                                      {'id': bobs, 'current_value': 99.0}])
+    assert changed == 2  # bob's holding is not alice's to change
+    rows = get_portfolio('alice').set_index('ID')
+    assert rows.loc[ids[0], ['Asset Name', 'Value']].tolist() == ['A', 10.0]
+    assert rows.loc[ids[1], ['Asset Name', 'Value']].tolist() == ['B2', 2.0]
+    assert get_portfolio('bob')['Value'][0] == 3.0
+
+
+def test_each_imported_row_is_recorded_once(monkeypatch):
+    import portfolio
+    from database import get_db
+
+    monkeypatch.setattr(portfolio, 'IMPORT_INSERT_ROWS', 4)
+    import_assets('alice', pd.DataFrame({'Asset Name': ['Held'], 'Type': ['Gold'], 'Value': [5]}))
+    import_assets('alice', pd.DataFrame({'Asset Name': [f"Asset {i}" for i in range(10)], 'Type': ['Stock'] * 10,
+                                         'Value': range(1, 11)}), chunk_size=6)
+    with get_db().connection() as conn:
+        adds = conn.execute("SELECT asset_id, COUNT(*) FROM ledger WHERE kind='add' GROUP BY asset_id").fetchall()
+        valued = conn.execute("SELECT COUNT(DISTINCT asset_id), COUNT(*) FROM asset_history").fetchone()
+    assert sorted(asset_id for asset_id, _ in adds) == sorted(get_portfolio('alice')['ID'].tolist())
+    assert {count for _, count in adds} == {1}
+    assert valued == (11, 11)
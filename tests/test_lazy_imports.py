@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(module, candidates, tmp_path):
+    """Which of ``candidates`` a fresh interpreter has loaded after importing ``module``"""
+    code = f"import sys, {module}; print(' '.join(m for m in {candidates!r} if m in sys.modules))"
+    env = dict(os.environ, FINSIGHT_DB=str(tmp_path / 'imports.db'))
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.split()
+
+
+def test_login_screen_skips_the_data_stack(tmp_path):
+    assert loaded_after('app', ['pandas', 'numpy', 'dashboard', 'portfolio'], tmp_path) == []
+
+
+def test_dashboard_defers_the_chart_module(tmp_path):
+    assert loaded_after('dashboard', ['charts', 'plotly.express'], tmp_path) == []
@@ -0,0 +1,123 @@
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from database import get_db
+from ledger import compact, holdings_as_of, ledger_events, load_snapshot, record_events
+from portfolio import (add_asset, delete_assets, get_portfolio, get_portfolio_as_of, import_assets, update_assets,
+                       validate_assets)
+
+
+@pytest.fixture
+def alice():
+    with get_db().transaction() as conn:
+        conn.execute("INSERT INTO users (username, email, password) VALUES ('alice', 'a@example.com', 'x')")
+    import_assets('alice', pd.DataFrame({
+        'Asset Name': ['Nifty ETF', 'Bitcoin', 'Gold coin'],
+        'Type': ['Stock', 'Crypto', 'Gold'],
+        'Value': [1000.0, 500.0, 250.0],
+        'Date Added': ['2024-01-01', '2024-02-01', '2024-03-01'],
+    }))
+    return 'alice'
+
+
+def current(username):
+    """Holdings as (id, name, type, value) tuples, the part the ledger rebuilds"""
+    return sorted(get_portfolio(username)[['ID', 'Asset Name', 'Type', 'Value']].itertuples(index=False, name=None))
+
+
+def as_of(username, when):
+    return sorted((row[0], row[1], row[2], row[3]) for row in holdings_as_of(username, when))
+
+
+def test_point_in_time_reads(alice):
+    ids = get_portfolio(alice)['ID'].tolist()
+    update_assets(alice, [{'id': ids[0], 'current_value': 1200.0}])
+    delete_assets(alice, [ids[1]])
+
+    assert [row[1] for row in as_of(alice, date(2024, 1, 15))] == ['Nifty ETF']
+    assert as_of(alice, date(2024, 6, 1)) == [(ids[0], 'Nifty ETF', 'Stock', 1000.0),
+                                              (ids[1], 'Bitcoin', 'Crypto', 500.0),
+                                              (ids[2], 'Gold coin', 'Gold', 250.0)]
+    assert as_of(alice, int(time.time())) == current(alice)
+    assert get_portfolio_as_of(alice, date(2024, 6, 1))['Value'].sum() == 1750.0
+    assert [event[2] for event in ledger_events(alice, limit=2)] == ['delete', 'revalue']
+
+
+def test_replay_after_a_checkpoint(alice):
+    ids = get_portfolio(alice)['ID'].tolist()
+    update_assets(alice, [{'id': ids[0], 'current_value': 1100.0}])
+    assert compact(checkpoint_events=1)['checkpoints'] == 1
+
+    # After the checkpoint: a change, a delete, and a backdated import
+    update_assets(alice, [{'id': ids[2], 'current_value': 300.0}])
+    delete_assets(alice, [ids[1]])
+    import_assets(alice, pd.DataFrame({'Asset Name': ['Old fund'], 'Type': ['Mutual Fund'], 'Value': [80.0],
+                                       'Date Added': ['2023-06-01']}))
+    assert as_of(alice, int(time.time())) == current(alice)
+    assert [row[1] for row in as_of(alice, date(2023, 12, 31))] == ['Old fund']
+
+    assert compact(checkpoint_events=1)['checkpoints'] == 1
+    add_asset(alice, 'Ethereum', 'Crypto', 50.0)
+    assert as_of(alice, int(time.time())) == current(alice)
+
+
+def test_future_dated_events_are_kept_by_checkpoints(alice):
+    later = int(time.time()) + 30 * 86400
+    with get_db().transaction() as conn:
+        asset_id = conn.execute(
+            "INSERT INTO portfolio (username, asset_name, asset_type, current_value, added_date) "
+            "VALUES ('alice', 'Forward', 'Stock', 10.0, ?) RETURNING id", (later,)
+        ).fetchone()[0]
+        record_events(conn, alice, [(asset_id, later, None, ('Forward', 'Stock', 'INR', 10.0))])
+    compact(checkpoint_events=1)
+    assert 'Forward' in [row[1] for row in as_of(alice, later + 86400)]
+    assert 'Forward' in [row[1] for row in as_of(alice, int(time.time()))]
+
+
+def test_future_dates_are_rejected_on_import():
+    _, errors = validate_assets(pd.DataFrame({'Asset Name': ['Forward'], 'Type': ['Stock'], 'Value': [10.0],
+                                              'Date Added': [(pd.Timestamp.now() + pd.Timedelta(days=30)).isoformat()]}))
+    assert errors['Error'].tolist() == ["Date Added is in the future"]
+
+
+def test_snapshot_tracks_every_write(alice):
+    ids = get_portfolio(alice)['ID'].tolist()
+    add_asset(alice, 'Infosys', 'Stock', 400.0)
+    update_assets(alice, [{'id': ids[0], 'asset_type': 'Mutual Fund'}, {'id': ids[2], 'current_value': 10.0}])
+    delete_assets(alice, [ids[1]])
+    expected = (get_portfolio(alice).groupby(['Type', 'Currency'])['Value'].agg(['sum', 'count'])
+                .reset_index().itertuples(index=False, name=None))
+    assert [tuple(row) for row in load_snapshot(alice)] == list(expected)
+
+
+def test_pruned_history_is_reported(alice):
+    update_assets(alice, [{'id': int(get_portfolio(alice)['ID'][0]), 'current_value': 1.0}])
+    compact(checkpoint_events=1)
+    with get_db().transaction() as conn:
+        conn.execute("UPDATE ledger_checkpoints SET at = at - 3 * 86400")
+    add_asset(alice, 'Infosys', 'Stock', 400.0)
+    stats = compact(checkpoint_events=1, retain_days=1)
+    assert stats['pruned'] > 0
+    with pytest.raises(LookupError):
+        holdings_as_of(alice, date(2024, 6, 1))
+    assert as_of(alice, int(time.time())) == current(alice)
+
+
+def test_events_written_during_compaction_are_kept(alice):
+    with get_db().transaction() as conn:
+        conn.execute("INSERT INTO users (username, email, password) VALUES ('bob', 'b@example.com', 'x')")
+    add_asset('bob', 'Nifty ETF', 'Stock', 100.0)
+
+    def write_between_chunks(stats):
+        if stats['users'] == 1:
+            time.sleep(1.1)  # past the second the first chunk started in
+            add_asset('bob', 'Bitcoin', 'Crypto', 50.0)
+            import_assets('bob', pd.DataFrame({'Asset Name': ['Gold coin'], 'Type': ['Gold'], 'Value': [25.0],
+                                               'Date Added': ['2024-01-01']}))
+
+    compact(checkpoint_events=1, chunk_users=1, progress=write_between_chunks)
+    add_asset('bob', 'Infosys', 'Stock', 10.0)
+    assert as_of('bob', int(time.time())) == current('bob')
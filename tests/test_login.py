@@ -0,0 +1,57 @@
+from streamlit.testing.v1 import AppTest
+
+from sessions import validate_session
+
+
+def login_page():
+    import streamlit as st
+
+    from login import end_session, restore_session, start_session
+
+    restore_session()
+    if st.button('login'):
+        start_session('alice')
+    if st.button('logout'):
+        end_session()
+    st.write(f"user={st.session_state.get('username')}")
+
+
+def cookie_scripts(at):
+    return [node.proto.srcdoc for node in at.get('iframe')]
+
+
+def test_token_goes_to_a_cookie_not_the_url():
+    at = AppTest.from_function(login_page)
+    at.query_params['sid'] = 'leaked-token'
+    at.run()
+    assert 'sid' not in at.query_params
+
+    at.button[0].click().run()  # log in; the cookie is written on the next run
+    token = at.session_state.session_token
+    assert validate_session(token) == 'alice'
+    at.run()
+    assert 'sid' not in at.query_params
+    [script] = cookie_scripts(at)
+    assert f"finsight_session={token};" in script and 'SameSite=Strict' in script
+
+    at.button[1].click().run()  # log out
+    assert validate_session(token) is None
+    at.run()
+    [script] = cookie_scripts(at)
+    assert 'finsight_session=;' in script and 'Max-Age=0' in script
+    assert at.markdown[-1].value == 'user=None'
+
+
+def dashboard_page():
+    from dashboard import show_dashboard
+
+    show_dashboard('<img src=x onerror=alert(1)>')
+
+
+def test_user_values_are_escaped_in_page_html():
+    # The session cookie is readable by page script, so no user value may become markup
+    at = AppTest.from_function(dashboard_page, default_timeout=60)
+    at.run()
+    assert not at.exception
+    profile = at.sidebar.markdown[0].value
+    assert '&lt;img src=x onerror=alert(1)&gt;' in profile and '<img' not in profile
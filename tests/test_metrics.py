@@ -0,0 +1,55 @@
+import pytest
+
+import metrics
+from metrics import Histogram, collect, profiled, prometheus_text, recent_profiles, recent_traces, span, trace
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_percentiles_use_the_recent_window():
+    hist = Histogram(window=100)
+    for value in range(1, 201):
+        hist.observe(float(value))
+    stats = hist.snapshot()
+    assert stats['count'] == 200 and stats['sum'] == sum(range(1, 201))
+    assert stats['p50'] == pytest.approx(150, abs=1) and stats['max'] == 200.0
+
+
+def test_trace_records_nested_spans():
+    with trace('rerun', label='alice'):
+        with span('outer'):
+            with span('inner'):
+                pass
+        with trace('nested'):  # folds into the outer trace
+            pass
+    [recorded] = recent_traces()
+    assert recorded['label'] == 'alice'
+    assert [(name, depth) for name, depth, _, _ in recorded['spans']] == \
+        [('rerun', 0), ('outer', 1), ('inner', 2), ('nested', 1)]
+    assert set(collect()['spans']) == {'rerun', 'outer', 'inner', 'nested'}
+
+
+def test_profile_is_kept_when_the_block_raises():
+    with pytest.raises(RuntimeError):
+        with profiled('cpu', label='alice'):
+            sum(range(1000))
+            raise RuntimeError("st.rerun() raises too")
+    [report] = recent_profiles()
+    assert report['kind'] == 'cpu' and 'function calls' in report['report']
+    with pytest.raises(ValueError):
+        with profiled('gpu'):
+            pass
+
+
+def test_prometheus_text():
+    with span('db "query"'):
+        pass
+    text = prometheus_text()
+    assert 'finsight_span_seconds_count{span="db \\"query\\""} 1' in text
+    assert 'finsight_db_pool_open ' in text
+    assert text.endswith('\n')
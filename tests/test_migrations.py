@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from database import MIGRATIONS, SCHEMA_VERSION, migrate, schema_version
+
+
+def v1_database(path):
+    """A database as the first release left it: TEXT dates, no version table"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    for step in MIGRATIONS[0][2]:
+        conn.execute(step)
+    conn.execute("INSERT INTO users (username, email, password) VALUES ('alice', 'a@example.com', 'x')")
+    conn.executemany(
+        "INSERT INTO portfolio (username, asset_name, asset_type, current_value, added_date) VALUES (?, ?, ?, ?, ?)",
+        [('alice', 'Nifty ETF', 'Stock', 1000.0, '2024-01-02 03:04:05'),
+         ('alice', 'Bitcoin', 'Crypto', 500.0, '2024-03-01 00:00:00'),
+         ('alice', 'Gold coin', 'Gold', 250.0, 'not a date')]
+    )
+    return conn
+
+
+def test_versions_are_contiguous():
+    assert [version for version, _, _ in MIGRATIONS] == list(range(1, SCHEMA_VERSION + 1))
+
+
+def test_fresh_database_applies_every_migration(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'fresh.db', isolation_level=None)
+    assert migrate(conn) == list(range(1, SCHEMA_VERSION + 1))
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert migrate(conn) == []
+
+
+def test_v1_data_survives_the_chain(tmp_path):
+    conn = v1_database(tmp_path / 'v1.db')
+    # The v1 tables already exist; migration 1 is still recorded
+    assert migrate(conn)[0] == 1
+    assert schema_version(conn) == SCHEMA_VERSION
+
+    rows = conn.execute(
+        "SELECT asset_name, added_date, currency FROM portfolio ORDER BY id"
+    ).fetchall()
+    assert rows[0] == ('Nifty ETF', 1704164645, 'INR')
+    assert rows[1] == ('Bitcoin', 1709251200, 'INR')
+    assert isinstance(rows[2][1], int)  # unparsable dates fall back to the migration time
+
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {'idx_portfolio_user_type', 'idx_portfolio_user_date', 'idx_portfolio_user_name'} <= indexes
+    assert conn.execute("SELECT COUNT(*) FROM asset_history").fetchone()[0] == 3
+
+    # Existing holdings enter the ledger and the snapshots
+    events = conn.execute("SELECT kind, at, value FROM ledger ORDER BY seq").fetchall()
+    assert [(kind, value) for kind, _, value in events] == [('add', 1000.0), ('add', 500.0), ('add', 250.0)]
+    assert events[0][1] == 1704164645
+    totals = dict(conn.execute("SELECT asset_type, total_value FROM holding_snapshots").fetchall())
+    assert totals == {'Stock': 1000.0, 'Crypto': 500.0, 'Gold': 250.0}
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    import database
+
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(database, 'MIGRATIONS', MIGRATIONS + [(SCHEMA_VERSION + 1, 'broken', [broken])])
+    conn = sqlite3.connect(tmp_path / 'broken.db', isolation_level=None)
+    with pytest.raises(RuntimeError):
+        database.migrate(conn)
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name='half_done'").fetchone()[0] == 0
+
+
+def test_postgres_migrations_reach_the_same_version():
+    postgres = pytest.importorskip('postgres')
+    assert postgres.PG_MIGRATIONS[-1][0] == SCHEMA_VERSION
@@ -0,0 +1,67 @@
+import pytest
+
+from portfolio import add_asset, delete_assets, get_portfolio, get_portfolio_summary, update_assets
+
+HOLDINGS = [
+    ('Nifty ETF', 'Stock', 1000.0),
+    ('Infosys', 'Stock', 3000.0),
+    ('Bitcoin', 'Crypto', 500.0),
+    ('Gold coin', 'Gold', 500.0),
+]
+
+
+@pytest.fixture
+def alice():
+    for name, asset_type, value in HOLDINGS:
+        add_asset('alice', name, asset_type, value)
+    return 'alice'
+
+
+def test_summary_groups_by_type(alice):
+    summary = get_portfolio_summary(alice)
+    assert summary['total_value'] == 5000.0
+    assert summary['count'] == 4
+    assert summary['average'] == 1250.0
+    by_type = summary['by_type'].set_index('Type')
+    assert by_type.loc['Stock', 'Total Value'] == 4000.0
+    assert by_type.loc['Stock', 'Count'] == 2
+    assert by_type.loc['Stock', 'Avg Value'] == 2000.0
+    assert by_type['Percentage'].to_dict() == {'Crypto': 10.0, 'Gold': 10.0, 'Stock': 80.0}
+
+
+def test_summary_matches_the_holdings(alice):
+    add_asset('bob', 'Other user', 'Stock', 99.0)
+    holdings = get_portfolio(alice)
+    expected = holdings.groupby('Type')['Value'].agg(['sum', 'count'])
+    by_type = get_portfolio_summary(alice)['by_type'].set_index('Type')
+    assert by_type['Total Value'].to_dict() == expected['sum'].to_dict()
+    assert by_type['Count'].to_dict() == expected['count'].to_dict()
+
+
+def test_empty_portfolio_summary():
+    summary = get_portfolio_summary('nobody')
+    assert summary['total_value'] == 0.0
+    assert summary['count'] == 0
+    assert summary['by_type'].empty
+
+
+def test_holdings_are_served_from_the_cache(alice):
+    assert get_portfolio(alice) is get_portfolio(alice)
+
+
+def test_writes_invalidate_only_the_writer(alice):
+    add_asset('bob', 'Index fund', 'Mutual Fund', 200.0)
+    bobs = get_portfolio('bob')
+    before = get_portfolio(alice)
+    summary = get_portfolio_summary(alice)
+
+    asset_id = add_asset(alice, 'Ethereum', 'Crypto', 250.0)
+    assert len(get_portfolio(alice)) == len(before) + 1
+    assert get_portfolio_summary(alice)['total_value'] == summary['total_value'] + 250.0
+    assert get_portfolio('bob') is bobs
+
+    update_assets(alice, [{'id': asset_id, 'current_value': 750.0}])
+    assert get_portfolio_summary(alice)['total_value'] == summary['total_value'] + 750.0
+    delete_assets(alice, [asset_id])
+    assert get_portfolio_summary(alice)['total_value'] == summary['total_value']
+    assert get_portfolio('bob') is bobs
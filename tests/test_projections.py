@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import projections
+from projections import MAX_YEARS, PROJECTION_SEED, cached_projection, simulate_projection
+
+ALLOCATION = {'Stock': 6000.0, 'Gold': 3000.0, 'Crypto': 1000.0}
+
+
+def test_bands_are_ordered_and_start_at_the_total():
+    bands = simulate_projection(ALLOCATION, years=5, n_paths=2000, seed=1)
+    assert len(bands['years']) == 6
+    for name in ('mean', 'p5', 'p50', 'p95'):
+        assert bands[name][0] == 10000.0
+    assert np.all(bands['p5'][1:] < bands['p50'][1:])
+    assert np.all(bands['p50'][1:] < bands['p95'][1:])
+
+
+def test_seeded_runs_are_reproducible():
+    first = simulate_projection(ALLOCATION, years=5, n_paths=500, seed=7)
+    second = simulate_projection(ALLOCATION, years=5, n_paths=500, seed=7)
+    assert all(np.array_equal(first[name], second[name]) for name in first)
+
+
+def test_empty_allocation_projects_zero():
+    bands = simulate_projection({'Stock': 0.0}, years=3)
+    assert not bands['p50'].any()
+
+
+def test_horizon_is_bounded():
+    with pytest.raises(ValueError):
+        simulate_projection(ALLOCATION, years=MAX_YEARS + 1)
+
+
+def test_cached_projection_defaults_to_the_shared_seed():
+    default = cached_projection(ALLOCATION, 5, n_paths=500)
+    explicit = cached_projection(ALLOCATION, 5, n_paths=500, seed=PROJECTION_SEED)
+    assert np.array_equal(default['p50'], explicit['p50'])
+
+
+def test_cached_projection_simulates_once_per_composition(monkeypatch):
+    calls = []
+    simulate = projections.simulate_projection
+    monkeypatch.setattr(projections, 'simulate_projection', lambda *a, **kw: calls.append(1) or simulate(*a, **kw))
+
+    small = cached_projection(ALLOCATION, 5, n_paths=500)
+    doubled = cached_projection({t: v * 2 for t, v in ALLOCATION.items()}, 10, n_paths=500)
+    assert len(calls) == 1  # same weights, any horizon and total
+    np.testing.assert_allclose(doubled['p50'][:6], small['p50'] * 2)
+    assert np.array_equal(cached_projection(ALLOCATION, 5, n_paths=500, seed=0)['p50'],
+                          cached_projection(ALLOCATION, 5, n_paths=500, seed=0)['p50'])
+    assert len(calls) == 2
+
+
+def test_projection_survives_a_restart_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(projections, 'PROJECTION_CACHE_DIR', str(tmp_path))
+    first = cached_projection(ALLOCATION, 5, n_paths=500)
+    projections.projection_cache().clear()
+    monkeypatch.setattr(projections, 'simulate_projection', None)  # must not be called
+    assert np.array_equal(cached_projection(ALLOCATION, 5, n_paths=500)['p50'], first['p50'])
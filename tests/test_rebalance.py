@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from rebalance import TARGET_PRESETS, mean_variance_weights, project_to_simplex, rebalance_plan, solve_rebalance
+
+rng = np.random.default_rng(0)
+
+
+@pytest.mark.parametrize('contribution', [0.0, 5000.0, -2000.0])
+def test_every_weight_ends_inside_its_band(contribution):
+    current = rng.uniform(0, 10000, (200, 4))
+    targets = rng.dirichlet(np.ones(4), 200)
+    trades = solve_rebalance(current, targets, tolerance=0.05, contribution=contribution)
+    after = current + trades
+    assert np.allclose(trades.sum(axis=1), contribution)
+    weights = after / after.sum(axis=1, keepdims=True)
+    assert np.all(np.abs(weights - targets) <= 0.05 + 1e-9)
+
+
+def test_balanced_portfolio_needs_no_trades():
+    assert not solve_rebalance([50.0, 30.0, 20.0], [0.5, 0.3, 0.2]).any()
+
+
+def test_trades_stop_at_the_band_edge():
+    trades = solve_rebalance([70.0, 20.0, 10.0], [0.5, 0.3, 0.2], tolerance=0.05)
+    # Stock sells down to 55; the proceeds lift the others into their bands
+    assert trades[0] == pytest.approx(-15.0)
+    assert trades.sum() == pytest.approx(0.0)
+    assert np.all(trades[1:] >= 5.0 - 1e-9)
+    assert not solve_rebalance([52.0, 28.0, 20.0], [0.5, 0.3, 0.2], tolerance=0.05).any()
+
+
+def test_plan_lists_largest_trades_first():
+    plan = rebalance_plan({'Stock': 9000.0, 'Gold': 1000.0}, TARGET_PRESETS['Balanced'])
+    trades = [abs(row['trade']) for row in plan]
+    assert trades == sorted(trades, reverse=True)
+    assert sum(row['trade'] for row in plan) == pytest.approx(0.0)
+    assert {row['type'] for row in plan} >= {'Stock', 'Gold', 'Mutual Fund'}
+
+
+def test_simplex_projection():
+    projected = project_to_simplex(rng.normal(size=(50, 5)))
+    assert np.all(projected >= 0)
+    assert np.allclose(projected.sum(axis=1), 1.0)
+
+
+def test_mean_variance_prefers_the_better_asset():
+    mu = np.array([0.10, 0.02])
+    cov = np.diag([0.04, 0.04])
+    weights = mean_variance_weights(mu, cov, risk_aversion=3.0)[0]
+    # Interior optimum on w0 + w1 = 1: w0 - w1 = (mu0 - mu1) / (risk_aversion * variance)
+    assert weights[0] - weights[1] == pytest.approx(0.08 / 0.12, abs=1e-3)
@@ -0,0 +1,52 @@
+import numpy as np
+
+from risk import (correlation_matrix, daily_returns, historical_var, max_drawdown, parametric_var, risk_report,
+                  volatility)
+
+rng = np.random.default_rng(0)
+RETURNS = rng.normal(0.0005, 0.01, (500, 3))
+
+
+def test_vectorized_statistics_match_one_column_at_a_time():
+    vol = volatility(RETURNS)
+    var, cvar = historical_var(RETURNS)
+    for i in range(3):
+        column = RETURNS[:, i]
+        assert np.isclose(vol[i], column.std(ddof=1) * np.sqrt(365))
+        cutoff = np.percentile(column, 5)
+        assert np.isclose(var[i], -cutoff)
+        assert np.isclose(cvar[i], -column[column <= cutoff].mean())
+
+
+def test_parametric_var_is_close_to_historical_for_normal_returns():
+    samples = rng.normal(0, 0.01, (100000, 1))
+    assert np.isclose(parametric_var(samples)[0][0], historical_var(samples)[0][0], rtol=0.03)
+
+
+def test_days_before_an_asset_was_held_are_ignored():
+    values = np.array([[0.0, 100.0], [0.0, 110.0], [50.0, 99.0], [55.0, 99.0], [44.0, 108.9]])
+    returns = daily_returns(values)
+    assert np.isnan(returns[:2, 0]).all()
+    assert np.isclose(volatility(returns)[0], np.std([0.1, -0.2], ddof=1) * np.sqrt(365))
+    assert np.isnan(volatility(returns[:3])[0])  # one observation is too few
+
+
+def test_max_drawdown():
+    values = np.array([[100.0], [120.0], [90.0], [130.0], [117.0]])
+    assert np.isclose(max_drawdown(values)[0], -0.25)
+
+
+def test_correlation_matrix():
+    base = RETURNS[:, 0]
+    corr = correlation_matrix(np.column_stack([base, base * 2, -base]))
+    np.testing.assert_allclose(corr, [[1, 1, -1], [1, 1, -1], [-1, -1, 1]], atol=1e-12)
+
+
+def test_report_groups_assets_by_type():
+    values = 1000 * np.cumprod(1 + RETURNS, axis=0)
+    report = risk_report({'values': values, 'asset_ids': np.array([1, 2, 3]),
+                          'asset_types': ['Stock', 'Gold', 'Stock']})
+    assert report['observations'] == 499
+    assert report['by_type']['types'] == ['Gold', 'Stock']
+    assert report['by_type']['correlation'].shape == (2, 2)
+    assert np.isclose(report['portfolio']['value'], values[-1].sum())
@@ -0,0 +1,42 @@
+import time
+
+from database import get_db
+from sessions import create_session, revoke_session, revoke_user_sessions, session_cache, validate_session
+
+
+def test_token_round_trip():
+    token = create_session('alice')
+    assert validate_session(token) == 'alice'
+    assert validate_session(None) is None
+    assert validate_session('not.a.valid.token') is None
+
+
+def test_tampered_token_is_rejected():
+    session_id, user, expires_at, signature = create_session('alice').split('.')
+    assert validate_session('.'.join([session_id, user, str(int(expires_at) + 3600), signature])) is None
+    bob = create_session('bob').split('.')[1]
+    assert validate_session('.'.join([session_id, bob, expires_at, signature])) is None
+
+
+def test_expired_token_is_rejected():
+    token = create_session('alice', ttl=1)
+    time.sleep(1.1)
+    assert validate_session(token) is None
+
+
+def test_validation_is_served_from_memory():
+    token = create_session('alice')
+    with get_db().transaction() as conn:
+        conn.execute("DELETE FROM sessions")  # as if another process logged out
+    assert validate_session(token) == 'alice'
+    session_cache().clear()  # the cache entry expired
+    assert validate_session(token) is None
+
+
+def test_revocation():
+    first, second, other = create_session('alice'), create_session('alice'), create_session('bob')
+    revoke_session(first)
+    assert validate_session(first) is None and validate_session(second) == 'alice'
+    revoke_user_sessions('alice')
+    assert validate_session(second) is None
+    assert validate_session(other) == 'bob'
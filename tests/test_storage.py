@@ -0,0 +1,87 @@
+import os
+import uuid
+
+import pytest
+
+import database
+from database import open_database
+from portfolio import add_asset, get_portfolio, get_portfolio_summary, update_assets
+
+# A PostgreSQL server URL whose user may create databases, e.g.
+# postgresql://postgres@localhost/postgres; unset skips the PostgreSQL tests
+PG_URL = os.environ.get('FINSIGHT_TEST_PG_URL')
+
+
+def test_sqlite_urls(tmp_path):
+    backend = open_database(f"sqlite:///{tmp_path / 'url.db'}")
+    assert backend.backend == 'sqlite'
+    backend.close()
+    with pytest.raises(ValueError):
+        open_database('mysql://localhost/finsight')
+
+
+def test_qmark_sql_is_translated_outside_literals():
+    postgres = pytest.importorskip('postgres')
+    assert postgres.to_pyformat("SELECT * FROM t WHERE a=? AND b LIKE '%?%' AND c=?") == \
+        "SELECT * FROM t WHERE a=%s AND b LIKE '%%?%%' AND c=%s"
+    assert postgres.to_pyformat("SELECT 'it''s ?', ?") == "SELECT 'it''s ?', %s"
+
+
+@pytest.fixture
+def pg(db):
+    if not PG_URL:
+        pytest.skip("FINSIGHT_TEST_PG_URL is not set")
+    psycopg = pytest.importorskip('psycopg')
+    from postgres import PostgresDatabase
+
+    name = f"finsight_test_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(PG_URL, autocommit=True) as admin:
+        admin.execute(f"CREATE DATABASE {name}")
+    url = psycopg.conninfo.make_conninfo(PG_URL, dbname=name)
+    backend = database._db = PostgresDatabase(url, pool_size=2)
+    yield backend
+    backend.close()
+    database._db = db
+    with psycopg.connect(PG_URL, autocommit=True) as admin:
+        admin.execute(f"DROP DATABASE {name}")
+
+
+def test_service_layer_runs_on_postgres(pg):
+    with pg.connection() as conn:
+        assert conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] == database.SCHEMA_VERSION
+    stock = add_asset('alice', 'Nifty ETF', 'Stock', 1000.0)
+    add_asset('alice', "Bitcoin's 50%", 'Crypto', 500.0)
+    update_assets('alice', [{'id': stock, 'current_value': 1500.0}])
+    assert get_portfolio('alice')['Asset Name'].tolist() == ['Nifty ETF', "Bitcoin's 50%"]
+    assert get_portfolio_summary('alice')['total_value'] == 2000.0
+    with pytest.raises(pg.IntegrityError):
+        with pg.transaction() as conn:
+            conn.execute("INSERT INTO users (username, email, password) VALUES ('a', 'x@example.com', 'x')")
+            conn.execute("INSERT INTO users (username, email, password) VALUES ('b', 'x@example.com', 'x')")
+    with pg.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+
+def test_concurrent_imports_record_only_their_own_rows(pg):
+    import threading
+
+    import pandas as pd
+
+    from ledger import load_snapshot
+    from portfolio import import_assets
+
+    barrier = threading.Barrier(2)
+
+    def run(tag):
+        barrier.wait()
+        import_assets('alice', pd.DataFrame({'Asset Name': [f"{tag} {i}" for i in range(200)],
+                                             'Type': ['Stock'] * 200, 'Value': [1.0] * 200}), chunk_size=20)
+
+    threads = [threading.Thread(target=run, args=(tag,)) for tag in 'AB']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with pg.connection() as conn:
+        assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT asset_id) FROM ledger").fetchone() == (400, 400)
+    assert [tuple(row) for row in load_snapshot('alice')] == [('Stock', 'INR', 400.0, 400)]
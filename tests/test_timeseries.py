@@ -0,0 +1,56 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from portfolio import add_asset
+from timeseries import forward_fill, load_history, record_valuations, resample, rolling_returns, to_day
+
+END = to_day(date(2025, 1, 10))
+
+
+def test_history_carries_values_forward_across_years():
+    stock = add_asset('alice', 'Nifty ETF', 'Stock', 100.0)
+    gold = add_asset('alice', 'Gold coin', 'Gold', 50.0)
+    add_asset('bob', 'Other', 'Stock', 1.0)
+    record_valuations([(stock, date(2024, 12, 1), 90.0), (stock, date(2025, 1, 5), 110.0),
+                       (gold, date(2025, 1, 8), 55.0)])
+
+    history = load_history('alice', days=10, end=END)
+    assert history['days'].tolist() == list(range(END - 9, END + 1))
+    assert history['asset_ids'].tolist() == [stock, gold]
+    assert history['asset_types'] == ['Stock', 'Gold']
+    values = history['values']
+    assert values[:4, 0].tolist() == [90.0] * 4  # carried in from 2024
+    assert values[4:, 0].tolist() == [110.0] * 6
+    assert values[:7, 1].tolist() == [0.0] * 7  # no valuation yet
+    assert values[7:, 1].tolist() == [55.0] * 3
+
+
+def test_new_valuations_invalidate_the_cached_history():
+    stock = add_asset('alice', 'Nifty ETF', 'Stock', 100.0)
+    record_valuations([(stock, date(2025, 1, 1), 90.0)])
+    assert load_history('alice', days=5, end=END)['values'][-1, 0] == 90.0
+    record_valuations([(stock, date(2025, 1, 9), 95.0)])
+    assert load_history('alice', days=5, end=END)['values'][-1, 0] == 95.0
+
+
+def test_forward_fill():
+    values = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan], [3.0, 4.0]])
+    np.testing.assert_array_equal(forward_fill(values), [[np.nan, 1], [2, 1], [2, 1], [3, 4]])
+
+
+def test_weekly_resample_labels_buckets_by_their_last_day():
+    monday = to_day(date(2024, 1, 1))
+    days = np.arange(monday, monday + 10)
+    labels, values = resample(days, np.arange(10.0), 'W', how='last')
+    assert labels.tolist() == [monday + 6, monday + 9]
+    assert values.tolist() == [6.0, 9.0]
+    assert resample(days, np.arange(10.0), 'W', how='mean')[1].tolist() == [3.0, 8.0]
+    with pytest.raises(ValueError):
+        resample(days, np.arange(10.0), 'Q')
+
+
+def test_rolling_returns():
+    np.testing.assert_allclose(rolling_returns([100.0, 110.0, 0.0, 121.0], 1), [np.nan, 0.1, -1.0, np.nan])
+
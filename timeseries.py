@@ -0,0 +1,328 @@
+"""
+📈 FinSight Time Series
+Per-asset daily valuation history, ingestion and vectorized resampling
+"""
+
+import time
+from datetime import date
+
+import numpy as np
+
+import database
+from cache import get_cache
+from database import get_db
+from metrics import instrument
+
+# ============================================
+# ⚙️ CONFIGURATION
+# ============================================
+
+SECONDS_PER_DAY = 86400
+HISTORY_DAYS = 365
+HISTORY_CACHE_OPTIONS = dict(max_entries=512, max_bytes=128 * 1024 * 1024, ttl=300)
+INGEST_CHUNK_SIZE = 10000
+SQL_VARIABLE_CHUNK = 900  # stay under SQLite's bound-parameter limit
+
+# Resampling frequencies: D (daily), W (weeks starting Monday), M (calendar months)
+FREQUENCIES = ('D', 'W', 'M')
+
+# Storage layout (see database.py migration 6): one row per asset and
+# calendar year holding BLOCK_DAYS little-endian float64 values, NaN where
+# no valuation was recorded. A year of history for one asset is one row,
+# so loading hundreds of assets reads hundreds of blobs, not 10^5 rows.
+BLOCK_DAYS = database.HISTORY_BLOCK_DAYS
+BLOCK_DTYPE = np.dtype('<f8')
+
+# ============================================
+# 📅 DAY NUMBERS
+# ============================================
+
+def to_day(value=None):
+    """Days since 1970-01-01 (UTC) for a date, datetime, epoch seconds or today"""
+    if value is None:
+        return int(time.time()) // SECONDS_PER_DAY
+    if isinstance(value, (int, np.integer)):
+        return int(value) // SECONDS_PER_DAY
+    if hasattr(value, 'date') and callable(value.date):
+        value = value.date()
+    if isinstance(value, date):
+        return value.toordinal() - date(1970, 1, 1).toordinal()
+    raise TypeError(f"Cannot convert {value!r} to a day number")
+
+def to_dates(days):
+    """Day numbers -> numpy datetime64[D] array"""
+    return np.asarray(days, dtype='int64').astype('datetime64[D]')
+
+def day_year(days):
+    """Calendar year of each day number"""
+    return to_dates(days).astype('datetime64[Y]').astype('int64') + 1970
+
+def year_start(years):
+    """Day number of 1 January for each year"""
+    return (np.asarray(years, dtype='int64') - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype('int64')
+
+# ============================================
+# 📥 INGESTION
+# ============================================
+
+def history_cache():
+    """Process-wide cache of per-user history matrices"""
+    return get_cache('history', **HISTORY_CACHE_OPTIONS)
+
+def _owners(conn, asset_ids):
+    owners = set()
+    for start in range(0, len(asset_ids), SQL_VARIABLE_CHUNK):
+        chunk = asset_ids[start:start + SQL_VARIABLE_CHUNK]
+        rows = conn.execute(
+            f"SELECT DISTINCT username FROM portfolio WHERE id IN ({','.join('?' * len(chunk))})",
+            chunk
+        ).fetchall()
+        owners.update(row[0] for row in rows)
+    return owners
+
+@instrument('history.record')
+def record_valuations(valuations, conn=None):
+    """Upsert daily valuations; returns the number of points written.
+
+    ``valuations`` is an iterable of ``(asset_id, day, value)`` where
+    ``day`` is anything ``to_day`` accepts. A later valuation for the same
+    asset and day replaces the earlier one.
+
+    Pass ``conn`` to write inside an existing transaction; the caller is
+    then responsible for calling ``invalidate_history`` after commit.
+    """
+    rows = [(int(asset_id), to_day(day), float(value)) for asset_id, day, value in valuations]
+    if not rows:
+        return 0
+    if conn is not None:
+        _write_valuations(conn, rows)
+        return len(rows)
+
+    for start in range(0, len(rows), INGEST_CHUNK_SIZE):
+        chunk = rows[start:start + INGEST_CHUNK_SIZE]
+        with get_db().transaction() as chunk_conn:
+            _write_valuations(chunk_conn, chunk)
+            owners = _owners(chunk_conn, sorted({row[0] for row in chunk}))
+        for username in owners:
+            invalidate_history(username)
+    return len(rows)
+
+def _write_valuations(conn, rows):
+    """Merge (asset_id, day, value) rows into their yearly blocks"""
+    asset_ids = np.array([row[0] for row in rows], dtype='int64')
+    days = np.array([row[1] for row in rows], dtype='int64')
+    values = np.array([row[2] for row in rows], dtype=float)
+    years = day_year(days)
+    offsets = days - year_start(years)
+
+    keys, inverse = np.unique(np.column_stack((asset_ids, years)), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    blocks = np.full((len(keys), BLOCK_DAYS), np.nan)
+
+    # Patch existing blocks rather than overwrite them
+    position = {(int(a), int(y)): i for i, (a, y) in enumerate(keys)}
+    unique_assets = np.unique(keys[:, 0]).tolist()
+    for start in range(0, len(unique_assets), SQL_VARIABLE_CHUNK):
+        chunk = unique_assets[start:start + SQL_VARIABLE_CHUNK]
+        existing = conn.execute(
+            f"SELECT asset_id, year, vals FROM asset_history WHERE asset_id IN ({','.join('?' * len(chunk))}) "
+            f"AND year BETWEEN ? AND ?{get_db().row_lock}",
+            [*chunk, int(keys[:, 1].min()), int(keys[:, 1].max())]
+        )
+        for asset_id, year, vals in existing:
+            i = position.get((asset_id, year))
+            if i is not None:
+                blocks[i] = np.frombuffer(vals, dtype=BLOCK_DTYPE)
+
+    blocks[inverse, offsets] = values
+    conn.executemany(
+        "INSERT INTO asset_history (asset_id, year, vals) VALUES (?, ?, ?) "
+        "ON CONFLICT (asset_id, year) DO UPDATE SET vals=excluded.vals",
+        [(int(a), int(y), blocks[i].astype(BLOCK_DTYPE).tobytes()) for i, (a, y) in enumerate(keys)]
+    )
+
+def invalidate_history(username):
+    """Drop a user's cached history after their valuations change"""
+    history_cache().invalidate_tag(username)
+
+def delete_history(conn, asset_ids):
+    """Remove the history of deleted assets (inside the caller's transaction)"""
+    asset_ids = [int(asset_id) for asset_id in asset_ids]
+    for start in range(0, len(asset_ids), SQL_VARIABLE_CHUNK):
+        chunk = asset_ids[start:start + SQL_VARIABLE_CHUNK]
+        conn.execute(
+            f"DELETE FROM asset_history WHERE asset_id IN ({','.join('?' * len(chunk))})",
+            chunk
+        )
+
+# ============================================
+# 📤 LOADING
+# ============================================
+
+def load_history(username, days=HISTORY_DAYS, end=None):
+    """Daily value matrix for every asset a user holds (cached per user).
+
+    Returns a dict with ``days`` (day numbers, length D), ``asset_ids``,
+    ``asset_types`` and ``asset_currencies`` (length A) and ``values``
+    (D x A, each asset in its own currency). Each asset carries its last known
+    valuation forward, including one recorded before the window; days
+    before an asset's first valuation are 0. ``end`` is the last day of the
+    window as a day number or date (default today).
+    """
+    if end is None:
+        end = to_day()
+    elif not isinstance(end, (int, np.integer)):
+        end = to_day(end)
+    return history_cache().get_or_set(
+        (username, days, end), lambda: _load_history(username, days, end), tag=username
+    )
+
+@instrument('history.load')
+def _load_history(username, days, end):
+    start = end - days + 1
+    first_year, last_year = day_year([start, end]).tolist()
+    with get_db().connection() as conn:
+        blocks = conn.execute(
+            "SELECT h.asset_id, h.year, h.vals FROM portfolio p "
+            "JOIN asset_history h ON h.asset_id = p.id "
+            "WHERE p.username=? AND h.year BETWEEN ? AND ?",
+            (username, first_year, last_year)
+        ).fetchall()
+        carried = conn.execute(
+            "SELECT p.id, p.asset_type, p.currency, (SELECT h.vals FROM asset_history h "
+            "              WHERE h.asset_id = p.id AND h.year < ? "
+            "              ORDER BY h.year DESC LIMIT 1) "
+            "FROM portfolio p WHERE p.username=?",
+            (first_year, username)
+        ).fetchall()
+
+    carried.sort()
+    asset_ids = np.array([row[0] for row in carried], dtype='int64')
+    base = int(year_start(first_year))
+    # Row 0 holds the value carried in from before first_year; row 1 is 1 Jan of first_year
+    grid = np.full((end - base + 2, len(asset_ids)), np.nan)
+
+    for asset_id, _, _, vals in carried:
+        if vals is not None:
+            known = np.frombuffer(vals, dtype=BLOCK_DTYPE)
+            known = known[~np.isnan(known)]
+            if len(known):
+                grid[0, np.searchsorted(asset_ids, asset_id)] = known[-1]
+
+    if blocks:
+        block_assets = np.array([row[0] for row in blocks], dtype='int64')
+        block_years = np.array([row[1] for row in blocks], dtype='int64')
+        block_values = np.frombuffer(b''.join(row[2] for row in blocks), dtype=BLOCK_DTYPE)
+        block_values = block_values.reshape(len(blocks), BLOCK_DAYS)
+
+        starts = year_start(block_years) - base + 1
+        lengths = year_start(block_years + 1) - year_start(block_years)
+        offsets = np.arange(BLOCK_DAYS)
+        rows = starts[:, None] + offsets
+        keep = (offsets < lengths[:, None]) & (rows < len(grid))
+        cols = np.broadcast_to(np.searchsorted(asset_ids, block_assets)[:, None], rows.shape)
+        grid[rows[keep], cols[keep]] = block_values[keep]
+
+    values = forward_fill(grid)[start - base + 1:]
+    return {
+        'days': np.arange(start, end + 1),
+        'asset_ids': asset_ids,
+        'asset_types': [row[1] for row in carried],
+        'asset_currencies': [row[2] for row in carried],
+        'values': np.nan_to_num(values, nan=0.0),
+    }
+
+def forward_fill(values):
+    """Carry the last non-NaN value down each column of a 2-D array"""
+    mask = ~np.isnan(values)
+    index = np.where(mask, np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return values[index, np.arange(values.shape[1])]
+
+def portfolio_value_series(history):
+    """Total portfolio value per day"""
+    return history['values'].sum(axis=1)
+
+# ============================================
+# 🔁 RESAMPLING & RETURNS
+# ============================================
+
+def bucket_labels(days, freq):
+    """Bucket id per day number for D/W/M resampling"""
+    days = np.asarray(days, dtype='int64')
+    if freq == 'D':
+        return days
+    if freq == 'W':
+        return (days + 3) // 7  # 1970-01-01 was a Thursday; weeks start on Monday
+    if freq == 'M':
+        return to_dates(days).astype('datetime64[M]').astype('int64')
+    raise ValueError(f"Unsupported frequency: {freq} (expected one of {FREQUENCIES})")
+
+def resample(days, values, freq='W', how='last'):
+    """Downsample a daily series or (days x assets) matrix into buckets.
+
+    ``how`` is 'last' (closing value, default), 'mean', 'max' or 'min'.
+    Returns ``(bucket_days, bucket_values)`` where each bucket is labelled
+    by its last day. ``days`` must be sorted ascending.
+    """
+    values = np.asarray(values, dtype=float)
+    labels = bucket_labels(days, freq)
+    ends = np.flatnonzero(np.diff(labels)) + 1
+    starts = np.concatenate(([0], ends))
+    last = np.concatenate((ends, [len(labels)])) - 1
+
+    if how == 'last':
+        result = values[last]
+    elif how == 'mean':
+        counts = (last - starts + 1).reshape((-1,) + (1,) * (values.ndim - 1))
+        result = np.add.reduceat(values, starts, axis=0) / counts
+    elif how == 'max':
+        result = np.maximum.reduceat(values, starts, axis=0)
+    elif how == 'min':
+        result = np.minimum.reduceat(values, starts, axis=0)
+    else:
+        raise ValueError(f"Unsupported aggregation: {how}")
+    return np.asarray(days)[last], result
+
+def rolling_returns(values, window):
+    """Simple return over ``window`` periods at every point (NaN where undefined)"""
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if window < len(values):
+        previous = values[:-window]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[window:] = np.where(previous > 0, values[window:] / previous - 1, np.nan)
+    return result
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling of a line to ``threshold`` points.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the next bucket's mean, so peaks and
+    troughs survive. Returns the kept indices (sorted) into ``x``/``y``.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')  # buckets between the end points
+    # Mean of every bucket, with the last point standing in after the final bucket
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(threshold, dtype='int64')
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept